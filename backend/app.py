@@ -1,16 +1,39 @@
 from flask import Flask, jsonify
-from backend.config import Config
+from backend.config import Config, engine_options
 from backend.database import db
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    if app.config['PROXY_FIX_X_FOR']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    replica_url = app.config['DATABASE_REPLICA_URL']
+    if replica_url:
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault('replica', {'url': replica_url, **engine_options(app.config, replica_url)})
 
-    # Initialize extensions
     # Initialize extensions
     db.init_app(app)
     from backend.database import login_manager
     login_manager.init_app(app)
+    from backend.auth.api_keys import api_key_cache, legacy_keys
+    api_key_cache.configure(app.config['API_KEY_CACHE_SIZE'], app.config['API_KEY_CACHE_TTL'])
+    legacy_keys.reset()
+    from backend.cache import reference_cache, stats_cache
+    reference_cache.configure(app.config['REFERENCE_CACHE_TTL'])
+    stats_cache.configure(app.config['TASK_STATS_CACHE_TTL'])
+    # First, so request timings cover the other hooks and see the final (compressed) body
+    from backend import metrics
+    metrics.init_app(app)
+    # Before the replica hook, so limited requests are turned away before any routing
+    from backend import ratelimit
+    ratelimit.init_app(app)
+    from backend import replica
+    replica.init_app(app)
+    from backend import compression
+    compression.init_app(app)
 
     # Register Blueprints
     from backend.routes.health import health_bp
@@ -23,13 +46,21 @@ def create_app(config_class=Config):
     app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
     app.register_blueprint(references_bp, url_prefix='/api')
     app.register_blueprint(users_bp, url_prefix='/api/users')
+    from backend.migrate import migrations_cli
+    app.cli.add_command(migrations_cli)
     
     # Import models so they are registered with SQLAlchemy
     from backend import models
+    # Register the flush listeners that bump per-table data versions and record tombstones
+    from backend import versioning
+    from backend import changes
+    # Full-text index DDL for create_all (FTS5 table and triggers on SQLite)
+    from backend import search
 
-    # Create tables for dev (in production use migrations)
+    # One query to confirm the schema version; an empty (dev) database is created here
+    from backend.migrate import check_schema
     with app.app_context():
-        db.create_all()
+        check_schema(app)
 
     @app.errorhandler(500)
     def internal_error(error):
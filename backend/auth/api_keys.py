@@ -0,0 +1,157 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from backend.database import db
+
+
+def api_key_fingerprint(api_key):
+    """
+    Derive the indexed lookup id for an API key.
+    The id is a truncated SHA-256 of the key, so it can be computed for keys
+    issued before the column existed without changing the key format.
+    """
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+
+class ApiKeyCache:
+    """
+    Bounded, TTL-evicted cache of recently verified API keys.
+    Maps a digest of the full key to the owning user id and the key hash it
+    was verified against, so repeat requests skip the scrypt verification.
+    Callers must check the hash against the loaded user: invalidate_user only
+    reaches this worker's cache, and a reset elsewhere changes the hash.
+    """
+
+    def __init__(self, maxsize=256, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, maxsize, ttl):
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self._entries.clear()
+
+    @staticmethod
+    def _digest(api_key):
+        return hashlib.sha256(api_key.encode('utf-8')).digest()
+
+    def get(self, api_key):
+        if self.maxsize <= 0:
+            return None
+        digest = self._digest(api_key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            user_id, key_hash, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return user_id, key_hash
+
+    def put(self, api_key, user_id, key_hash):
+        if self.maxsize <= 0:
+            return
+        digest = self._digest(api_key)
+        with self._lock:
+            self._entries[digest] = (user_id, key_hash, time.monotonic() + self.ttl)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            stale = [k for k, (uid, _, _) in self._entries.items() if uid == user_id]
+            for digest in stale:
+                del self._entries[digest]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+api_key_cache = ApiKeyCache()
+
+
+class LegacyKeys:
+    """
+    Whether any user may still hold a key issued before api_key_id existed.
+    Every key issued since sets api_key_id, so once a scan finds none left
+    the answer holds for the life of the process and unknown keys stop
+    paying for a scan. `flask users revoke-legacy-keys` clears them for good.
+    """
+
+    def __init__(self):
+        self.remaining = True
+
+    def reset(self):
+        self.remaining = True
+
+
+legacy_keys = LegacyKeys()
+
+
+def authenticate_api_key(api_key, legacy=True):
+    """
+    Resolve an API key to its User, or None if the key is invalid.
+    Costs one indexed lookup and at most one slow hash verification.
+    With `legacy=False`, keys without a lookup id are reported invalid
+    instead of scanned for, so callers ahead of rate limiting stay cheap.
+    """
+    from backend.models import User
+
+    cached = api_key_cache.get(api_key)
+    if cached is not None:
+        user_id, key_hash = cached
+        user = db.session.get(User, user_id)
+        # The key is still current only while the stored hash is the one verified
+        if user is not None and user.api_key_hash == key_hash:
+            return user
+        api_key_cache.invalidate_user(user_id)
+
+    key_id = api_key_fingerprint(api_key)
+    user = User.query.filter_by(api_key_id=key_id).first()
+    if user is not None:
+        if not user.check_api_key(api_key):
+            return None
+    elif legacy:
+        # Keys issued before api_key_id existed have no lookup id yet.
+        # Verify them the slow way once and backfill the id so later
+        # requests take the indexed path.
+        user = _authenticate_legacy_api_key(api_key, key_id)
+        if user is None:
+            return None
+    else:
+        return None
+
+    api_key_cache.put(api_key, user.id, user.api_key_hash)
+    return user
+
+
+def legacy_key_users():
+    from backend.models import User
+
+    return User.query.filter(
+        User.api_key_hash.isnot(None),
+        User.api_key_id.is_(None)
+    )
+
+
+def _authenticate_legacy_api_key(api_key, key_id):
+    if not legacy_keys.remaining:
+        return None
+    legacy_users = legacy_key_users().all()
+    if not legacy_users:
+        legacy_keys.remaining = False
+        return None
+    for user in legacy_users:
+        if user.check_api_key(api_key):
+            user.api_key_id = key_id
+            db.session.commit()
+            return user
+    return None
@@ -1,8 +1,7 @@
 from functools import wraps
 from flask import request, jsonify, g
 from flask_login import current_user
-from backend.models import User
-from backend.database import db
+from backend.auth.api_keys import authenticate_api_key
 
 
 def admin_required(f):
@@ -42,15 +41,8 @@ def api_key_or_login_required(f):
         if not api_key:
             return jsonify({'error': 'Authentication required'}), 401
         
-        # Find user with matching API key
-        # We need to check all users since keys are hashed
-        users = User.query.filter(User.api_key_hash.isnot(None)).all()
-        
-        authenticated_user = None
-        for user in users:
-            if user.check_api_key(api_key):
-                authenticated_user = user
-                break
+        # Resolve the key through its indexed lookup id (and the verified-key cache)
+        authenticated_user = authenticate_api_key(api_key)
         
         if not authenticated_user:
             return jsonify({'error': 'Invalid API key'}), 401
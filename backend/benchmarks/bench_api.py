@@ -0,0 +1,219 @@
+"""
+Measure the hot API endpoints against a seeded database: throughput, p50
+and p99 per scenario.
+
+Requests go through the Flask test client in this process, so the numbers
+cover routing, auth, SQL and serialization without network or server
+overhead. Each scenario is warmed up, then timed request by request. Pass
+`--output` to store the results as JSON, and `--baseline` to compare with an
+earlier run; the exit status is 1 when any scenario's p50 or throughput is
+worse than the baseline by more than `--threshold` percent. p99 rests on a
+handful of samples and swings widely between identical runs, so it only
+fails the comparison with `--p99-threshold`.
+
+Usage:
+    python -m backend.benchmarks.bench_api [--database URL | --tasks 10k] [--requests 300]
+        [--output results.json] [--baseline baseline.json] [--threshold 10] [--p99-threshold 50]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import sqlalchemy
+from sqlalchemy import select
+from backend.benchmarks.seed import ADMIN_EMAIL, AGENT_EMAIL, PASSWORD, parse_count, seed
+from backend.config import Config
+from backend.database import db
+from backend.models import User, Task, Category, Priority
+
+# Compared against the baseline; latencies regress upwards, throughput downwards
+COMPARED = (('p50_ms', 1), ('p99_ms', 1), ('rps', -1))
+
+
+def scenarios(rng, task_ids, category_ids, priority_ids):
+    """(name, method, url factory, json body factory or None, use the API key)"""
+    page = 'limit=100'
+    return [
+        ('list_default', 'GET', lambda: f'/api/tasks?{page}', None, False),
+        ('list_status', 'GET', lambda: f'/api/tasks?status=in_progress&{page}', None, False),
+        ('list_assignee_me', 'GET', lambda: f'/api/tasks?assignee_id=me&{page}', None, False),
+        ('list_category', 'GET', lambda: f'/api/tasks?category_id={rng.choice(category_ids)}&{page}', None, False),
+        ('list_priority', 'GET', lambda: f'/api/tasks?priority_id={rng.choice(priority_ids)}&{page}', None, False),
+        ('list_due_within_days', 'GET', lambda: f'/api/tasks?due_within_days=7&{page}', None, False),
+        ('list_due_range', 'GET', lambda: f'/api/tasks?due_from=2026-06-01&due_to=2026-06-30&{page}', None, False),
+        ('list_search', 'GET', lambda: f"/api/tasks?q={rng.choice(('login', 'billing', 'export', 'webhooks'))}&{page}", None, False),
+        ('list_sort_updated', 'GET', lambda: f'/api/tasks?sort=-updated_at&{page}', None, False),
+        ('list_sparse', 'GET', lambda: f'/api/tasks?fields=id,title,status,rank&{page}', None, False),
+        ('api_key_list', 'GET', lambda: '/api/tasks?limit=20', None, True),
+        ('categories', 'GET', lambda: '/api/categories', None, False),
+        ('priorities', 'GET', lambda: '/api/priorities', None, False),
+        ('users', 'GET', lambda: '/api/auth/users', None, False),
+        # Writes last, so the reads all see the seeded data
+        ('create_task', 'POST', lambda: '/api/tasks', lambda: {'title': f'Benchmark task {rng.random():.6f}'}, False),
+        ('update_task', 'PUT', lambda: f'/api/tasks/{rng.choice(task_ids)}',
+         lambda: {'status': rng.choice(('todo', 'in_progress', 'done'))}, False),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(client, method, url, body, headers, requests, warmup):
+    timings = []
+    for i in range(warmup + requests):
+        kwargs = {'json': body()} if body else {}
+        started = time.perf_counter()
+        response = client.open(url(), method=method, headers=headers, **kwargs)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise SystemExit(f'{method} {url()} returned {response.status_code}: {response.get_data(as_text=True)[:200]}')
+        if i >= warmup:
+            timings.append(elapsed)
+    timings.sort()
+    return {
+        'requests': requests,
+        'rps': round(requests / sum(timings), 1),
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+    }
+
+
+def compare(results, baseline, thresholds):
+    """
+    Rows of (scenario, metric, baseline, current, change %, regressed) for the
+    scenarios in both runs. `thresholds` maps a metric to its allowed
+    slowdown in percent; metrics without one are reported but never regress.
+    """
+    rows = []
+    for name, current in results['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        for metric, direction in COMPARED:
+            change = (current[metric] - previous[metric]) / previous[metric] * 100 if previous[metric] else 0.0
+            threshold = thresholds.get(metric)
+            regressed = threshold is not None and change * direction > threshold
+            rows.append((name, metric, previous[metric], current[metric], change, regressed))
+    return rows
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', help='Seeded database URL (see backend.benchmarks.seed)')
+    parser.add_argument('--tasks', type=parse_count, default=10000,
+                        help='Without --database: tasks to seed into a temporary SQLite file')
+    parser.add_argument('--requests', type=int, default=300, help='Timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--scenario', action='append', help='Only run these scenarios (repeatable)')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Allowed p50 and throughput slowdown in percent (default: 10)')
+    parser.add_argument('--p99-threshold', type=float, help='Allowed p99 slowdown in percent (default: not checked)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    from backend.app import create_app
+    directory = tempfile.TemporaryDirectory()
+    database = args.database or f"sqlite:///{os.path.join(directory.name, 'bench.db')}"
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database
+        # The limiter would answer most of a tight loop with 429
+        RATE_LIMIT_ENABLED = False
+        METRICS_DIR = None
+
+    app = create_app(BenchConfig)
+    rng = random.Random(args.seed)
+    with app.app_context():
+        if not args.database:
+            with db.engine.connect() as connection:
+                seed(connection, args.tasks, random_seed=args.seed, log=lambda line: None)
+        agent = User.query.filter_by(email=AGENT_EMAIL).one_or_none()
+        if agent is None:
+            raise SystemExit('The database is not seeded; run python -m backend.benchmarks.seed first')
+        api_key = secrets.token_urlsafe(32)
+        agent.set_api_key(api_key)
+        db.session.commit()
+        task_count = db.session.query(Task).count()
+        task_ids = db.session.scalars(select(Task.id).limit(10000)).all()
+        category_ids = db.session.scalars(select(Category.id)).all()
+        priority_ids = db.session.scalars(select(Priority.id)).all()
+        dialect = db.engine.dialect.name
+        db.session.remove()
+
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'email': ADMIN_EMAIL, 'password': PASSWORD})
+    if response.status_code != 200:
+        raise SystemExit(f'Could not log in as {ADMIN_EMAIL}: {response.get_data(as_text=True)}')
+
+    results = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'database': dialect,
+            'tasks': task_count,
+            'requests': args.requests,
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+        },
+        'results': {},
+    }
+    print(f'{task_count:,} tasks on {dialect}, {args.requests} requests per scenario')
+    print(f"{'scenario':24} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, method, url, body, use_key in scenarios(rng, task_ids, category_ids, priority_ids):
+        if args.scenario and name not in args.scenario:
+            continue
+        headers = {'X-API-Key': api_key} if use_key else {}
+        result = run_scenario(client, method, url, body, headers, args.requests, args.warmup)
+        results['results'][name] = result
+        print(f"{name:24} {result['rps']:10.1f} {result['p50_ms']:10.2f} {result['p99_ms']:10.2f}")
+    directory.cleanup()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Wrote {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        thresholds = {'p50_ms': args.threshold, 'rps': args.threshold}
+        if args.p99_threshold is not None:
+            thresholds['p99_ms'] = args.p99_threshold
+        rows = compare(results, baseline, thresholds)
+        regressions = [row for row in rows if row[5]]
+        print(f"\nAgainst {args.baseline} (commit {baseline['meta'].get('commit')}, {baseline['meta'].get('tasks'):,} tasks), "
+              f'threshold {args.threshold:g}%')
+        for key in ('database', 'tasks', 'requests'):
+            if baseline['meta'].get(key) != results['meta'][key]:
+                print(f"Warning: the baseline has {key}={baseline['meta'].get(key)}, this run {results['meta'][key]}")
+        for name, metric, previous, current, change, regressed in rows:
+            marker = '  REGRESSION' if regressed else ''
+            print(f'{name:24} {metric:7} {previous:10.2f} -> {current:10.2f} {change:+7.1f}%{marker}')
+        if regressions:
+            print(f'{len(regressions)} regression(s)')
+            sys.exit(1)
+        print('No regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare the compiled task serializer against the marshmallow TaskSchema dump.
+
+Usage:
+    python -m backend.benchmarks.bench_serializers [--rows 20000] [--repeat 5]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from backend.models import User, Task, Category, Priority
+from backend.schemas import TaskSchema
+from backend.serializers import task_serializer
+
+
+def build_tasks(rows):
+    users = [User(id=i, name=f'User {i}', email=f'user{i}@example.com', is_admin=False,
+                  is_system_user=False, is_active=True, created_at=datetime(2026, 1, 1))
+             for i in range(1, 21)]
+    categories = [Category(id=i, name=f'Category {i}', color='#6366f1') for i in range(1, 6)]
+    priorities = [Priority(id=i, name=f'Priority {i}', level=i) for i in range(1, 4)]
+    now = datetime(2026, 2, 1)
+    tasks = []
+    for i in range(rows):
+        user, category, priority = users[i % 20], categories[i % 5], priorities[i % 3]
+        tasks.append(Task(
+            id=i + 1, title=f'Task {i}', description='Some *markdown* description ' * 4,
+            status=('todo', 'in_progress', 'done')[i % 3], rank=(i + 1) * 1000.0,
+            due_date=now + timedelta(days=i % 30), created_at=now, updated_at=now,
+            assignee=user, assignee_id=user.id, category=category, category_id=category.id,
+            priority=priority, priority_id=priority.id,
+        ))
+    return tasks
+
+
+def measure(dump, tasks, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dump(tasks)
+        best = min(best, time.perf_counter() - start)
+    return len(tasks) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    tasks = build_tasks(args.rows)
+    schema = TaskSchema(many=True)
+    assert task_serializer.dump(tasks, many=True) == schema.dump(tasks)
+
+    marshmallow_rate = measure(schema.dump, tasks, args.repeat)
+    compiled_rate = measure(task_serializer.dump_many, tasks, args.repeat)
+    print(f'marshmallow TaskSchema: {marshmallow_rate:12,.0f} rows/sec')
+    print(f'compiled serializer:    {compiled_rate:12,.0f} rows/sec')
+    print(f'speedup:                {compiled_rate / marshmallow_rate:12.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Measure application startup: import, create_app and the first request.
+
+Every run starts a fresh interpreter, as a Gunicorn worker spawn does. The
+database is created and migrated once up front, so the runs measure a
+normal boot against an up-to-date schema.
+
+Usage:
+    python -m backend.benchmarks.bench_startup [--runs 10] [--database sqlite:///...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs in the child interpreter; prints the phase timings as JSON
+CHILD = '''
+import json, time
+start = time.perf_counter()
+from backend.app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get('/health')
+assert response.status_code == 200, response.data
+done = time.perf_counter()
+print(json.dumps({'import': imported - start, 'create_app': created - imported,
+                  'first_request': done - created, 'total': done - start}))
+'''
+
+
+def boot(database):
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, DATABASE_URL=database, PYTHONPATH=root)
+    result = subprocess.run([sys.executable, '-c', CHILD], env=env, cwd=root,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--database', help='Database URL (default: a temporary SQLite file)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = args.database or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        boot(database)  # Creates the schema; not timed
+        runs = [boot(database) for _ in range(args.runs)]
+
+    for phase in ('import', 'create_app', 'first_request', 'total'):
+        values = sorted(run[phase] * 1000 for run in runs)
+        print(f'{phase:14} median {statistics.median(values):8.1f} ms   max {values[-1]:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Bulk task import from CSV or NDJSON (POST /api/tasks/import and
+`flask tasks import`).
+
+Rows are parsed as they are read and inserted `batch` at a time, one
+executemany INSERT and one commit per batch, so memory stays flat and a
+failure late in a large file does not undo the rows before it. Category,
+priority and assignee names are resolved through a lookup read once per
+import, ranks are assigned in Python from a single max(rank) query, and
+invalid rows are skipped and reported by line instead of failing the file.
+
+The CSV columns are those of the export, so an export imports back as a
+copy; `id` and `updated_at` are ignored.
+"""
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from backend.database import db
+from backend.events import record_event
+from backend.filters import TASK_STATUSES
+from backend.models import Task, User, Category, Priority
+from backend.ranking import RANK_STEP, next_rank
+
+IMPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+IMPORT_FIELDS = (
+    'title', 'description', 'status', 'due_date', 'rank', 'created_at',
+    'assignee', 'assignee_id', 'category', 'category_id', 'priority', 'priority_id',
+)
+# Export columns that have no meaning for a new task
+IGNORED_FIELDS = ('id', 'updated_at')
+
+TITLE_MAX_LENGTH = Task.__table__.c.title.type.length
+
+
+class ImportFormatError(ValueError):
+    """The input cannot be read at all (as opposed to one bad row)"""
+
+
+def _check_fields(fields):
+    unknown = [name for name in fields if name not in IMPORT_FIELDS + IGNORED_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field: {', '.join(unknown)}")
+
+
+def read_rows(text, import_format):
+    """
+    Yield (line, record) from a text stream; a record is a dict, or the
+    ValueError explaining why the line could not be parsed.
+    """
+    if import_format == 'csv':
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise ImportFormatError('The CSV has no header row')
+        try:
+            _check_fields(reader.fieldnames)
+        except ValueError as e:
+            raise ImportFormatError(str(e))
+        for record in reader:
+            if None in record:
+                yield reader.line_num, ValueError('More values than columns')
+            else:
+                yield reader.line_num, {name: value or None for name, value in record.items()}
+        return
+
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, ValueError('Invalid JSON')
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ValueError('Each line must be a JSON object')
+        else:
+            yield line_number, record
+
+
+class ReferenceLookup:
+    """Ids of users, categories and priorities by id and by name, read once per import"""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = {}
+        for kind, model in (('category', Category), ('priority', Priority)):
+            rows = db.session.query(model.id, model.name).all()
+            self.ids[kind] = {row.id for row in rows}
+            self.names[kind] = {row.name.casefold(): row.id for row in rows}
+        users = db.session.query(User.id, User.name, User.email).all()
+        self.ids['assignee'] = {row.id for row in users}
+        names = {}
+        for row in users:
+            # A name shared by several users cannot be resolved; the email always can
+            key = row.name.casefold()
+            names[key] = None if key in names else row.id
+        names.update((row.email.casefold(), row.id) for row in users)
+        self.names['assignee'] = names
+
+    def resolve(self, kind, record):
+        """The id given by `<kind>_id` or by name (`<kind>`), or None when neither is set"""
+        value, name = record.get(f'{kind}_id'), record.get(kind)
+        if value is not None and name is not None:
+            raise ValueError(f'Use either {kind} or {kind}_id')
+        if value is not None:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f'{kind}_id must be an integer')
+            if value not in self.ids[kind]:
+                raise ValueError(f'Unknown {kind}_id: {value}')
+            return value
+        if name is None:
+            return None
+        key = str(name).strip().casefold()
+        if key not in self.names[kind]:
+            raise ValueError(f'Unknown {kind}: {name}')
+        if self.names[kind][key] is None:
+            raise ValueError(f'Ambiguous {kind}: {name}. Use the email or {kind}_id')
+        return self.names[kind][key]
+
+
+def _parse_datetime(name, value):
+    if isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        except ValueError:
+            moment = None
+        if moment is not None:
+            if moment.tzinfo is not None:
+                # Stored datetimes are naive UTC
+                moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+            return moment
+    raise ValueError(f'{name} must be an ISO date or datetime')
+
+
+def task_values(record, lookup, now, default_assignee=None):
+    """Validate one record into the column values of a new task (rank may be None)"""
+    _check_fields(record)
+    title = record.get('title')
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError('title is required')
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ValueError(f'title is longer than {TITLE_MAX_LENGTH} characters')
+    status = record.get('status') or 'todo'
+    if status not in TASK_STATUSES:
+        raise ValueError(f"Unknown status: {status}. Use one of {', '.join(TASK_STATUSES)}")
+    rank = record.get('rank')
+    if rank is not None:
+        try:
+            rank = float(rank)
+        except (TypeError, ValueError):
+            raise ValueError('rank must be a number')
+    description = record.get('description')
+    if description is not None and not isinstance(description, str):
+        raise ValueError('description must be a string')
+
+    assignee_id = lookup.resolve('assignee', record)
+    due_date, created_at = record.get('due_date'), record.get('created_at')
+    return {
+        'title': title,
+        'description': description,
+        'status': status,
+        'due_date': _parse_datetime('due_date', due_date) if due_date is not None else None,
+        'rank': rank,
+        'assignee_id': default_assignee if assignee_id is None else assignee_id,
+        'category_id': lookup.resolve('category', record),
+        'priority_id': lookup.resolve('priority', record),
+        'created_at': _parse_datetime('created_at', created_at) if created_at is not None else now,
+        'updated_at': now,
+    }
+
+
+class ImportReport:
+    """Counts of imported and failed rows, with the first `max_errors` failures by line"""
+
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'error': message})
+
+    def to_dict(self):
+        return {'imported': self.imported, 'failed': self.failed, 'errors': self.errors}
+
+
+def _insert_batch(batch, report):
+    """
+    Insert one batch of (line, values) in its own transaction. If the batch
+    fails, its rows are retried one by one in savepoints so only the bad rows
+    are reported.
+    """
+    try:
+        db.session.execute(insert(Task), [values for _, values in batch])
+        db.session.commit()
+        report.imported += len(batch)
+        return
+    except SQLAlchemyError:
+        db.session.rollback()
+    for line, values in batch:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Task), [values])
+            report.imported += 1
+        except SQLAlchemyError as e:
+            report.fail(line, str(getattr(e, 'orig', None) or e))
+    db.session.commit()
+
+
+def import_tasks(rows, batch_size, max_errors=100, default_assignee=None):
+    """
+    Import the (line, record) pairs of read_rows. Tasks without a rank are
+    appended to the end of the list in file order. Returns an ImportReport.
+    """
+    report = ImportReport(max_errors)
+    lookup = ReferenceLookup()
+    now = datetime.utcnow()
+    rank = next_rank() - RANK_STEP
+    batch = []
+    try:
+        for line, record in rows:
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                values = task_values(record, lookup, now, default_assignee)
+            except ValueError as e:
+                report.fail(line, str(e))
+                continue
+            if values['rank'] is None:
+                rank += RANK_STEP
+                values['rank'] = rank
+            batch.append((line, values))
+            if len(batch) >= batch_size:
+                _insert_batch(batch, report)
+                batch = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Unreadable from here on; keep what was read so far
+        report.fail(None, f'Input could not be read past this point: {e}')
+    if batch:
+        _insert_batch(batch, report)
+    if report.imported:
+        # Too many rows for one event; stream clients reload instead
+        record_event('reset', {})
+        db.session.commit()
+    return report
+
+
+def text_stream(binary):
+    """Decode a binary stream as UTF-8 (a leading BOM is skipped) for read_rows"""
+    return io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
@@ -0,0 +1,70 @@
+"""
+In-process cache of pre-serialized JSON for rarely changing reference data
+and for task statistics.
+
+Entries are stamped with the data versions of the tables they were built
+from. Writes bump those versions (see backend.versioning), so a stale entry
+is detected on the next read in every worker. The versions are already read
+once per request for the ETag, so a hit costs no extra SQL and no
+serialization. A TTL bounds the lifetime of every entry as a safety net.
+"""
+import threading
+import time
+from flask import current_app
+from backend.versioning import request_versions
+
+
+class VersionedCache:
+    def __init__(self, ttl=300, maxsize=128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def configure(self, ttl):
+        with self._lock:
+            self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, key, stamp):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_stamp, expires_at, value = entry
+            if entry_stamp != stamp or expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, stamp, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                # Reference data has a handful of keys; dropping the oldest insert is enough
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (stamp, time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+reference_cache = VersionedCache()
+# Task statistics, keyed by day and date range; any task write invalidates them
+stats_cache = VersionedCache()
+
+
+def cached_json_response(key, tables, build, cache=reference_cache):
+    """
+    Return a JSON response for `build()`, serving the cached bytes while the
+    versions of `tables` are unchanged.
+    """
+    versions = request_versions(*tables)
+    stamp = tuple(versions[name] for name in tables)
+    body = cache.get(key, stamp)
+    if body is None:
+        body = current_app.json.response(build()).get_data()
+        cache.set(key, stamp, body)
+    return current_app.response_class(body, mimetype='application/json')
@@ -0,0 +1,111 @@
+"""
+Delta sync support: tombstones for deleted tasks and the `since` query.
+
+Changed tasks are found through the indexed `task.updated_at`; deletions
+leave a row in `task_tombstone`, written in the same transaction by the
+session hooks below so every delete path (single, batch, bulk) is covered.
+
+Watermarks are server timestamps taken before the query runs. Each delta
+re-reads a short overlap window before the watermark, so a write that
+committed late with a slightly older timestamp is still picked up; clients
+apply changes by id, so the occasional repeat is harmless.
+"""
+import base64
+from datetime import datetime, timedelta
+from sqlalchemy import event, select, insert, update, delete
+from sqlalchemy.orm import Session
+from backend.database import db
+from backend.models import Task, TaskTombstone
+
+SYNC_OVERLAP = timedelta(seconds=5)
+
+tombstone = TaskTombstone.__table__
+
+
+class WatermarkExpired(Exception):
+    pass
+
+
+def new_watermark():
+    """Opaque watermark for the current moment"""
+    stamp = datetime.utcnow().isoformat()
+    return base64.urlsafe_b64encode(stamp.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def parse_watermark(watermark):
+    try:
+        padded = watermark + '=' * (-len(watermark) % 4)
+        return datetime.fromisoformat(base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii'))
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid watermark')
+
+
+def _record_tombstones(connection, task_ids):
+    if task_ids:
+        now = datetime.utcnow()
+        connection.execute(insert(tombstone), [{'task_id': task_id, 'deleted_at': now} for task_id in task_ids])
+
+
+@event.listens_for(Session, 'after_flush')
+def _tombstones_after_flush(session, flush_context):
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Task)]
+    _record_tombstones(session.connection(), deleted)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _tombstones_before_bulk_delete(orm_execute_state):
+    # delete(Task).where(...) bypasses the flush; find the ids it will remove first
+    if not orm_execute_state.is_delete:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not Task:
+        return
+    statement = orm_execute_state.statement
+    query = select(Task.id)
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    connection = orm_execute_state.session.connection()
+    _record_tombstones(connection, connection.execute(query).scalars().all())
+
+
+def touch_tasks_assigned_to(user_id):
+    """
+    Mark a user's tasks as changed, for writes to the user that show up in
+    the nested `assignee` of every task they are assigned.
+    """
+    db.session.execute(
+        update(Task).where(Task.assignee_id == user_id).values(updated_at=datetime.utcnow()),
+        execution_options={'synchronize_session': False}
+    )
+
+
+def changes_since(watermark, query, limit, retention):
+    """
+    Return (tasks, deleted_ids) changed after `watermark`.
+    `query` is the task query to filter (with loader options applied).
+    Raises WatermarkExpired when the watermark is older than the tombstone
+    `retention` period or more than `limit` tasks changed; the client should
+    then do a full sync.
+    """
+    since = parse_watermark(watermark) - SYNC_OVERLAP
+    if since < datetime.utcnow() - retention:
+        raise WatermarkExpired()
+
+    tasks = (query.filter(Task.updated_at > since)
+             .order_by(Task.updated_at, Task.id)
+             .limit(limit + 1).all())
+    if len(tasks) > limit:
+        raise WatermarkExpired()
+
+    deleted = (db.session.query(TaskTombstone.task_id)
+               .filter(TaskTombstone.deleted_at > since)
+               .distinct().all())
+    live = {task.id for task in tasks}
+    return tasks, [row.task_id for row in deleted if row.task_id not in live]
+
+
+def prune_tombstones(older_than):
+    """Delete tombstones older than `older_than`; returns the number removed"""
+    result = db.session.execute(delete(tombstone).where(tombstone.c.deleted_at < older_than))
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,171 @@
+"""
+Gzip compression of API responses.
+
+Task lists and exports are repetitive JSON/CSV that shrink 5-10x. A response
+is compressed when the client sends `Accept-Encoding: gzip`, its type is
+textual and its body is at least GZIP_MIN_SIZE bytes; smaller bodies fit in
+a packet or two anyway, so compressing them only costs CPU.
+
+- Streamed responses (the export) are compressed chunk by chunk with a sync
+  flush, so every chunk still reaches the client as soon as it is written and
+  memory stays flat.
+- Event streams are left alone: events are tiny and must not wait in a
+  compressor buffer.
+- A body with an ETag is fixed for that validator (see conditional_on), so
+  its compressed bytes are cached per worker, keyed by the ETag. Polling an
+  unchanged list costs no compression even when the client has no cache.
+
+Per-worker counters (bytes in and out, CPU time, cache hits) are reported by
+GET /health.
+"""
+import gzip
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from flask import request, current_app
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'text/csv', 'text/html', 'text/plain', 'text/css', 'image/svg+xml',
+}
+
+
+class CompressedCache:
+    """LRU map of ETag -> gzipped body, bounded by the total size of the bodies"""
+
+    def __init__(self, maxbytes=16 * 1024 * 1024):
+        self.maxbytes = maxbytes
+        self._bodies = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def configure(self, maxbytes):
+        with self._lock:
+            self.maxbytes = maxbytes
+            self._bodies.clear()
+            self._size = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        if len(body) > self.maxbytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._bodies[key] = body
+            self._size += len(body)
+            while self._size > self.maxbytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class CompressionStats:
+    """Counters for this worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.responses = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def record(self, bytes_in, bytes_out, cpu_seconds=0.0, cache_hit=False):
+        with self._lock:
+            self.responses += 1
+            self.cache_hits += cache_hit
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_seconds += cpu_seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'responses': self.responses,
+                'cache_hits': self.cache_hits,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None,
+                'cpu_seconds': round(self.cpu_seconds, 6),
+            }
+
+
+compressed_cache = CompressedCache()
+compression_stats = CompressionStats()
+
+
+def init_app(app):
+    compressed_cache.configure(app.config['GZIP_CACHE_BYTES'])
+    app.after_request(compress_response)
+
+
+def gzip_stream(chunks, level):
+    """Gzip an iterable of bytes, flushing after every chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    bytes_in = bytes_out = 0
+    cpu_seconds = 0.0
+    for chunk in chunks:
+        started = time.thread_time()
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        cpu_seconds += time.thread_time() - started
+        bytes_in += len(chunk)
+        bytes_out += len(data)
+        yield data
+    data = compressor.flush()
+    bytes_out += len(data)
+    yield data
+    compression_stats.record(bytes_in, bytes_out, cpu_seconds)
+
+
+def compress_response(response):
+    level = current_app.config['GZIP_LEVEL']
+    if (not level or request.method == 'HEAD'
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    # The body depends on Accept-Encoding from here on, whatever this client sent
+    response.vary.add('Accept-Encoding')
+    if request.accept_encodings['gzip'] <= 0:
+        return response
+
+    if response.is_streamed:
+        original = response.response
+        response.response = gzip_stream(response.iter_encoded(), level)
+        # Closing the original iterable ends stream_with_context and releases its session
+        if hasattr(original, 'close'):
+            response.call_on_close(original.close)
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+    body = response.get_data()
+    if len(body) < current_app.config['GZIP_MIN_SIZE']:
+        return response
+    etag, _ = response.get_etag()
+    compressed = compressed_cache.get(etag) if etag else None
+    if compressed is not None:
+        compression_stats.record(len(body), len(compressed), cache_hit=True)
+    else:
+        started = time.thread_time()
+        compressed = gzip.compress(body, compresslevel=level, mtime=0)
+        cpu_seconds = time.thread_time() - started
+        if len(compressed) >= len(body):
+            return response
+        compression_stats.record(len(body), len(compressed), cpu_seconds)
+        if etag:
+            compressed_cache.set(etag, compressed)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
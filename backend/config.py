@@ -1,9 +1,83 @@
 import os
+import tempfile
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
 
 load_dotenv()
 
+def engine_options(config, database_uri=None):
+    """
+    Engine options for `database_uri` (default: the primary) built from the
+    DB_* settings. In-memory SQLite runs on one shared connection, so it only
+    gets pre-ping.
+    """
+    url = make_url(database_uri or config['SQLALCHEMY_DATABASE_URI'])
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+    options.update(
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        pool_recycle=config['DB_POOL_RECYCLE'],
+        pool_timeout=config['DB_POOL_TIMEOUT'],
+    )
+    timeout = config['DB_STATEMENT_TIMEOUT_MS']
+    if timeout and url.get_backend_name() == 'mysql':
+        # max_execution_time caps SELECTs; writes are bounded by lock waits instead
+        options['connect_args'] = {'init_command': f'SET SESSION max_execution_time = {int(timeout)}'}
+    return options
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///tasktracker.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional read replica for GET requests; writers stay on the primary for the sticky window
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    REPLICA_STICKY_STORAGE = os.environ.get('REPLICA_STICKY_STORAGE') or os.path.join(tempfile.gettempdir(), 'task-tracker-sticky.sqlite')
+    # Pool settings apply per worker process; SQLALCHEMY_ENGINE_OPTIONS is built from them
+    # in create_app unless a config class sets it explicitly
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    # Token buckets per client and endpoint class, as "<tokens per second>:<burst>" (empty: unlimited).
+    # The SQLite file is shared by the workers of one host; 'memory' keeps buckets per worker
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE') or os.path.join(tempfile.gettempdir(), 'task-tracker-ratelimit.sqlite')
+    RATE_LIMIT_READ = os.environ.get('RATE_LIMIT_READ', '20:200')
+    RATE_LIMIT_WRITE = os.environ.get('RATE_LIMIT_WRITE', '5:50')
+    RATE_LIMIT_AUTH = os.environ.get('RATE_LIMIT_AUTH', '0.1:10')
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted for the client address
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    # GET /metrics and Server-Timing. Workers write snapshots to METRICS_DIR, which /metrics sums;
+    # without it only the answering worker is reported
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'task-tracker-metrics'))
+    METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 1.0))
+    METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes')
+    # Requests a worker handles at once before answering 503 (0: no limit)
+    RATE_LIMIT_MAX_IN_FLIGHT = int(os.environ.get('RATE_LIMIT_MAX_IN_FLIGHT', 100))
+    API_KEY_CACHE_SIZE = int(os.environ.get('API_KEY_CACHE_SIZE', 256))
+    API_KEY_CACHE_TTL = int(os.environ.get('API_KEY_CACHE_TTL', 300))
+    TASKS_DEFAULT_PAGE_SIZE = int(os.environ.get('TASKS_DEFAULT_PAGE_SIZE', 500))
+    TASKS_MAX_PAGE_SIZE = int(os.environ.get('TASKS_MAX_PAGE_SIZE', 1000))
+    REFERENCE_CACHE_TTL = int(os.environ.get('REFERENCE_CACHE_TTL', 300))
+    TASK_STATS_CACHE_TTL = int(os.environ.get('TASK_STATS_CACHE_TTL', 300))
+    # Rows fetched per round trip, and per chunk written, by GET /api/tasks/export
+    TASK_EXPORT_BATCH_SIZE = int(os.environ.get('TASK_EXPORT_BATCH_SIZE', 1000))
+    # Gzip for responses of at least GZIP_MIN_SIZE bytes; GZIP_LEVEL 0 leaves compression to the proxy
+    GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+    GZIP_MIN_SIZE = int(os.environ.get('GZIP_MIN_SIZE', 1024))
+    GZIP_CACHE_BYTES = int(os.environ.get('GZIP_CACHE_BYTES', 16 * 1024 * 1024))
+    # Rows per INSERT and transaction for imports, and how many row errors are reported
+    TASK_IMPORT_BATCH_SIZE = int(os.environ.get('TASK_IMPORT_BATCH_SIZE', 1000))
+    TASK_IMPORT_MAX_ERRORS = int(os.environ.get('TASK_IMPORT_MAX_ERRORS', 100))
+    TASKS_BATCH_MAX_OPERATIONS = int(os.environ.get('TASKS_BATCH_MAX_OPERATIONS', 500))
+    TASK_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TASK_TOMBSTONE_RETENTION_DAYS', 30))
+    TASK_EVENTS_POLL_INTERVAL = float(os.environ.get('TASK_EVENTS_POLL_INTERVAL', 1.0))
+    TASK_EVENTS_HEARTBEAT = int(os.environ.get('TASK_EVENTS_HEARTBEAT', 15))
+    TASK_EVENTS_REPLAY_LIMIT = int(os.environ.get('TASK_EVENTS_REPLAY_LIMIT', 1000))
+    TASK_EVENT_RETENTION_HOURS = int(os.environ.get('TASK_EVENT_RETENTION_HOURS', 24))
@@ -1,11 +1,40 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import DeclarativeBase, Session
 from flask_marshmallow import Marshmallow
 from flask_login import LoginManager
 
 class Base(DeclarativeBase):
     pass
 
-db = SQLAlchemy(model_class=Base)
+# Session.info keys used by the replica routing in backend/replica.py
+READ_REPLICA = 'read_replica'
+WROTE = 'wrote'
+
+class RoutingSession(FlaskSession):
+    """
+    Session that sends reads to the `replica` bind while info[READ_REPLICA] is set.
+    The first write (a flush or a DML statement) clears it, so the rest of the
+    request, reads included, stays on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(READ_REPLICA):
+            if self._flushing or getattr(clause, 'is_dml', False):
+                self.info[READ_REPLICA] = False
+                self.info[WROTE] = True
+            else:
+                return self._db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+# Registered before the versioning and tombstone hooks, which take session.connection() for their own writes
+@event.listens_for(Session, 'do_orm_execute')
+def _writes_use_primary(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[READ_REPLICA] = False
+        orm_execute_state.session.info[WROTE] = True
+
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
 ma = Marshmallow()
 login_manager = LoginManager()
@@ -0,0 +1,12 @@
+#!/bin/sh
+# Bring the schema up to date, then start the server. The app itself only
+# checks the schema version on boot and never runs DDL on an existing database.
+# With several replicas, run `flask migrations upgrade` once as a deploy step
+# instead and set MIGRATE_ON_START=0, so the replicas do not race each other.
+set -e
+
+if [ "${MIGRATE_ON_START:-1}" != "0" ]; then
+    flask --app 'app:create_app()' migrations upgrade
+fi
+
+exec "$@"
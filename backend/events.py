@@ -0,0 +1,194 @@
+"""
+Task change events for the Server-Sent Events stream.
+
+Task mutation routes record compact events in `task_event`, in the same
+transaction as the change, so every worker can see them. Each worker process
+runs a single EventHub poller that reads new events and fans them out to its
+in-process subscribers; idle stream connections never touch the database.
+
+The hub only uses `threading` primitives. The Dockerfile runs Gunicorn with
+the gevent worker, which patches them, so each open stream is a greenlet
+rather than a whole worker or OS thread.
+
+Pruning deletes old events, so it also records the highest pruned id in
+`data_version` under PRUNED_MARKER. A client resuming from before that
+horizon is sent `reset`; gaps left by rolled-back inserts are never mistaken
+for pruned events.
+"""
+import json
+import threading
+import time
+from collections import deque
+from backend.database import db
+from backend.models import TaskEvent, DataVersion
+
+PRUNED_MARKER = 'task_event_pruned'
+
+
+def record_event(kind, payload):
+    """Add a change event to the current transaction"""
+    db.session.add(TaskEvent(kind=kind, data=json.dumps(payload, separators=(',', ':'))))
+
+
+def format_event(event_id, kind, data):
+    """Serialize one event in the text/event-stream wire format"""
+    return f'id: {event_id}\nevent: {kind}\ndata: {data}\n\n'
+
+
+def fetch_events(after_id, limit):
+    """Events with id > after_id, oldest first, as (id, kind, data) tuples"""
+    rows = (db.session.query(TaskEvent.id, TaskEvent.kind, TaskEvent.data)
+            .filter(TaskEvent.id > after_id)
+            .order_by(TaskEvent.id)
+            .limit(limit).all())
+    return [tuple(row) for row in rows]
+
+
+def pruned_through():
+    """Highest event id removed by prune_events (0 if none)"""
+    row = db.session.get(DataVersion, (PRUNED_MARKER, 0))
+    return row.version if row else 0
+
+
+def latest_event_id():
+    """Id of the newest event, still known after it has been pruned"""
+    latest = db.session.query(db.func.max(TaskEvent.id)).scalar() or 0
+    return max(latest, pruned_through())
+
+
+class Subscription:
+    def __init__(self, hub, after_id, maxlen):
+        self.hub = hub
+        self.after_id = after_id
+        self.last_id = after_id
+        self.queue = deque()
+        self.maxlen = maxlen
+        self.overflowed = False
+        self.ready = threading.Event()
+
+    def push(self, events):
+        for event in events:
+            # The hub never delivers an id twice, so only the starting point is filtered
+            if event[0] <= self.after_id:
+                continue
+            self.last_id = max(self.last_id, event[0])
+            if self.overflowed:
+                continue
+            if len(self.queue) >= self.maxlen:
+                # A subscriber this far behind is told to resync instead
+                self.overflowed = True
+                self.queue.clear()
+                continue
+            self.queue.append(event)
+        self.ready.set()
+
+    def wait(self, timeout):
+        """Return the queued events, waiting up to `timeout` seconds for some"""
+        if not self.queue and not self.overflowed:
+            self.ready.wait(timeout)
+        self.ready.clear()
+        events = list(self.queue)
+        self.queue.clear()
+        return events
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    """
+    One poller per process, fanning events out to local subscribers.
+
+    `fetch(after_id, limit)` returns new events; the poller re-reads a short
+    window of ids behind its cursor because auto-increment ids can commit out
+    of order, and drops ids it has already delivered.
+    """
+
+    def __init__(self, fetch, interval=1.0, batch_size=500, buffer_size=1000, overlap=100):
+        self.fetch = fetch
+        self.interval = interval
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.recent = deque(maxlen=buffer_size)
+        self._delivered = set()
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._cursor = None
+        self._thread = None
+
+    def subscribe(self, after_id, maxlen=1000):
+        subscription = Subscription(self, after_id, maxlen)
+        with self._lock:
+            if self._cursor is None or after_id < self._cursor and not self._subscribers:
+                self._cursor = after_id
+            # Catch up from events this process has already polled
+            subscription.push([event for event in self.recent if event[0] > after_id])
+            self._subscribers.add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='task-event-hub', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def poll_once(self):
+        with self._lock:
+            cursor = self._cursor or 0
+        events = [event for event in self.fetch(max(cursor - self.overlap, 0), self.batch_size)
+                  if event[0] not in self._delivered]
+        if not events:
+            return 0
+        with self._lock:
+            for event in events:
+                if len(self.recent) == self.recent.maxlen:
+                    self._delivered.discard(self.recent[0][0])
+                self.recent.append(event)
+                self._delivered.add(event[0])
+            self._cursor = max(cursor, events[-1][0])
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.push(events)
+        return len(events)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                if self.poll_once() >= self.batch_size:
+                    continue
+            except Exception:
+                pass  # Database hiccup: keep the stream alive and retry
+            time.sleep(self.interval)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub(app):
+    """The process-wide hub, polling through `app`'s database"""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            def fetch(after_id, limit):
+                with app.app_context():
+                    return fetch_events(after_id, limit)
+            _hub = EventHub(fetch, interval=app.config['TASK_EVENTS_POLL_INTERVAL'])
+        return _hub
+
+
+def prune_events(older_than):
+    """Delete events older than `older_than`; returns the number removed"""
+    old = TaskEvent.query.filter(TaskEvent.created_at < older_than)
+    horizon = old.with_entities(db.func.max(TaskEvent.id)).scalar()
+    if horizon is None:
+        return 0
+    count = old.delete(synchronize_session=False)
+    db.session.merge(DataVersion(name=PRUNED_MARKER, shard=0, version=max(horizon, pruned_through())))
+    db.session.commit()
+    return count
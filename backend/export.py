@@ -0,0 +1,54 @@
+"""
+Chunked NDJSON and CSV encoders for the task export.
+
+Both take an iterator of rows (a yield_per query) and emit one string per
+`batch` rows, plus the CSV header up front, so the client sees bytes as soon
+as the first batch is read and nothing holds more than a batch.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def ndjson_chunks(rows, serializer, batch):
+    """One JSON object per line, serialized like the task list"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(serializer.dump_one(row), separators=(',', ':')))
+        if len(lines) >= batch:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def csv_chunks(rows, columns, batch):
+    """A header row, then the rows; NULL is an empty field"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    count = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        count += 1
+        if count >= batch:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if count:
+        yield buffer.getvalue()
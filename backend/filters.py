@@ -0,0 +1,178 @@
+"""
+Filters and sort orders for task lists (GET /api/tasks and the export).
+
+Every filter becomes a WHERE clause, so the database does the work that
+clients used to do after downloading the whole table. Malformed values and
+unknown parameters raise ValueError, which the routes answer with 400
+instead of silently ignoring them.
+"""
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import or_
+from backend.models import Task, Priority
+
+TASK_STATUSES = ('todo', 'in_progress', 'done')
+
+# Parameters that narrow the list; `since` delta sync cannot be combined with them
+FILTER_PARAMS = (
+    'status', 'assignee_id', 'category_id', 'priority_id', 'due_within_days',
+    'due_from', 'due_to', 'created_from', 'created_to', 'updated_from', 'updated_to',
+    'q', 'prefix',
+)
+
+RANGE_FILTERS = {
+    'due': Task.due_date,
+    'created': Task.created_at,
+    'updated': Task.updated_at,
+}
+
+
+class TaskSort:
+    """
+    An ORDER BY over `columns`, ending with Task.id so keyset pages are stable.
+    Positions in `descending` sort DESC. `join` names a related table the
+    order needs.
+    """
+
+    def __init__(self, columns, descending=(), join=None):
+        self.columns = tuple(columns)
+        self.descending = tuple(descending)
+        self.join = join
+
+    def order_by(self, columns=None):
+        columns = self.columns if columns is None else columns
+        offset = len(self.columns) - len(columns)
+        return [column.desc() if i + offset in self.descending else column
+                for i, column in enumerate(columns)]
+
+
+def _date_sort(column, descending):
+    # The id follows the direction so MySQL can scan the (column, id) index backwards
+    return TaskSort((column, Task.id), descending=(0, 1) if descending else ())
+
+
+# Whitelisted `sort` values. Each is served by an index on the task table
+# (status_group/rank, due_date, created_at, updated_at; InnoDB and SQLite
+# append the primary key to every index), except priority, which orders by the
+# level on the small priority table.
+DEFAULT_SORT = 'rank'
+SORTS = {
+    # Status (done last, through the generated status_group column), then rank for drag-and-drop
+    'rank': TaskSort((Task.status_group, Task.rank, Task.id)),
+    'due_date': _date_sort(Task.due_date, False),
+    '-due_date': _date_sort(Task.due_date, True),
+    'created_at': _date_sort(Task.created_at, False),
+    '-created_at': _date_sort(Task.created_at, True),
+    'updated_at': _date_sort(Task.updated_at, False),
+    '-updated_at': _date_sort(Task.updated_at, True),
+    # Most critical first; tasks without a priority last, then in list order
+    'priority': TaskSort((Priority.level, Task.status_group, Task.rank, Task.id), descending=(0,), join=Priority),
+}
+
+
+def check_params(args, allowed):
+    """Reject query parameters the endpoint does not know"""
+    for name in args:
+        if name not in allowed:
+            raise ValueError(f'Unknown parameter: {name}')
+
+
+def _split(name, value):
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    if not items:
+        raise ValueError(f'{name} must not be empty')
+    return items
+
+
+def _id_filter(column, name, value, me=None):
+    """`1,2`, `none` for unset, and for assignee_id `me`"""
+    ids, unset = [], False
+    for item in _split(name, value):
+        if item == 'none':
+            unset = True
+        elif item == 'me' and me is not None:
+            ids.append(me)
+        else:
+            try:
+                ids.append(int(item))
+            except ValueError:
+                allowed = "ids, 'me' or 'none'" if me is not None else "ids or 'none'"
+                raise ValueError(f'{name} must be a comma-separated list of {allowed}')
+    clauses = [column.in_(ids)] if ids else []
+    if unset:
+        clauses.append(column.is_(None))
+    return or_(*clauses)
+
+
+def _parse_bound(name, value, upper):
+    """
+    A date (YYYY-MM-DD, a whole UTC day) or ISO datetime, as (datetime, inclusive).
+    A date upper bound covers the whole day.
+    """
+    try:
+        if len(value) == 10:
+            day = datetime.strptime(value, '%Y-%m-%d')
+            return (day + timedelta(days=1), False) if upper else (day, True)
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD) or an ISO datetime')
+    if moment.tzinfo is not None:
+        # Stored datetimes are naive UTC
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment, True
+
+
+def parse_statuses(args):
+    """The statuses requested by `status` (a comma-separated list), or None"""
+    value = args.get('status')
+    if not value:
+        return None
+    statuses = _split('status', value)
+    for status in statuses:
+        if status not in TASK_STATUSES:
+            raise ValueError(f"Unknown status: {status}. Use one of {', '.join(TASK_STATUSES)}")
+    return statuses
+
+
+def parse_task_filters(args, user_id):
+    """
+    Translate the filter parameters into WHERE clauses.
+    Returns (criteria, statuses); statuses is None when not filtered by status.
+    """
+    criteria = []
+    statuses = parse_statuses(args)
+    if statuses:
+        criteria.append(Task.status == statuses[0] if len(statuses) == 1 else Task.status.in_(statuses))
+
+    if args.get('assignee_id'):
+        criteria.append(_id_filter(Task.assignee_id, 'assignee_id', args['assignee_id'], me=user_id))
+    for name, column in (('category_id', Task.category_id), ('priority_id', Task.priority_id)):
+        if args.get(name):
+            criteria.append(_id_filter(column, name, args[name]))
+
+    # Tasks due within N days, overdue ones included; tasks without a due date excluded
+    due_within_days = args.get('due_within_days')
+    if due_within_days:
+        try:
+            days = int(due_within_days)
+        except ValueError:
+            raise ValueError('due_within_days must be an integer')
+        # The IS NOT NULL bound gives the planner a closed range on ix_task_due_date
+        criteria.append(Task.due_date.isnot(None))
+        criteria.append(Task.due_date <= datetime.utcnow().date() + timedelta(days=days))
+
+    for prefix, column in RANGE_FILTERS.items():
+        lower, upper = args.get(f'{prefix}_from'), args.get(f'{prefix}_to')
+        if lower:
+            bound, inclusive = _parse_bound(f'{prefix}_from', lower, upper=False)
+            criteria.append(column >= bound if inclusive else column > bound)
+        if upper:
+            bound, inclusive = _parse_bound(f'{prefix}_to', upper, upper=True)
+            criteria.append(column <= bound if inclusive else column < bound)
+    return criteria, statuses
+
+
+def parse_sort(args, default=DEFAULT_SORT):
+    name = args.get('sort') or default
+    if name not in SORTS:
+        raise ValueError(f"Unknown sort: {name}. Use one of {', '.join(SORTS)}")
+    return SORTS[name]
@@ -0,0 +1,64 @@
+"""
+SQLite files shared by the workers of one host.
+
+Rate limit buckets and read-your-writes deadlines must be seen by every
+worker on the host, but they are disposable and too hot for the main
+database. The data is not synced to disk.
+
+Each process keeps one connection per file, guarded by a lock. Under the
+gevent worker a thread-local would be per greenlet, that is per request.
+The busy timeout is short, because SQLite's busy wait blocks the whole
+process. Callers treat sqlite3.Error as "no answer" and carry on.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+BUSY_TIMEOUT = 0.1
+
+
+class HostFile:
+    """One SQLite file; `schema` holds its CREATE ... IF NOT EXISTS statements"""
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+
+    def _connect(self):
+        # A forked worker must not reuse its parent's connection
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                         check_same_thread=False)
+            try:
+                connection.execute('PRAGMA journal_mode = WAL')
+                connection.execute('PRAGMA synchronous = OFF')
+                for statement in self.schema:
+                    connection.execute(statement)
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    @contextmanager
+    def transaction(self):
+        """A write transaction; IMMEDIATE takes the write lock up front, so concurrent ones serialize"""
+        with self._lock:
+            connection = self._connect()
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                yield connection
+                connection.execute('COMMIT')
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                raise
+
+    def fetchone(self, sql, parameters=()):
+        """One row of a read, outside any write transaction"""
+        with self._lock:
+            return self._connect().execute(sql, parameters).fetchone()
@@ -0,0 +1,379 @@
+"""
+Request metrics in the Prometheus text format (GET /metrics) and a
+Server-Timing header on every response.
+
+Each worker keeps its counters and histograms in memory; the request hooks
+only update dicts. A daemon thread writes a snapshot to
+METRICS_DIR/<pid>-<start>.json every METRICS_FLUSH_SECONDS, and /metrics
+sums the snapshots of every worker on the host, so any worker can answer a
+scrape. Counters of workers that have exited are folded into
+`archive.json` and keep counting, so totals never go backwards when
+Gunicorn recycles a worker; their gauges are dropped. Without METRICS_DIR
+only the answering worker is reported (development, tests).
+
+Durations are measured until the response headers are ready, so a streamed
+body (events, export) is not included, and its bytes are not counted.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import request, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import fcntl
+except ImportError:  # Windows: exited workers' files are kept instead of archived
+    fcntl = None
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    'http_request_duration_seconds': ('histogram', 'Time until the response headers are ready, by route and status', DURATION_BUCKETS),
+    'http_response_bytes_total': ('counter', 'Response body bytes sent, after compression (streamed bodies excluded)', None),
+    'db_queries_per_request': ('histogram', 'SQL statements executed per request', QUERY_BUCKETS),
+    'db_query_seconds_total': ('counter', 'Time spent executing SQL statements', None),
+    'serialization_seconds_total': ('counter', 'Time spent serializing response bodies', None),
+    'gzip_responses_total': ('counter', 'Responses gzipped (see backend.compression)', None),
+    'gzip_cache_hits_total': ('counter', 'Gzipped responses served from the compressed-body cache', None),
+    'gzip_input_bytes_total': ('counter', 'Bytes before compression', None),
+    'gzip_output_bytes_total': ('counter', 'Bytes after compression', None),
+    'gzip_cpu_seconds_total': ('counter', 'CPU time spent compressing', None),
+    'db_pool_connections': ('gauge', 'Connection pool usage of the running workers, by bind and state', None),
+}
+
+
+def _labels(**labels):
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped))
+
+
+class Registry:
+    """Counters and histograms of this worker, keyed by metric name and label string"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.dirty = False
+
+    def inc(self, name, labels, value=1):
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+            self.dirty = True
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            counts, total, count = series.get(labels) or ([0] * len(buckets), 0.0, 0)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[labels] = (counts, total + value, count + 1)
+            self.dirty = True
+
+    def snapshot(self):
+        with self._lock:
+            self.dirty = False
+            return {
+                'counters': {name: dict(series) for name, series in self.counters.items()},
+                'histograms': {name: {labels: [list(counts), total, count] for labels, (counts, total, count) in series.items()}
+                               for name, series in self.histograms.items()},
+            }
+
+
+registry = Registry()
+
+
+def merge(target, snapshot, gauges=True):
+    """Add the series of `snapshot` into `target` (both snapshot dicts)"""
+    for kind in ('counters', 'gauges') if gauges else ('counters',):
+        for name, series in snapshot.get(kind, {}).items():
+            merged = target.setdefault(kind, {}).setdefault(name, {})
+            for labels, value in series.items():
+                merged[labels] = merged.get(labels, 0) + value
+    for name, series in snapshot.get('histograms', {}).items():
+        merged = target.setdefault('histograms', {}).setdefault(name, {})
+        for labels, (counts, total, count) in series.items():
+            previous = merged.get(labels)
+            if previous is None:
+                merged[labels] = [list(counts), total, count]
+            else:
+                merged[labels] = [[a + b for a, b in zip(previous[0], counts)], previous[1] + total, previous[2] + count]
+    return target
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, snapshot):
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+    os.replace(temporary, path)
+
+
+class MetricsDirectory:
+    """Per-worker snapshot files in a directory shared by the workers of one host"""
+
+    ARCHIVE = 'archive.json'
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._pid = None
+        self._filename = None
+
+    def filename(self):
+        # Recomputed after a fork (gunicorn --preload), so workers never share a file
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._filename = os.path.join(self.path, f'{self._pid}-{time.time_ns()}.json')
+        return self._filename
+
+    def write(self, snapshot):
+        _write(self.filename(), snapshot)
+
+    def collect(self):
+        """Sum of every worker's snapshot; files of exited workers are archived first"""
+        own = self.filename()
+        total, dead = {}, []
+        for name in os.listdir(self.path):
+            if not name.endswith('.json') or name == self.ARCHIVE:
+                continue
+            path = os.path.join(self.path, name)
+            alive = path == own or _alive(int(name.split('-', 1)[0]))
+            if not alive and fcntl is not None:
+                dead.append(path)
+                continue
+            snapshot = _read(path)
+            if snapshot:
+                merge(total, snapshot, gauges=alive)
+        if dead:
+            self._archive(dead)
+        return merge(total, _read(os.path.join(self.path, self.ARCHIVE)) or {})
+
+    def _archive(self, paths):
+        with open(os.path.join(self.path, 'archive.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive_path = os.path.join(self.path, self.ARCHIVE)
+            archive = _read(archive_path) or {}
+            for path in paths:
+                # Another scrape may have archived it while we waited for the lock
+                snapshot = _read(path)
+                if snapshot is not None:
+                    merge(archive, snapshot, gauges=False)
+                    os.remove(path)
+            _write(archive_path, archive)
+
+
+def process_gauges(app):
+    """Pool usage and compression totals of this worker, as snapshot series"""
+    from backend.compression import compression_stats
+    from backend.database import db
+    from backend.routes.health import pool_stats
+    gauges = {}
+    with app.app_context():
+        for bind, engine in (('primary', db.engine),) + tuple((key, engine) for key, engine in db.engines.items() if key):
+            stats = pool_stats(engine)
+            for state in ('size', 'checkedout', 'overflow'):
+                if state in stats:
+                    gauges[_labels(bind=bind, state=state)] = stats[state]
+    compression = compression_stats.snapshot()
+    counters = {
+        'gzip_responses_total': compression['responses'],
+        'gzip_cache_hits_total': compression['cache_hits'],
+        'gzip_input_bytes_total': compression['bytes_in'],
+        'gzip_output_bytes_total': compression['bytes_out'],
+        'gzip_cpu_seconds_total': compression['cpu_seconds'],
+    }
+    return {'gauges': {'db_pool_connections': gauges},
+            'counters': {name: {'': value} for name, value in counters.items()}}
+
+
+def worker_snapshot(app):
+    return merge(registry.snapshot(), process_gauges(app))
+
+
+class Flusher:
+    """Daemon thread writing this worker's snapshot while it has new data"""
+
+    def __init__(self):
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self, app, directory, interval):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+
+            def run():
+                while True:
+                    time.sleep(interval)
+                    if registry.dirty:
+                        try:
+                            directory.write(worker_snapshot(app))
+                        except Exception:
+                            app.logger.exception('Could not write the metrics snapshot')
+
+            threading.Thread(target=run, name='metrics-flusher', daemon=True).start()
+            atexit.register(lambda: directory.write(worker_snapshot(app)))
+
+
+flusher = Flusher()
+
+
+def render(snapshot):
+    """The Prometheus text exposition of a snapshot"""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        if kind == 'histogram':
+            series = snapshot.get('histograms', {}).get(name)
+        else:
+            series = snapshot.get('gauges' if kind == 'gauge' else 'counters', {}).get(name)
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(series.items()):
+            if kind != 'histogram':
+                lines.append(f'{name}{{{labels}}} {value}' if labels else f'{name} {value}')
+                continue
+            counts, total, count = value
+            prefix = f'{labels},' if labels else ''
+            cumulative = 0
+            for bound, bucket in zip(buckets, counts):
+                cumulative += bucket
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {total}')
+            lines.append(f'{name}_count{{{labels}}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+# --- Per-request timings ---
+
+def add_timing(name, seconds):
+    if has_request_context():
+        timings = g.setdefault('_timings', {})
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to this request's `name` timing"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, time.perf_counter() - started)
+
+
+# The start time lives on the statement's execution context: a statement that
+# fails never reaches after_cursor_execute, and its context is simply dropped.
+@event.listens_for(Engine, 'before_cursor_execute')
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is not None and has_request_context():
+        add_timing('db', time.perf_counter() - started)
+        g._queries = g.get('_queries', 0) + 1
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Counts JSON encoding as serialization time"""
+
+    def dumps(self, obj, **kwargs):
+        with timed('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def server_timing(total, timings, queries):
+    parts = [f'app;dur={total * 1000:.1f}']
+    if queries:
+        parts.append(f'db;dur={timings.get("db", 0.0) * 1000:.1f};desc="{queries} queries"')
+    if 'serialize' in timings:
+        parts.append(f'serialize;dur={timings["serialize"] * 1000:.1f}')
+    return ', '.join(parts)
+
+
+def init_app(app):
+    if not app.config['METRICS_ENABLED']:
+        return
+    app.json = TimedJSONProvider(app)
+    directory = MetricsDirectory(app.config['METRICS_DIR']) if app.config['METRICS_DIR'] else None
+    app.extensions['metrics_directory'] = directory
+
+    @app.before_request
+    def start_timer():
+        g._started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('_started')
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        timings, queries = g.get('_timings', {}), g.get('_queries', 0)
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        registry.observe('http_request_duration_seconds',
+                         _labels(method=request.method, route=route, status=response.status_code), total)
+        labels = _labels(route=route)
+        registry.observe('db_queries_per_request', labels, queries)
+        if queries:
+            registry.inc('db_query_seconds_total', labels, timings.get('db', 0.0))
+        if 'serialize' in timings:
+            registry.inc('serialization_seconds_total', labels, timings['serialize'])
+        if not response.is_streamed and response.content_length:
+            registry.inc('http_response_bytes_total', labels, response.content_length)
+        if app.config['METRICS_SERVER_TIMING']:
+            response.headers['Server-Timing'] = server_timing(total, timings, queries)
+        if directory is not None:
+            flusher.ensure_running(app, directory, app.config['METRICS_FLUSH_SECONDS'])
+        return response
+
+
+def collect(app):
+    """Snapshot of every worker on the host, with this worker's data current"""
+    directory = app.extensions.get('metrics_directory')
+    if directory is None:
+        return worker_snapshot(app)
+    directory.write(worker_snapshot(app))
+    return directory.collect()
@@ -0,0 +1,217 @@
+"""
+Runner for the numbered SQL scripts in backend/migrations/.
+
+Applied versions are recorded in `schema_migrations`. That table lives in its
+own MetaData, so `db.create_all()` never creates it by accident.
+
+The scripts are written for MySQL, the production database. An empty
+database, such as a fresh dev SQLite file, is built from the models with
+`create_all` instead. Every existing script is then recorded as applied,
+because the models already include their changes. A database created before
+the runner existed must be told once which scripts it already has:
+`flask migrations stamp <version>`, which is 2 for the schema the runner
+started from, then `flask migrations upgrade`.
+
+A script may have a per-dialect variant, e.g. `009_add_task_search.sqlite.sql`,
+which replaces the plain script on that database.
+
+`check_schema` runs when the app boots, in place of `create_all`: one query
+for the applied version. Only an empty database is created there.
+Upgrading a shared database is a deploy step, not something every worker
+spawn should attempt: the container entrypoint (backend/docker-entrypoint.sh)
+runs `flask migrations upgrade` once before the server starts.
+"""
+import re
+from datetime import datetime
+from pathlib import Path
+import click
+from flask.cli import AppGroup
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, inspect, select, func, insert, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from backend.database import db
+
+MIGRATIONS_DIR = Path(__file__).parent / 'migrations'
+MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)(?:\.(\w+))?\.sql$')
+
+metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(255), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+class MigrationError(Exception):
+    pass
+
+
+def discover(directory=MIGRATIONS_DIR, dialect=None):
+    """
+    Return [(version, name, path)] for every script, in version order, using
+    the variant for `dialect` where there is one
+    """
+    scripts, variants = {}, {}
+    for path in Path(directory).iterdir():
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            continue
+        version, name, variant = int(match.group(1)), match.group(2), match.group(3)
+        if variant is None:
+            if version in scripts:
+                raise MigrationError('Two migration files share a version number')
+            scripts[version] = (version, name, path)
+        elif variant == dialect:
+            variants[version] = (version, name, path)
+    if set(variants) - set(scripts):
+        raise MigrationError('A dialect variant has no plain migration with its version')
+    return sorted({**scripts, **variants}.values())
+
+
+_TRIGGER = re.compile(r'^CREATE\s+TRIGGER\b', re.IGNORECASE)
+_TRIGGER_END = re.compile(r'\bEND$', re.IGNORECASE)
+
+
+def split_statements(sql):
+    """
+    Split a script into statements, dropping `--` comment lines. A CREATE
+    TRIGGER body runs to its closing END, semicolons included.
+    """
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    statements, pending = [], ''
+    for part in '\n'.join(lines).split(';'):
+        pending = f'{pending};{part}' if pending else part.strip()
+        if _TRIGGER.match(pending) and not _TRIGGER_END.search(pending.strip()):
+            continue
+        if pending.strip():
+            statements.append(pending.strip())
+        pending = ''
+    return statements
+
+
+def applied_versions(connection):
+    """Set of applied versions, or None when the database is unversioned"""
+    if not inspect(connection).has_table('schema_migrations'):
+        return None
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def latest_version(directory=MIGRATIONS_DIR):
+    migrations = discover(directory)
+    return migrations[-1][0] if migrations else 0
+
+
+def _record(connection, migrations):
+    if migrations:
+        now = datetime.utcnow()
+        connection.execute(insert(schema_migrations), [
+            {'version': version, 'name': name, 'applied_at': now}
+            for version, name, _ in migrations
+        ])
+
+
+def stamp(version, directory=MIGRATIONS_DIR):
+    """Record every script up to `version` as applied, without running it"""
+    migrations = [m for m in discover(directory) if m[0] <= version]
+    with db.engine.begin() as connection:
+        metadata.create_all(connection)
+        done = applied_versions(connection)
+        _record(connection, [m for m in migrations if m[0] not in done])
+    return len(migrations)
+
+
+def upgrade(directory=MIGRATIONS_DIR, echo=lambda message: None):
+    """
+    Bring the database up to date and return the versions applied.
+    MySQL commits DDL implicitly, so a script that fails halfway must be
+    repaired by hand; its version is only recorded once all of it ran.
+    """
+    migrations = discover(directory, db.engine.dialect.name)
+    with db.engine.connect() as connection:
+        done = applied_versions(connection)
+        empty = done is None and not inspect(connection).get_table_names()
+
+    if done is None and not empty:
+        raise MigrationError(
+            'Database has tables but no schema_migrations; '
+            'run `flask migrations stamp <version>` with the last script it already has'
+        )
+    if empty:
+        # Fresh database: the models already describe the latest schema
+        db.create_all()
+        with db.engine.begin() as connection:
+            metadata.create_all(connection)
+            _record(connection, migrations)
+        echo(f'Created schema at version {latest_version(directory)}')
+        return [version for version, _, _ in migrations]
+
+    applied = []
+    for version, name, path in migrations:
+        if version in done:
+            continue
+        echo(f'Applying {path.name}')
+        with db.engine.begin() as connection:
+            for statement in split_statements(path.read_text()):
+                connection.execute(text(statement))
+            _record(connection, [(version, name, path)])
+        applied.append(version)
+    return applied
+
+
+def check_schema(app):
+    """
+    Boot-time schema check. Creates the schema in an empty database and logs
+    an error when the database is behind the migration scripts.
+    """
+    latest = latest_version()
+    try:
+        with db.engine.connect() as connection:
+            current = connection.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        current = None  # No schema_migrations table
+    if current is not None and current >= latest:
+        return
+
+    if current is None:
+        with db.engine.connect() as connection:
+            empty = not inspect(connection).get_table_names()
+        if empty:
+            upgrade()
+            return
+        app.logger.error('Database has no schema_migrations table; run `flask migrations stamp <version>`')
+    else:
+        app.logger.error(
+            'Database schema is at version %s but the code expects %s; run `flask migrations upgrade`',
+            current, latest
+        )
+
+
+migrations_cli = AppGroup('migrations', help='Apply the SQL scripts in backend/migrations.')
+
+
+@migrations_cli.command('upgrade')
+def upgrade_command():
+    """Apply every pending migration."""
+    try:
+        applied = upgrade(echo=click.echo)
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+    if not applied:
+        click.echo('Database is up to date')
+
+
+@migrations_cli.command('stamp')
+@click.argument('version', type=int)
+def stamp_command(version):
+    """Mark migrations up to VERSION as applied without running them."""
+    count = stamp(version)
+    click.echo(f'Stamped {count} migrations as applied')
+
+
+@migrations_cli.command('status')
+def status_command():
+    """List migrations and whether each has been applied."""
+    with db.engine.connect() as connection:
+        done = applied_versions(connection) or set()
+    for version, name, _ in discover():
+        click.echo(f"{'applied' if version in done else 'pending'}  {version:03d}_{name}")
@@ -0,0 +1,12 @@
+-- Add an indexed lookup id for API keys
+-- Date: 2026-10-17
+-- Reason: API key auth used to scrypt-verify the key against every system user.
+-- api_key_id is a truncated SHA-256 of the key, so a request needs one indexed
+-- lookup and a single hash verification.
+
+ALTER TABLE user ADD COLUMN api_key_id VARCHAR(16);
+CREATE UNIQUE INDEX ix_user_api_key_id ON user (api_key_id);
+
+-- Existing keys are left with a NULL api_key_id. The first successful request
+-- with such a key verifies it the slow way and backfills api_key_id, so no
+-- key needs to be reissued.
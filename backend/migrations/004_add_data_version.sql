@@ -0,0 +1,54 @@
+-- Add per-table data versions used for ETag validators and cache invalidation
+-- Date: 2026-10-17
+-- Each table's version is the sum of DATA_VERSION_SHARDS (8) shard rows, so
+-- concurrent writers to one table rarely wait on the same row lock. The rows
+-- are seeded here so writes only ever UPDATE them.
+
+CREATE TABLE data_version (
+    name VARCHAR(64) NOT NULL,
+    shard INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, shard)
+);
+
+INSERT INTO data_version (name, shard, version) VALUES
+    ('category', 0, 0),
+    ('category', 1, 0),
+    ('category', 2, 0),
+    ('category', 3, 0),
+    ('category', 4, 0),
+    ('category', 5, 0),
+    ('category', 6, 0),
+    ('category', 7, 0),
+    ('passkey', 0, 0),
+    ('passkey', 1, 0),
+    ('passkey', 2, 0),
+    ('passkey', 3, 0),
+    ('passkey', 4, 0),
+    ('passkey', 5, 0),
+    ('passkey', 6, 0),
+    ('passkey', 7, 0),
+    ('priority', 0, 0),
+    ('priority', 1, 0),
+    ('priority', 2, 0),
+    ('priority', 3, 0),
+    ('priority', 4, 0),
+    ('priority', 5, 0),
+    ('priority', 6, 0),
+    ('priority', 7, 0),
+    ('task', 0, 0),
+    ('task', 1, 0),
+    ('task', 2, 0),
+    ('task', 3, 0),
+    ('task', 4, 0),
+    ('task', 5, 0),
+    ('task', 6, 0),
+    ('task', 7, 0),
+    ('user', 0, 0),
+    ('user', 1, 0),
+    ('user', 2, 0),
+    ('user', 3, 0),
+    ('user', 4, 0),
+    ('user', 5, 0),
+    ('user', 6, 0),
+    ('user', 7, 0);
@@ -0,0 +1,6 @@
+-- Index task.rank
+-- Date: 2026-10-17
+-- Reason: appending a task reads max(rank), and rank gap checks and
+-- renormalization read the neighbours of a rank. Both become index seeks.
+
+CREATE INDEX ix_task_rank ON task (`rank`);
@@ -0,0 +1,23 @@
+-- Delta sync: index task.updated_at and record deleted tasks
+-- Date: 2026-10-17
+-- Reason: GET /api/tasks?since=<watermark> reads tasks changed after a
+-- timestamp and the tombstones of tasks deleted after it.
+
+CREATE INDEX ix_task_updated_at ON task (updated_at);
+
+CREATE TABLE task_tombstone (
+    id INTEGER NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    task_id INTEGER NOT NULL,
+    deleted_at DATETIME NOT NULL
+);
+CREATE INDEX ix_task_tombstone_deleted_at ON task_tombstone (deleted_at);
+
+INSERT INTO data_version (name, shard, version) VALUES
+    ('task_tombstone', 0, 0),
+    ('task_tombstone', 1, 0),
+    ('task_tombstone', 2, 0),
+    ('task_tombstone', 3, 0),
+    ('task_tombstone', 4, 0),
+    ('task_tombstone', 5, 0),
+    ('task_tombstone', 6, 0),
+    ('task_tombstone', 7, 0);
@@ -0,0 +1,23 @@
+-- Delta sync: index task.updated_at and record deleted tasks (SQLite variant of 006)
+-- Date: 2026-10-17
+-- Reason: as in 006_add_task_delta_sync.sql; SQLite has no AUTO_INCREMENT, an
+-- INTEGER PRIMARY KEY is the rowid and allocates ids by itself.
+
+CREATE INDEX ix_task_updated_at ON task (updated_at);
+
+CREATE TABLE task_tombstone (
+    id INTEGER NOT NULL PRIMARY KEY,
+    task_id INTEGER NOT NULL,
+    deleted_at DATETIME NOT NULL
+);
+CREATE INDEX ix_task_tombstone_deleted_at ON task_tombstone (deleted_at);
+
+INSERT INTO data_version (name, shard, version) VALUES
+    ('task_tombstone', 0, 0),
+    ('task_tombstone', 1, 0),
+    ('task_tombstone', 2, 0),
+    ('task_tombstone', 3, 0),
+    ('task_tombstone', 4, 0),
+    ('task_tombstone', 5, 0),
+    ('task_tombstone', 6, 0),
+    ('task_tombstone', 7, 0);
@@ -0,0 +1,12 @@
+-- Task change events for the SSE stream
+-- Date: 2026-10-17
+-- Reason: GET /api/tasks/events streams compact change events recorded by
+-- the task mutation routes; the id is the SSE event id used for resume.
+
+CREATE TABLE task_event (
+    id INTEGER NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    kind VARCHAR(16) NOT NULL,
+    data TEXT NOT NULL,
+    created_at DATETIME NOT NULL
+);
+CREATE INDEX ix_task_event_created_at ON task_event (created_at);
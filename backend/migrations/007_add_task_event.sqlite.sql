@@ -0,0 +1,12 @@
+-- Task change events for the SSE stream (SQLite variant of 007)
+-- Date: 2026-10-17
+-- Reason: as in 007_add_task_event.sql; SQLite has no AUTO_INCREMENT, an
+-- INTEGER PRIMARY KEY is the rowid and allocates ids by itself.
+
+CREATE TABLE task_event (
+    id INTEGER NOT NULL PRIMARY KEY,
+    kind VARCHAR(16) NOT NULL,
+    data TEXT NOT NULL,
+    created_at DATETIME NOT NULL
+);
+CREATE INDEX ix_task_event_created_at ON task_event (created_at);
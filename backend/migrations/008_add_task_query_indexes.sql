@@ -0,0 +1,16 @@
+-- Index task for the query shapes of GET /api/tasks
+-- Date: 2026-10-17
+-- Reason: the list is ordered by status group (done last), rank and id. A
+-- CASE expression in ORDER BY cannot use an index, so status_group is a
+-- generated column and (status_group, rank, id) serves the default order and
+-- every keyset page. ?status= lists are ordered by rank within one status.
+-- ?due_within_days= is a due_date range. Reassigning a user touches their
+-- tasks by assignee_id. `rank` is quoted: it is reserved from MySQL 8.0.2.
+
+ALTER TABLE task ADD COLUMN status_group INTEGER
+    GENERATED ALWAYS AS (CASE WHEN status = 'done' THEN 2 ELSE 1 END) VIRTUAL;
+
+CREATE INDEX ix_task_status_group_rank ON task (status_group, `rank`, id);
+CREATE INDEX ix_task_status_rank ON task (status, `rank`, id);
+CREATE INDEX ix_task_due_date ON task (due_date);
+CREATE INDEX ix_task_assignee_id ON task (assignee_id);
@@ -0,0 +1,6 @@
+-- Full-text index for GET /api/tasks?q=
+-- Date: 2026-10-17
+-- Reason: search matches task titles and descriptions and ranks by relevance.
+-- SQLite builds an FTS5 table instead (009_add_task_search.sqlite.sql).
+
+CREATE FULLTEXT INDEX ix_task_fulltext ON task (title, description);
@@ -0,0 +1,25 @@
+-- Full-text index for GET /api/tasks?q= (SQLite variant of 009)
+-- Date: 2026-10-17
+-- Reason: SQLite has no FULLTEXT index. An external-content FTS5 table holds
+-- the index, and triggers keep it in step with every write to task. The
+-- update trigger only fires for title and description changes.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+    title, description, content='task', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN
+    INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN
+    INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN
+    INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+-- Index the tasks that already exist
+INSERT INTO task_fts(task_fts) VALUES ('rebuild');
@@ -0,0 +1,8 @@
+-- Index task for GET /api/tasks/stats
+-- Date: 2026-10-17
+-- Reason: the stats endpoint groups tasks by category and priority and counts
+-- tasks created per day. Assignee and due date are already indexed (008).
+
+CREATE INDEX ix_task_category_id ON task (category_id);
+CREATE INDEX ix_task_priority_id ON task (priority_id);
+CREATE INDEX ix_task_created_at ON task (created_at);
@@ -0,0 +1,16 @@
+-- Composite indexes for the GET /api/tasks filters
+-- Date: 2026-10-17
+-- Reason: ?assignee_id= (including "my tasks"), ?category_id= and ?priority_id=
+-- lists are read in the default order (status group, rank, id). One index per
+-- filter column serves both the filter and the order, and keyset pages stay
+-- range scans. The leading column also covers the foreign key and the
+-- GROUP BY counts of /stats, so the single-column indexes from 008 and 010
+-- are dropped after their replacements exist.
+
+CREATE INDEX ix_task_assignee_rank ON task (assignee_id, status_group, `rank`, id);
+CREATE INDEX ix_task_category_rank ON task (category_id, status_group, `rank`, id);
+CREATE INDEX ix_task_priority_rank ON task (priority_id, status_group, `rank`, id);
+
+DROP INDEX ix_task_assignee_id ON task;
+DROP INDEX ix_task_category_id ON task;
+DROP INDEX ix_task_priority_id ON task;
@@ -0,0 +1,12 @@
+-- Composite indexes for the GET /api/tasks filters (SQLite variant of 011)
+-- Date: 2026-10-17
+-- Reason: as in 011_add_task_filter_indexes.sql; SQLite spells DROP INDEX
+-- without the table name.
+
+CREATE INDEX ix_task_assignee_rank ON task (assignee_id, status_group, `rank`, id);
+CREATE INDEX ix_task_category_rank ON task (category_id, status_group, `rank`, id);
+CREATE INDEX ix_task_priority_rank ON task (priority_id, status_group, `rank`, id);
+
+DROP INDEX ix_task_assignee_id;
+DROP INDEX ix_task_category_id;
+DROP INDEX ix_task_priority_id;
@@ -2,6 +2,7 @@ from datetime import datetime
 from backend.database import db
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from backend.auth.api_keys import api_key_fingerprint
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -12,6 +13,7 @@ class User(UserMixin, db.Model):
     is_admin = db.Column(db.Boolean, default=False)
     is_system_user = db.Column(db.Boolean, default=False)
     api_key_hash = db.Column(db.String(255))
+    api_key_id = db.Column(db.String(16), unique=True, index=True) # Indexed lookup id for api_key_hash
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -25,6 +27,7 @@ class User(UserMixin, db.Model):
 
     def set_api_key(self, api_key):
         self.api_key_hash = generate_password_hash(api_key)
+        self.api_key_id = api_key_fingerprint(api_key)
 
     def check_api_key(self, api_key):
         if not self.api_key_hash:
@@ -46,19 +49,34 @@ class Priority(db.Model):
     tasks = db.relationship('Task', backref='priority', lazy=True)
 
 class Task(db.Model):
+    # Indexes follow the query shapes of GET /api/tasks (see migration 008)
+    __table_args__ = (
+        # Default list order and keyset pages: status group, then rank
+        db.Index('ix_task_status_group_rank', 'status_group', 'rank', 'id'),
+        # ?status= lists, ordered by rank within the one status
+        db.Index('ix_task_status_rank', 'status', 'rank', 'id'),
+        # ?assignee_id=, ?category_id=, ?priority_id= in list order (see migration 011);
+        # they also serve the per-column counts of /stats
+        db.Index('ix_task_assignee_rank', 'assignee_id', 'status_group', 'rank', 'id'),
+        db.Index('ix_task_category_rank', 'category_id', 'status_group', 'rank', 'id'),
+        db.Index('ix_task_priority_rank', 'priority_id', 'status_group', 'rank', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    due_date = db.Column(db.DateTime)
+    due_date = db.Column(db.DateTime, index=True)
     status = db.Column(db.String(20), default='todo') # todo, in_progress, done
-    rank = db.Column(db.Float, nullable=False, default=0.0)  # For drag-and-drop ordering
+    # Done tasks sort last; a generated column so the list order can be served by an index
+    status_group = db.Column(db.Integer, db.Computed("CASE WHEN status = 'done' THEN 2 ELSE 1 END", persisted=False))
+    rank = db.Column(db.Float, nullable=False, default=0.0, index=True)  # For drag-and-drop ordering
     
     assignee_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
     priority_id = db.Column(db.Integer, db.ForeignKey('priority.id'))
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
 class Passkey(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -70,3 +88,28 @@ class Passkey(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     user = db.relationship('User', backref=db.backref('passkeys', lazy=True))
+
+class TaskTombstone(db.Model):
+    """Records a deleted task so delta sync clients can drop it"""
+    __tablename__ = 'task_tombstone'
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class TaskEvent(db.Model):
+    """A compact task change, streamed to clients over /api/tasks/events"""
+    __tablename__ = 'task_event'
+    id = db.Column(db.Integer, primary_key=True) # Doubles as the SSE event id
+    kind = db.Column(db.String(16), nullable=False) # created, updated, deleted or reset
+    data = db.Column(db.Text, nullable=False) # JSON payload
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class DataVersion(db.Model):
+    """
+    Per-table change counter, bumped in the same transaction as every write.
+    Each table's counter is split over several shard rows (see backend.versioning).
+    """
+    __tablename__ = 'data_version'
+    name = db.Column(db.String(64), primary_key=True) # Table name
+    shard = db.Column(db.Integer, primary_key=True, default=0, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,86 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_, false, DateTime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _cursor_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = json.dumps([_cursor_value(v) for v in values], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by encode_cursor, checking it has `size` values"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Invalid cursor')
+    # Numbers, plus ISO datetimes and nulls from nullable date sort keys
+    if not all(v is None or isinstance(v, (int, float, str)) and not isinstance(v, bool) for v in values):
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+def cursor_for_columns(columns, values):
+    """Convert decoded cursor values back to the Python types of `columns`"""
+    converted = []
+    for column, value in zip(columns, values):
+        if isinstance(value, str):
+            if not isinstance(column.type, DateTime):
+                raise InvalidCursor('Invalid cursor')
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise InvalidCursor('Invalid cursor')
+        converted.append(value)
+    return converted
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _after(column, value, descending):
+    # NULL sorts first ascending and last descending, on SQLite and MySQL alike
+    if descending:
+        return false() if value is None else or_(column < value, column.is_(None))
+    return column.isnot(None) if value is None else column > value
+
+
+def keyset_after(columns, values, descending=()):
+    """
+    Build a filter selecting rows that sort strictly after `values` when ordered
+    by `columns`, i.e. (c1, c2, ...) > (v1, v2, ...) spelled out so it works on
+    databases without row-value comparisons. Columns whose positions are in
+    `descending` are ordered DESC; nullable columns are handled.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [_equal(columns[j], values[j]) for j in range(i)]
+        clauses.append(and_(*equal_prefix, _after(column, values[i], i in descending)))
+    return or_(*clauses)
+
+
+def parse_limit(value, default, maximum):
+    """Parse a `limit` query parameter, clamping it to `maximum`"""
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, maximum)
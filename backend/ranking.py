@@ -0,0 +1,191 @@
+"""
+Rank management for drag-and-drop ordering.
+
+Tasks are ordered by a float `rank`. Moving a task between two neighbours
+bisects their ranks, so repeated moves into the same slot halve the gap each
+time until the floats collapse. After every rank change we check the gap to
+the neighbours and, once it falls below RANK_MIN_GAP, respread a small window
+of rows around the task in a single UPDATE. `rebalance_all` rewrites the
+whole table in short chunked transactions; it commits, so it is only run
+outside a caller's transaction (maintenance, or after the caller commits).
+"""
+from sqlalchemy import and_, or_, case, update, func
+from backend.database import db
+from backend.models import Task
+
+RANK_STEP = 1000.0
+RANK_MIN_GAP = 1e-3
+RANK_WINDOW = 16
+RANK_MAX_WINDOW = 1024
+
+
+def next_rank():
+    """Rank that appends a task to the end of the list (served by ix_task_rank)"""
+    max_rank = db.session.query(func.max(Task.rank)).scalar()
+    return (max_rank or 0) + RANK_STEP
+
+
+def rank_between(before, after):
+    """Rank for a task placed between two neighbours; either may be None"""
+    if before is None and after is None:
+        return next_rank()
+    if before is None:
+        return after - RANK_STEP
+    if after is None:
+        return before + RANK_STEP
+    return (before + after) / 2
+
+
+def _before(rank, task_id):
+    return or_(Task.rank < rank, and_(Task.rank == rank, Task.id < task_id))
+
+
+def _after(rank, task_id):
+    return or_(Task.rank > rank, and_(Task.rank == rank, Task.id > task_id))
+
+
+def _neighbours(rank, task_id, limit):
+    """Up to `limit` (id, rank) rows on each side of a position, in order"""
+    columns = (Task.id, Task.rank)
+    below = (db.session.query(*columns)
+             .filter(_before(rank, task_id))
+             .order_by(Task.rank.desc(), Task.id.desc())
+             .limit(limit).all())
+    above = (db.session.query(*columns)
+             .filter(_after(rank, task_id))
+             .order_by(Task.rank.asc(), Task.id.asc())
+             .limit(limit).all())
+    return list(reversed(below)), above
+
+
+def gap_collapsed(task_id, rank):
+    """True if the task at `rank` sits closer than RANK_MIN_GAP to either neighbour"""
+    below, above = _neighbours(rank, task_id, 1)
+    if below and rank - below[0].rank < RANK_MIN_GAP:
+        return True
+    if above and above[0].rank - rank < RANK_MIN_GAP:
+        return True
+    return False
+
+
+def rank_for_position(task_id, before=None, after=None):
+    """
+    Rank placing task `task_id` between the (id, rank) neighbours `before`
+    and `after`. A missing side is bounded by the next row in the global
+    order instead, so the task does not jump over unrelated rows.
+    """
+    if before is not None and after is not None:
+        if before[1] > after[1]:
+            raise ValueError('Neighbours are out of order')
+        return (before[1] + after[1]) / 2
+    if before is not None:
+        nearest = _neighbours(before[1], before[0], 2)[1]
+        nearest = [row for row in nearest if row.id != task_id][:1]
+        return rank_between(before[1], nearest[0].rank if nearest else None)
+    if after is not None:
+        nearest = _neighbours(after[1], after[0], 2)[0]
+        nearest = [row for row in nearest if row.id != task_id][-1:]
+        return rank_between(nearest[0].rank if nearest else None, after[1])
+    return next_rank()
+
+
+def _apply_ranks(new_ranks):
+    """Write {task_id: rank} in one UPDATE ... SET rank = CASE id ... END"""
+    if not new_ranks:
+        return
+    db.session.execute(
+        update(Task)
+        .where(Task.id.in_(list(new_ranks)))
+        .values(rank=case(new_ranks, value=Task.id)),
+        execution_options={'synchronize_session': 'fetch'}
+    )
+
+
+def renormalize_around(task_id, rank):
+    """
+    Evenly respread the ranks of a window of rows around a task, growing the
+    window until the bounding neighbours leave enough room.
+    Returns {task_id: new_rank} for every row that moved, or None when the
+    whole neighbourhood has collapsed; the caller should then commit and run
+    rebalance_all.
+    """
+    window = RANK_WINDOW
+    while window <= RANK_MAX_WINDOW:
+        below, above = _neighbours(rank, task_id, window + 1)
+        rows = [(row.id, row.rank) for row in below] + [(task_id, rank)]
+        rows += [(row.id, row.rank) for row in above]
+
+        # The extra row fetched on each side is kept fixed as a boundary
+        lower = rows.pop(0)[1] if len(below) > window else None
+        upper = rows.pop()[1] if len(above) > window else None
+        if lower is None and upper is None:
+            lower, upper = 0.0, RANK_STEP * (len(rows) + 1)
+        elif lower is None:
+            lower = upper - RANK_STEP * (len(rows) + 1)
+        elif upper is None:
+            upper = lower + RANK_STEP * (len(rows) + 1)
+
+        spacing = (upper - lower) / (len(rows) + 1)
+        if spacing >= RANK_MIN_GAP * 100:
+            new_ranks = {
+                row_id: lower + spacing * (i + 1)
+                for i, (row_id, _) in enumerate(rows)
+            }
+            _apply_ranks(new_ranks)
+            return new_ranks
+        window *= 2
+    return None
+
+
+def rebalance_all(chunk_size=1000):
+    """
+    Rewrite every rank to an even RANK_STEP spacing, committing each chunk
+    separately so no transaction holds row locks for long.
+
+    The new ranks occupy a range disjoint from the current ones, so the
+    global order stays correct after every chunk: when the range below the
+    current minimum is large enough rows are walked in ascending order into
+    it, otherwise in descending order into a range above the current maximum.
+    Returns the number of rows rewritten.
+    """
+    total, min_rank, max_rank = db.session.query(
+        func.count(Task.id), func.min(Task.rank), func.max(Task.rank)
+    ).one()
+    if not total:
+        return 0
+
+    ascending = min_rank > RANK_STEP * (total + 1)
+    if ascending:
+        next_value, step = RANK_STEP, RANK_STEP
+    else:
+        next_value, step = max_rank + RANK_STEP * (total + 1), -RANK_STEP
+    boundary = min_rank if ascending else max_rank
+
+    cursor = None
+    done = 0
+    while True:
+        query = db.session.query(Task.id, Task.rank)
+        if ascending:
+            query = query.filter(Task.rank >= boundary)
+            if cursor is not None:
+                query = query.filter(_after(*cursor))
+            query = query.order_by(Task.rank.asc(), Task.id.asc())
+        else:
+            query = query.filter(Task.rank <= boundary)
+            if cursor is not None:
+                query = query.filter(_before(*cursor))
+            query = query.order_by(Task.rank.desc(), Task.id.desc())
+        rows = query.limit(chunk_size).all()
+        if not rows:
+            break
+
+        new_ranks = {}
+        for row in rows:
+            new_ranks[row.id] = next_value
+            next_value += step
+        _apply_ranks(new_ranks)
+        db.session.commit()
+
+        done += len(rows)
+        cursor = (rows[-1].rank, rows[-1].id)
+    return done
@@ -0,0 +1,203 @@
+"""
+Per-client rate limits and load shedding.
+
+Every request draws a token from the bucket of its client and endpoint
+class before it touches the database:
+- Clients are verified API keys (by fingerprint), session users (by the
+  user id in the signed session cookie) or, without either, the remote
+  address. An invalid key counts against its address.
+- Classes are `auth` (writes to /api/auth: login, 2FA, passkeys), `read`
+  (GET/HEAD) and `write` (everything else), each with its own budget of
+  RATE_LIMIT_<CLASS> = "<tokens per second>:<burst>".
+
+An empty bucket is answered with 429 and Retry-After. Buckets live in a
+SQLite file (RATE_LIMIT_STORAGE) shared by every worker on the host; each
+take is one short write transaction, and a request is let through when the
+file is busy. `memory` keeps them per worker
+instead, for development.
+
+Independently, a worker that already has RATE_LIMIT_MAX_IN_FLIGHT requests
+in progress answers new ones with 503 at once, rather than queueing them
+behind a saturated database pool. Streamed bodies (events, export) no longer
+count once their headers are sent. /health and /metrics are never limited.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from flask import request, session, jsonify, g
+from backend.auth.api_keys import api_key_fingerprint, authenticate_api_key
+from backend.hostfile import HostFile
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+ENDPOINT_CLASSES = ('read', 'write', 'auth')
+EXEMPT_ENDPOINTS = {'health.health_check', 'health.metrics_endpoint', 'static'}
+
+
+def parse_budget(value):
+    """"<tokens per second>:<burst>" as (rate, burst); None when empty or zero (unlimited)"""
+    if not value:
+        return None
+    try:
+        rate, burst = (float(part) for part in str(value).split(':'))
+    except ValueError:
+        raise ValueError(f'Invalid rate limit {value!r}; use "<tokens per second>:<burst>"')
+    if rate <= 0 or burst < 1:
+        return None
+    return rate, burst
+
+
+def refill(tokens, updated, rate, burst, now):
+    """Tokens in a bucket at `now`, after refilling since `updated`"""
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+def take_token(tokens, rate):
+    """(tokens left, seconds until a token is available: 0 when one was taken)"""
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBucketStore:
+    """Buckets for this worker process only"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens, retry_after = take_token(refill(tokens, updated, rate, burst, now), rate)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > 100000:
+                # Full buckets carry no state; dropping them is the same as keeping them
+                self._buckets = {k: v for k, v in self._buckets.items() if v[0] < burst}
+            return retry_after
+
+
+class SQLiteBucketStore:
+    """Buckets in a local SQLite file (see backend.hostfile), shared by the workers of one host"""
+
+    PRUNE_EVERY = 1000
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS rate_bucket ('
+        'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)',
+    )
+
+    def __init__(self, path):
+        self.file = HostFile(path, self.SCHEMA)
+        self._takes = 0
+
+    def take(self, key, rate, burst, now):
+        with self.file.transaction() as connection:
+            row = connection.execute('SELECT tokens, updated FROM rate_bucket WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens, retry_after = take_token(refill(tokens, updated, rate, burst, now), rate)
+            connection.execute('INSERT OR REPLACE INTO rate_bucket (key, tokens, updated) VALUES (?, ?, ?)',
+                               (key, tokens, now))
+            self._takes += 1
+            if self._takes % self.PRUNE_EVERY == 0:
+                # Buckets idle for an hour have refilled under any sensible budget
+                connection.execute('DELETE FROM rate_bucket WHERE updated < ?', (now - 3600,))
+        return retry_after
+
+
+def create_store(storage):
+    return MemoryBucketStore() if storage == 'memory' else SQLiteBucketStore(storage)
+
+
+def endpoint_class():
+    if request.method in SAFE_METHODS:
+        return 'read'
+    return 'auth' if request.blueprint == 'auth' else 'write'
+
+
+def client_key():
+    api_key = request.headers.get('X-API-Key')
+    # Only a verified key gets its own bucket: any made-up key would otherwise
+    # get a fresh one. Unknown keys are limited by address, and the legacy key
+    # scan is left to the view, after this request has paid for a token.
+    if api_key and authenticate_api_key(api_key, legacy=False) is not None:
+        return f'key:{api_key_fingerprint(api_key)}'
+    # Read from the signed cookie, so limiting a session costs no user query
+    user_id = session.get('_user_id')
+    if user_id is not None:
+        return f'user:{user_id}'
+    return f'ip:{request.remote_addr}'
+
+
+class InFlight:
+    """Requests this worker is currently handling"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def enter(self, limit):
+        with self._lock:
+            if limit and self.count >= limit:
+                return False
+            self.count += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.count -= 1
+
+
+in_flight = InFlight()
+
+
+def _too_many(status, message, retry_after):
+    response = jsonify({'error': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def init_app(app):
+    if not app.config['RATE_LIMIT_ENABLED']:
+        return
+    budgets = {name: parse_budget(app.config[f'RATE_LIMIT_{name.upper()}']) for name in ENDPOINT_CLASSES}
+    storage = app.config['RATE_LIMIT_STORAGE']
+    store = create_store(storage if storage == 'memory' else os.path.abspath(storage))
+
+    def _leave():
+        if g.pop('_in_flight', False):
+            in_flight.leave()
+
+    @app.before_request
+    def limit_request():
+        if request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+        if not in_flight.enter(app.config['RATE_LIMIT_MAX_IN_FLIGHT']):
+            return _too_many(503, 'Server busy, retry shortly', 1)
+        g._in_flight = True
+
+        name = endpoint_class()
+        budget = budgets[name]
+        if budget is None:
+            return None
+        rate, burst = budget
+        try:
+            retry_after = store.take(f'{name}|{client_key()}', rate, burst, time.time())
+        except sqlite3.Error:
+            # Fail open: a busy or broken bucket file must not turn requests into 500s
+            app.logger.warning('Rate limit bucket file unavailable; request not limited', exc_info=True)
+            return None
+        if retry_after:
+            return _too_many(429, f'Rate limit exceeded for {name} requests', retry_after)
+        return None
+
+    @app.after_request
+    def release_slot(response):
+        # A streamed body is sent after this; it must not hold a slot for its whole life
+        _leave()
+        return response
+
+    @app.teardown_request
+    def release_slot_on_error(error):
+        _leave()
@@ -0,0 +1,139 @@
+"""
+Read-replica routing for idempotent requests.
+
+When DATABASE_REPLICA_URL is set, GET and HEAD requests read from the
+`replica` bind; everything else uses the primary. RoutingSession moves a
+request to the primary at its first write, so reads after that see it.
+
+A client that has just written stays on the primary for
+REPLICA_STICKY_SECONDS, so it reads its own writes despite replication lag:
+- Browser sessions carry the deadline in the signed session cookie, so every
+  worker honours it.
+- API-key clients are tracked by key fingerprint in a SQLite file
+  (REPLICA_STICKY_STORAGE) shared by the workers of the host, so a follow-up
+  GET served by another worker also reads the primary. When the file cannot
+  be read, the request reads the primary too. `memory` keeps the deadlines
+  per worker instead, for development.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import request, session, current_app
+from backend.auth.api_keys import api_key_fingerprint
+from backend.database import db, READ_REPLICA, WROTE
+from backend.hostfile import HostFile
+
+SAFE_METHODS = ('GET', 'HEAD')
+SESSION_KEY = 'primary_until'
+
+
+class StickyPrimary:
+    """Bounded map of API key fingerprint -> time until which reads stay on the primary"""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._until = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, key, until):
+        with self._lock:
+            self._until[key] = until
+            self._until.move_to_end(key)
+            while len(self._until) > self.maxsize:
+                self._until.popitem(last=False)
+
+    def active(self, key, now):
+        with self._lock:
+            until = self._until.get(key)
+            if until is not None and until <= now:
+                del self._until[key]
+                return False
+            return until is not None
+
+    def clear(self):
+        with self._lock:
+            self._until.clear()
+
+
+class SQLiteStickyPrimary:
+    """The same map in a local SQLite file (see backend.hostfile), shared by the workers of one host"""
+
+    PRUNE_EVERY = 1000
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS sticky_primary (key TEXT PRIMARY KEY, until REAL NOT NULL)',
+    )
+
+    def __init__(self, path):
+        self.file = HostFile(path, self.SCHEMA)
+        self._marks = 0
+
+    def mark(self, key, until):
+        with self.file.transaction() as connection:
+            connection.execute('INSERT OR REPLACE INTO sticky_primary (key, until) VALUES (?, ?)', (key, until))
+            self._marks += 1
+            if self._marks % self.PRUNE_EVERY == 0:
+                connection.execute('DELETE FROM sticky_primary WHERE until <= ?', (time.time(),))
+
+    def active(self, key, now):
+        row = self.file.fetchone('SELECT until FROM sticky_primary WHERE key = ?', (key,))
+        return row is not None and row[0] > now
+
+    def clear(self):
+        with self.file.transaction() as connection:
+            connection.execute('DELETE FROM sticky_primary')
+
+
+def create_sticky_store(storage):
+    return StickyPrimary() if storage == 'memory' else SQLiteStickyPrimary(storage)
+
+
+def _api_key():
+    api_key = request.headers.get('X-API-Key')
+    return api_key_fingerprint(api_key) if api_key else None
+
+
+def _pinned_to_primary(now):
+    if session.get(SESSION_KEY, 0) > now:
+        return True
+    key = _api_key()
+    if key is None:
+        return False
+    try:
+        return current_app.extensions['sticky_primary'].active(key, now)
+    except sqlite3.Error:
+        # Unknown: the primary is always consistent
+        return True
+
+
+def init_app(app):
+    """Route reads to the replica bind, if one is configured"""
+    if not app.config.get('DATABASE_REPLICA_URL'):
+        return
+    storage = app.config['REPLICA_STICKY_STORAGE']
+    store = app.extensions['sticky_primary'] = create_sticky_store(
+        storage if storage == 'memory' else os.path.abspath(storage))
+
+    @app.before_request
+    def route_request():
+        # Set on every request: the session outlives a request when an app context is already pushed
+        replica = request.method in SAFE_METHODS and not _pinned_to_primary(time.time())
+        db.session.info[READ_REPLICA] = replica
+        db.session.info[WROTE] = False
+
+    @app.after_request
+    def remember_writes(response):
+        wrote = request.method not in SAFE_METHODS or db.session.info.get(WROTE)
+        window = app.config['REPLICA_STICKY_SECONDS']
+        if wrote and window > 0:
+            until = time.time() + window
+            if '_user_id' in session:
+                session[SESSION_KEY] = until
+            key = _api_key()
+            if key is not None:
+                try:
+                    store.mark(key, until)
+                except sqlite3.Error:
+                    app.logger.warning('Sticky primary file unavailable; read-your-writes not recorded', exc_info=True)
+        return response
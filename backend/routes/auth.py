@@ -1,7 +1,10 @@
-from flask import Blueprint, request, jsonify
+from functools import lru_cache
+from flask import Blueprint, request, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
-from backend.models import User
+from backend.models import User, Passkey
 from backend.database import db, login_manager
+from backend.versioning import conditional_on
+from backend.cache import cached_json_response
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -66,6 +69,7 @@ def login_2fa():
     if not code:
         return jsonify({'error': 'Missing 2FA code'}), 400
         
+    import pyotp
     totp = pyotp.TOTP(user.totp_secret)
     if totp.verify(code):
         login_user(user)
@@ -91,11 +95,13 @@ def get_current_user():
         'has_totp': bool(current_user.totp_secret)
     }), 200
 
-import pyotp
+# pyotp and fido2 are imported on first use rather than at import time, so
+# worker startup does not pay for them
 
 @auth_bp.route('/totp/setup', methods=['POST'])
 @login_required
 def totp_setup():
+    import pyotp
     secret = pyotp.random_base32()
     # Create provisioning URI for Google Authenticator
     uri = pyotp.totp.TOTP(secret).provisioning_uri(
@@ -114,6 +120,7 @@ def totp_verify():
     if not secret or not code:
         return jsonify({'error': 'Missing secret or code'}), 400
         
+    import pyotp
     totp = pyotp.TOTP(secret)
     if totp.verify(code):
         current_user.totp_secret = secret
@@ -130,25 +137,25 @@ def disable_totp():
     return jsonify({'message': 'TOTP disabled'}), 200
 
 # --- Passkey Implementation ---
-from fido2.webauthn import PublicKeyCredentialRpEntity, PublicKeyCredentialUserEntity, PublicKeyCredentialCreationOptions, PublicKeyCredentialParameters, PublicKeyCredentialType, AuthenticatorSelectionCriteria, UserVerificationRequirement, AttestationConveyancePreference
-from fido2.server import Fido2Server
-# from fido2.features import WebauthnForAll # Deprecated/Removed
-from fido2.utils import websafe_encode, websafe_decode
-from flask import session
-from backend.models import Passkey
-
-# Configure RP (Ralying Party)
-rp = PublicKeyCredentialRpEntity(name="Task Tracker", id="localhost")
 
 def verify_origin(origin):
     # Allow localhost development on any port
     return origin.startswith('http://localhost') or origin.startswith('https://localhost')
 
-server = Fido2Server(rp, verify_origin=verify_origin)
+@lru_cache(maxsize=None)
+def fido2_server():
+    """The WebAuthn server, built on the first passkey request"""
+    from fido2.webauthn import PublicKeyCredentialRpEntity
+    from fido2.server import Fido2Server
+    # Configure RP (Ralying Party)
+    rp = PublicKeyCredentialRpEntity(name="Task Tracker", id="localhost")
+    return Fido2Server(rp, verify_origin=verify_origin)
 
 @auth_bp.route('/passkey/register/options', methods=['POST'])
 @login_required
 def passkey_register_options():
+    from fido2.webauthn import PublicKeyCredentialUserEntity
+    from fido2.utils import websafe_decode
     user = PublicKeyCredentialUserEntity(
         id=str(current_user.id).encode('utf-8'),
         name=current_user.email,
@@ -161,7 +168,7 @@ def passkey_register_options():
         for pk in current_user.passkeys
     ]
     
-    options, state = server.register_begin(
+    options, state = fido2_server().register_begin(
         user,
         existing_credentials=existing_creds,
         user_verification="preferred",
@@ -180,8 +187,9 @@ def passkey_register_verify():
         
     state = session['passkey_register_state']
     
+    from fido2.utils import websafe_encode
     try:
-        auth_data = server.register_complete(
+        auth_data = fido2_server().register_complete(
             state,
             data
         )
@@ -221,6 +229,7 @@ def passkey_login_options():
         # For passkeys, we usually verify email first in typical flows unless using resident keys.
         return jsonify({'error': 'User not found'}), 404
         
+    from fido2.utils import websafe_decode
     credentials = [
         {'type': 'public-key', 'id': websafe_decode(pk.credential_id)}
         for pk in user.passkeys
@@ -229,7 +238,7 @@ def passkey_login_options():
     if not credentials:
         return jsonify({'error': 'No passkeys found for this user'}), 400
 
-    options, state = server.authenticate_begin(
+    options, state = fido2_server().authenticate_begin(
         credentials,
         user_verification="preferred"
     )
@@ -251,6 +260,7 @@ def passkey_login_verify():
     data = request.get_json()
     
     # Reconstruct credentials list for verification
+    from fido2.utils import websafe_encode, websafe_decode
     credentials = [
         websafe_decode(pk.credential_id) for pk in user.passkeys
     ]
@@ -258,7 +268,7 @@ def passkey_login_verify():
     try:
         # Verify the assertion
         # Note: server.authenticate_complete returns the credential_id that matched
-        cred_id = server.authenticate_complete(
+        cred_id = fido2_server().authenticate_complete(
             state,
             credentials,
             data
@@ -283,6 +293,9 @@ def passkey_login_verify():
 
 @auth_bp.route('/users', methods=['GET'])
 @login_required
+@conditional_on('user')
 def get_users():
-    users = User.query.with_entities(User.id, User.name, User.email).all()
-    return jsonify([{'id': u.id, 'name': u.name, 'email': u.email} for u in users]), 200
+    def build():
+        users = User.query.with_entities(User.id, User.name, User.email).all()
+        return [{'id': u.id, 'name': u.name, 'email': u.email} for u in users]
+    return cached_json_response('users', ('user',), build), 200
@@ -1,13 +1,39 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, current_app
 from sqlalchemy import text
+from backend.compression import compression_stats
 from backend.database import db
+from backend import metrics
 
 health_bp = Blueprint('health', __name__)
 
+def pool_stats(engine):
+    """Connection pool usage for this worker process, for sizing workers against the database"""
+    pool = engine.pool
+    stats = {'class': type(pool).__name__}
+    # StaticPool (in-memory SQLite) keeps a single connection and has no counters
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        counter = getattr(pool, name, None)
+        if counter is not None:
+            stats[name] = counter()
+    return stats
+
 @health_bp.route('/health', methods=['GET'])
 def health_check():
+    # Read before the check below takes its own connection
+    pool = pool_stats(db.engine)
+    if 'replica' in db.engines:
+        pool['replica'] = pool_stats(db.engines['replica'])
     try:
         db.session.execute(text('SELECT 1'))
-        return jsonify({'status': 'ok', 'database': 'connected'}), 200
+        return jsonify({'status': 'ok', 'database': 'connected', 'pool': pool,
+                        'compression': compression_stats.snapshot()}), 200
     except Exception as e:
-        return jsonify({'status': 'error', 'database': str(e)}), 500
+        return jsonify({'status': 'error', 'database': str(e), 'pool': pool}), 500
+
+@health_bp.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metrics summed over the workers of this host (see backend.metrics)"""
+    if not current_app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Not Found'}), 404
+    return Response(metrics.render(metrics.collect(current_app)),
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -3,6 +3,8 @@ from flask_login import login_required
 from backend.models import Category, Priority, db
 from backend.schemas import CategorySchema, PrioritySchema
 from backend.auth.decorators import api_key_or_login_required
+from backend.versioning import conditional_on
+from backend.cache import cached_json_response
 
 references_bp = Blueprint('references', __name__)
 category_schema = CategorySchema()
@@ -12,9 +14,12 @@ priorities_schema = PrioritySchema(many=True)
 
 @references_bp.route('/categories', methods=['GET'])
 @api_key_or_login_required
+@conditional_on('category')
 def get_categories():
-    categories = Category.query.all()
-    return jsonify(categories_schema.dump(categories)), 200
+    return cached_json_response(
+        'categories', ('category',),
+        lambda: categories_schema.dump(Category.query.all())
+    ), 200
 
 @references_bp.route('/categories', methods=['POST'])
 @login_required
@@ -34,9 +39,12 @@ def create_category():
 
 @references_bp.route('/priorities', methods=['GET'])
 @api_key_or_login_required
+@conditional_on('priority')
 def get_priorities():
-    priorities = Priority.query.order_by(Priority.level.desc()).all()
-    return jsonify(priorities_schema.dump(priorities)), 200
+    return cached_json_response(
+        'priorities', ('priority',),
+        lambda: priorities_schema.dump(Priority.query.order_by(Priority.level.desc()).all())
+    ), 200
 
 @references_bp.route('/priorities', methods=['POST'])
 @login_required
@@ -1,54 +1,390 @@
-from flask import Blueprint, request, jsonify, g
+from datetime import datetime
+from functools import lru_cache
+import click
+from flask import Blueprint, Response, request, jsonify, g, current_app, stream_with_context
 from flask_login import login_required, current_user
-from backend.models import Task, db
-from backend.schemas import TaskSchema
-from backend.auth.decorators import api_key_or_login_required
+from sqlalchemy import insert, update, delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, selectinload, load_only
+from backend.models import Task, User, db
+from backend.schemas import TaskSchema, SparseTaskSchema, PUBLIC_USER_FIELDS
+from backend.serializers import compile_serializer, task_serializer
+from backend.auth.decorators import api_key_or_login_required, admin_required
+from backend.versioning import conditional_on
+from backend.ranking import RANK_STEP, next_rank, rank_for_position, gap_collapsed, renormalize_around, rebalance_all
+from backend.changes import new_watermark, changes_since, prune_tombstones, WatermarkExpired
+from backend.pagination import encode_cursor, decode_cursor, cursor_for_columns, keyset_after, parse_limit
+from backend.filters import TaskSort, SORTS, FILTER_PARAMS, check_params, parse_task_filters, parse_sort
+from backend.events import record_event, fetch_events, latest_event_id, pruned_through, format_event, get_hub, prune_events
+from backend.search import search_terms, apply_search
+from backend.stats import task_stats, MAX_STATS_DAYS
+from backend.cache import cached_json_response, stats_cache
+from backend.metrics import timed
+from backend.export import EXPORT_FORMATS, ndjson_chunks, csv_chunks
+from backend.bulk_import import IMPORT_FORMATS, ImportFormatError, read_rows, import_tasks, text_stream
 
 tasks_bp = Blueprint('tasks', __name__)
 task_schema = TaskSchema()
-tasks_schema = TaskSchema(many=True)
+
+# Sparse fieldsets: `fields` selects Task columns and `include` selects nested
+# relationships. Without either parameter the full TaskSchema output is returned.
+TASK_COLUMNS = tuple(column.key for column in Task.__table__.columns if column.computed is None)
+TASK_RELATIONSHIPS = {'assignee': 'assignee_id', 'category': 'category_id', 'priority': 'priority_id'}
+# Always loaded so ordering and cursors work, even when not serialized
+TASK_REQUIRED_COLUMNS = ('id', 'status', 'rank')
+# Query parameters GET /api/tasks and /export accept; anything else is a 400
+TASK_LIST_PARAMS = FILTER_PARAMS + ('sort', 'limit', 'cursor', 'fields', 'include', 'include_total', 'since')
+TASK_EXPORT_PARAMS = FILTER_PARAMS + ('sort', 'fields', 'format')
+
+def _split_param(value):
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def parse_fieldset(args):
+    """
+    Parse `fields` and `include` query parameters into (columns, relationships),
+    or None when the full representation is requested.
+    """
+    fields = _split_param(args.get('fields'))
+    include = _split_param(args.get('include'))
+    if fields is None and include is None:
+        return None
+    if fields == []:
+        raise ValueError('fields must name at least one field')
+
+    for name in fields or ():
+        if name not in TASK_COLUMNS:
+            raise ValueError(f'Unknown field: {name}')
+    for name in include or ():
+        if name not in TASK_RELATIONSHIPS:
+            raise ValueError(f'Unknown include: {name}')
+
+    columns = tuple(c for c in TASK_COLUMNS if fields is None or c in fields)
+    # `include` defaults to every relationship only when `fields` was not narrowed
+    if include is None:
+        include = TASK_RELATIONSHIPS if fields is None else ()
+    relationships = tuple(r for r in TASK_RELATIONSHIPS if r in include)
+    return columns, relationships
+
+# Relationship loading for TaskSchema's nested fields.
+# Lists share a handful of categories/priorities/assignees across many rows,
+# so one IN query per relationship beats repeating them on every joined row.
+# Single-task responses join everything into one statement.
+def task_load_options(fieldset, loader):
+    if fieldset is None:
+        return [loader(getattr(Task, name)) for name in TASK_RELATIONSHIPS]
+
+    columns, relationships = fieldset
+    loaded = set(columns) | set(TASK_REQUIRED_COLUMNS)
+    loaded |= {TASK_RELATIONSHIPS[name] for name in relationships}
+    options = [load_only(*[getattr(Task, c) for c in TASK_COLUMNS if c in loaded])]
+    for name in relationships:
+        option = loader(getattr(Task, name))
+        if name == 'assignee':
+            # Sparse responses nest only the public user fields
+            option = option.load_only(*[getattr(User, f) for f in PUBLIC_USER_FIELDS])
+        options.append(option)
+    return options
+
+@lru_cache(maxsize=64)
+def _sparse_task_serializer(only):
+    return compile_serializer(SparseTaskSchema(only=only))
+
+def dump_tasks(tasks, fieldset=None, many=False):
+    """Serialize one task or a list of tasks, honouring a sparse fieldset"""
+    if fieldset is None:
+        serializer = task_serializer
+    else:
+        columns, relationships = fieldset
+        serializer = _sparse_task_serializer(columns + relationships)
+    with timed('serialize'):
+        return serializer.dump(tasks, many=many)
+
+def load_task(task_id, fieldset=None):
+    """Load a task with its nested relationships for serialization"""
+    return (Task.query
+            .options(*task_load_options(fieldset, joinedload))
+            .filter(Task.id == task_id)
+            .one_or_none())
+
+def task_changes(data):
+    """
+    Translate an update payload into column values.
+    Only the editable fields are taken; unknown keys are ignored.
+    """
+    # Simple manual mapping rather than task_schema.load(data, instance=task, partial=True)
+    # to avoid complexity with load_instance
+    changes = {}
+    for field in ('title', 'description', 'status', 'priority_id', 'category_id', 'assignee_id'):
+        if field in data:
+            changes[field] = data[field]
+    if 'rank' in data:
+        changes['rank'] = float(data['rank'])
+    if 'due_date' in data and data['due_date']:
+        # Handle ISO format from JS (e.g. 2023-10-27T10:00:00.000Z)
+        # Python < 3.11 doesn't handle Z nicely with fromisoformat, so replace it
+        dt_str = data['due_date'].replace('Z', '+00:00')
+        changes['due_date'] = datetime.fromisoformat(dt_str)
+    elif 'due_date' in data and data['due_date'] is None:
+        changes['due_date'] = None
+    return changes
+
+def change_event(task_id, changes):
+    """Compact `updated` event entry: the task id and the new column values"""
+    entry = {'id': task_id}
+    for field, value in changes.items():
+        entry[field] = value.isoformat() if isinstance(value, datetime) else value
+    return entry
+
+def filtered_tasks(args, user_id):
+    """
+    The task query for the filter, search and `sort` parameters in `args`,
+    as (query, sort, statuses). Raises ValueError for invalid values.
+    """
+    criteria, statuses = parse_task_filters(args, user_id)
+    sort = parse_sort(args)
+    query = Task.query.filter(*criteria)
+    # Full-text search: every word must match, ranked by relevance unless `sort` is given
+    q = args.get('q', '').strip()
+    if q:
+        prefix = args.get('prefix') in ('1', 'true')
+        query, score = apply_search(query, db.engine.dialect.name, search_terms(q), prefix)
+        if not args.get('sort'):
+            sort = TaskSort((score, Task.id))
+    if sort.join is not None:
+        query = query.outerjoin(sort.join)
+    return query, sort, statuses
 
 @tasks_bp.route('', methods=['GET'])
 @api_key_or_login_required
+@conditional_on('task', 'user', 'category', 'priority')
 def get_tasks():
-    from datetime import datetime, timedelta
-    from sqlalchemy import case
-    # Filter by query params if needed (status, priority_id, category_id)
-    # Allow viewing all tasks (for team view) or filter by assignee
-    query = Task.query
-    
-    status = request.args.get('status')
-    if status:
-        query = query.filter_by(status=status)
-    
-    # Filter by due date within N days (includes overdue tasks)
-    due_within_days = request.args.get('due_within_days')
-    if due_within_days:
+    # Taken before querying so writes racing with this request are re-sent next time
+    watermark = new_watermark()
+    user = getattr(g, 'current_user', current_user)
+    try:
+        check_params(request.args, TASK_LIST_PARAMS)
+        query, sort, statuses = filtered_tasks(request.args, user.id)
+        limit = parse_limit(
+            request.args.get('limit'),
+            current_app.config['TASKS_DEFAULT_PAGE_SIZE'],
+            current_app.config['TASKS_MAX_PAGE_SIZE']
+        )
+        fieldset = parse_fieldset(request.args)
+        # Keyset pagination: the cursor holds the sort key of the last row seen,
+        # so every page is a bounded index range scan regardless of depth
+        cursor = request.args.get('cursor')
+        after = cursor_for_columns(sort.columns, decode_cursor(cursor, len(sort.columns))) if cursor else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Delta sync: only tasks changed since the watermark, plus deletions
+    since = request.args.get('since')
+    if since is not None:
+        if cursor or any(request.args.get(name) for name in FILTER_PARAMS):
+            return jsonify({'error': 'since cannot be combined with filters or cursor'}), 400
+        return get_task_changes(since, watermark, fieldset)
+
+    headers = {'X-Watermark': watermark}
+    if request.args.get('include_total') in ('1', 'true'):
+        headers['X-Total-Count'] = str(query.order_by(None).count())
+
+    # A single status fixes the status group, so rank order alone is served by
+    # ix_task_status_rank (or the assignee/category/priority composites).
+    # Cursors keep all three values either way.
+    order = sort.columns
+    if sort is SORTS['rank'] and statuses and len(statuses) == 1:
+        order = order[1:]
+    if after is not None:
+        descending = tuple(i - (len(sort.columns) - len(order)) for i in sort.descending)
+        query = query.filter(keyset_after(order, after[-len(order):], descending))
+    query = query.options(*task_load_options(fieldset, selectinload)).order_by(*sort.order_by(order))
+    # The sort values ride along with each row for the next cursor
+    rows = query.add_columns(*sort.columns).limit(limit + 1).all()
+    tasks = [row[0] for row in rows]
+
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        headers['X-Next-Cursor'] = encode_cursor(rows[limit - 1][1:])
+    return jsonify(dump_tasks(tasks, fieldset, many=True)), 200, headers
+
+def get_task_changes(since, watermark, fieldset):
+    from datetime import timedelta
+    query = Task.query.options(*task_load_options(fieldset, selectinload))
+    try:
+        tasks, deleted = changes_since(
+            since, query,
+            current_app.config['TASKS_MAX_PAGE_SIZE'],
+            timedelta(days=current_app.config['TASK_TOMBSTONE_RETENTION_DAYS'])
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except WatermarkExpired:
+        return jsonify({'error': 'Watermark expired, reload the full task list'}), 410
+    return jsonify({
+        'tasks': dump_tasks(tasks, fieldset, many=True),
+        'deleted': deleted,
+        'watermark': watermark
+    }), 200
+
+@tasks_bp.route('/export', methods=['GET'])
+@api_key_or_login_required
+def export_tasks():
+    """
+    Stream every matching task as NDJSON (default) or CSV.
+    Rows are read in batches from a server-side cursor as plain column tuples,
+    so memory stays flat however many tasks match.
+    """
+    user = getattr(g, 'current_user', current_user)
+    export_format = request.args.get('format', 'ndjson')
+    try:
+        check_params(request.args, TASK_EXPORT_PARAMS)
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format: {export_format}. Use one of {', '.join(EXPORT_FORMATS)}")
+        query, sort, _ = filtered_tasks(request.args, user.id)
+        fieldset = parse_fieldset(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    columns = fieldset[0] if fieldset else TASK_COLUMNS
+    rows = (query.with_entities(*(getattr(Task, name) for name in columns))
+            .order_by(*sort.order_by())
+            .yield_per(current_app.config['TASK_EXPORT_BATCH_SIZE']))
+    if export_format == 'csv':
+        body = csv_chunks(rows, columns, current_app.config['TASK_EXPORT_BATCH_SIZE'])
+        headers = {'Content-Disposition': 'attachment; filename=tasks.csv'}
+    else:
+        body = ndjson_chunks(rows, _sparse_task_serializer(columns), current_app.config['TASK_EXPORT_BATCH_SIZE'])
+        headers = {}
+    # The query runs as the body is read, so the request context (and its session) must stay open
+    return Response(stream_with_context(body), mimetype=EXPORT_FORMATS[export_format], headers={
+        **headers,
+        'X-Accel-Buffering': 'no',
+    })
+
+@tasks_bp.route('/import', methods=['POST'])
+@api_key_or_login_required
+def import_task_file():
+    """
+    Create tasks from a CSV or NDJSON request body (see backend.bulk_import).
+    The format comes from `format` or the Content-Type. Tasks without an
+    assignee are assigned to the caller, as with POST /api/tasks.
+    """
+    try:
+        check_params(request.args, ('format',))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    import_format = request.args.get('format') or next(
+        (name for name, mimetype in IMPORT_FORMATS.items() if mimetype == request.mimetype), None)
+    if import_format not in IMPORT_FORMATS:
+        types = ', '.join(IMPORT_FORMATS.values())
+        return jsonify({'error': f"Unknown format. Use format={' or format='.join(IMPORT_FORMATS)} or a Content-Type of {types}"}), 400
+
+    user = getattr(g, 'current_user', current_user)
+    try:
+        report = import_tasks(read_rows(text_stream(request.stream), import_format),
+                              current_app.config['TASK_IMPORT_BATCH_SIZE'],
+                              current_app.config['TASK_IMPORT_MAX_ERRORS'],
+                              default_assignee=user.id)
+    except ImportFormatError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(report.to_dict()), 200
+
+def _parse_day(name, default):
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+
+@tasks_bp.route('/stats', methods=['GET'])
+@api_key_or_login_required
+@conditional_on('task')
+def get_task_stats():
+    """Task counts by status, due date, assignee, category and priority, plus daily counts"""
+    from datetime import timedelta
+    today = datetime.utcnow().date()
+    try:
+        first = _parse_day('from', today - timedelta(days=14))
+        last = _parse_day('to', today + timedelta(days=14))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if last < first:
+        return jsonify({'error': 'from must not be after to'}), 400
+    if (last - first).days >= MAX_STATS_DAYS:
+        return jsonify({'error': f'Date range is limited to {MAX_STATS_DAYS} days'}), 400
+
+    # Due buckets are relative to today, so the day is part of the key
+    return cached_json_response(
+        f'task_stats|{today}|{first}|{last}', ('task',),
+        lambda: task_stats(today, first, last), cache=stats_cache
+    ), 200
+
+@tasks_bp.route('/events', methods=['GET'])
+@api_key_or_login_required
+def task_events():
+    """
+    Server-Sent Events stream of task changes.
+
+    Clients reconnecting with Last-Event-ID get the events they missed
+    replayed first; when that gap is too large, or its events have been
+    pruned, a `reset` event tells them to reload the full list instead.
+    Nothing here holds a database connection once the stream is open.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    latest = latest_event_id()
+    replay, reset, last_id = [], False, latest
+    if last_event_id:
         try:
-            days = int(due_within_days)
-            today = datetime.utcnow().date()
-            future_date = today + timedelta(days=days)
-            
-            # Include:
-            # 1. Overdue tasks (due_date < today)
-            # 2. Tasks due within N days (due_date <= today + N)
-            # Exclude tasks with no due date
-            query = query.filter(
-                Task.due_date.isnot(None),
-                Task.due_date <= future_date
-            )
+            requested = int(last_event_id)
         except ValueError:
-            pass  # Ignore invalid due_within_days values
-    
-    # Order by status (done last), then by rank for drag-and-drop ordering
-    # Using CASE to put 'done' tasks at the bottom
-    status_order = case(
-        (Task.status == 'done', 2),
-        else_=1
-    )
-    query = query.order_by(status_order, Task.rank.asc())
-    tasks = query.all()
-    return jsonify(tasks_schema.dump(tasks)), 200
+            return jsonify({'error': 'Invalid Last-Event-ID'}), 400
+        limit = current_app.config['TASK_EVENTS_REPLAY_LIMIT']
+        # Missed events were pruned, there are too many to replay, or the id
+        # comes from another database
+        if requested < pruned_through() or requested > latest:
+            reset = True
+        else:
+            replay = fetch_events(requested, limit + 1)
+            if len(replay) > limit:
+                replay, reset = [], True
+            else:
+                last_id = requested
+
+    hub = get_hub(current_app._get_current_object())
+    heartbeat = current_app.config['TASK_EVENTS_HEARTBEAT']
+
+    def stream():
+        cursor = last_id
+        yield 'retry: 3000\n\n'
+        if reset:
+            yield format_event(cursor, 'reset', '{}')
+        for event in replay:
+            yield format_event(*event)
+            cursor = event[0]
+
+        subscription = hub.subscribe(cursor)
+        try:
+            while True:
+                events = subscription.wait(heartbeat)
+                if subscription.overflowed:
+                    # Too far behind to catch up event by event
+                    yield format_event(subscription.last_id, 'reset', '{}')
+                    return
+                if not events:
+                    yield ': keep-alive\n\n'
+                for event in events:
+                    yield format_event(*event)
+        finally:
+            subscription.close()
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # Stop nginx from buffering the stream
+    })
 
 @tasks_bp.route('', methods=['POST'])
 @api_key_or_login_required
@@ -66,26 +402,32 @@ def create_task():
         
         # Auto-assign rank if not provided (add to end of list)
         if 'rank' not in data or data['rank'] is None:
-            max_rank = db.session.query(db.func.max(Task.rank)).scalar() or 0
-            data['rank'] = max_rank + 1000.0
+            data['rank'] = next_rank()
         
         task = task_schema.load(data, session=db.session)
         
         db.session.add(task)
+        db.session.flush()
+        record_event('created', {'ids': [task.id]})
         db.session.commit()
         
-        return jsonify(task_schema.dump(task)), 201
+        return jsonify(dump_tasks(load_task(task.id))), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 @tasks_bp.route('/<int:task_id>', methods=['GET'])
 @api_key_or_login_required
 def get_task(task_id):
-    task = db.session.get(Task, task_id)
+    try:
+        fieldset = parse_fieldset(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    task = load_task(task_id, fieldset)
     if not task:
         return jsonify({'error': 'Task not found'}), 404
         
-    return jsonify(task_schema.dump(task)), 200
+    return jsonify(dump_tasks(task, fieldset)), 200
 
 @tasks_bp.route('/<int:task_id>', methods=['PUT'])
 @api_key_or_login_required
@@ -96,30 +438,28 @@ def update_task(task_id):
         
     data = request.get_json()
     try:
-        # Update fields
-        # Ideally use schema.load(data, instance=task, partial=True)
-        # But for now manual update or simple merge
-        # task_schema.load(data, instance=task, partial=True, session=db.session) # marshmallow-sqlalchemy supports this
-        
-        # Simple manual update for now to avoid complexity with load_instance
-        if 'title' in data: task.title = data['title']
-        if 'description' in data: task.description = data['description']
-        if 'status' in data: task.status = data['status']
-        if 'priority_id' in data: task.priority_id = data['priority_id']
-        if 'category_id' in data: task.category_id = data['category_id']
-        if 'assignee_id' in data: task.assignee_id = data['assignee_id']
-        if 'rank' in data: task.rank = float(data['rank'])
-        if 'due_date' in data and data['due_date']: 
-             from datetime import datetime
-             # Handle ISO format from JS (e.g. 2023-10-27T10:00:00.000Z)
-             # Python < 3.11 doesn't handle Z nicely with fromisoformat, so replace it
-             dt_str = data['due_date'].replace('Z', '+00:00')
-             task.due_date = datetime.fromisoformat(dt_str)
-        elif 'due_date' in data and data['due_date'] is None:
-             task.due_date = None
+        changes = task_changes(data)
+        for field, value in changes.items():
+            setattr(task, field, value)
+        changed = {task_id: change_event(task_id, changes)}
 
+        # Respread the neighbourhood once repeated bisection has worn the gap away
+        headers = {}
+        rebalance = False
+        if 'rank' in data:
+            db.session.flush()
+            if gap_collapsed(task.id, task.rank):
+                new_ranks = renormalize_around(task.id, task.rank)
+                rebalance = new_ranks is None
+                for row_id, new_rank in (new_ranks or {}).items():
+                    changed.setdefault(row_id, {'id': row_id})['rank'] = new_rank
+                headers['X-Ranks-Rebalanced'] = 'true'
+
+        record_event('updated', {'changes': list(changed.values())})
         db.session.commit()
-        return jsonify(task_schema.dump(task)), 200
+        if rebalance:
+            rebalance_ranks_now()
+        return jsonify(dump_tasks(load_task(task_id))), 200, headers
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -131,5 +471,339 @@ def delete_task(task_id):
         return jsonify({'error': 'Task not found'}), 404
         
     db.session.delete(task)
+    record_event('deleted', {'ids': [task_id]})
     db.session.commit()
     return jsonify({'message': 'Task deleted'}), 200
+
+@tasks_bp.route('/<int:task_id>/move', methods=['POST'])
+@api_key_or_login_required
+def move_task(task_id):
+    """
+    Move a task between two neighbours, optionally into another status.
+    The rank is computed here under row locks, and only the changed fields
+    are returned, including any neighbours that had to be renumbered. If the
+    whole table had to be rebalanced, `rebalanced` is true and the client
+    should reload.
+    """
+    data = request.get_json() or {}
+    before_id = data.get('before_id')
+    after_id = data.get('after_id')
+    neighbour_ids = [i for i in (before_id, after_id) if i is not None]
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in neighbour_ids):
+        return jsonify({'error': 'before_id and after_id must be task ids'}), 400
+    if task_id in neighbour_ids:
+        return jsonify({'error': 'A task cannot be its own neighbour'}), 400
+
+    # Lock the task and its neighbours, in id order to avoid deadlocks
+    rows = (db.session.query(Task.id, Task.rank)
+            .filter(Task.id.in_([task_id] + neighbour_ids))
+            .order_by(Task.id)
+            .with_for_update()
+            .all())
+    ranks = {row.id: row.rank for row in rows}
+    if task_id not in ranks:
+        return jsonify({'error': 'Task not found'}), 404
+    if any(i not in ranks for i in neighbour_ids):
+        return jsonify({'error': 'Neighbour task not found'}), 404
+
+    try:
+        rank = rank_for_position(
+            task_id,
+            before=(before_id, ranks[before_id]) if before_id is not None else None,
+            after=(after_id, ranks[after_id]) if after_id is not None else None,
+        )
+    except ValueError as e:
+        # The client's view of the column is stale
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 409
+
+    values = {'rank': rank}
+    if data.get('status'):
+        values['status'] = data['status']
+    db.session.execute(update(Task).where(Task.id == task_id).values(**values))
+
+    changed = {task_id: dict(values, id=task_id)}
+    rebalance = False
+    if gap_collapsed(task_id, rank):
+        new_ranks = renormalize_around(task_id, rank)
+        rebalance = new_ranks is None
+        for row_id, new_rank in (new_ranks or {}).items():
+            changed.setdefault(row_id, {'id': row_id})['rank'] = new_rank
+    record_event('updated', {'changes': list(changed.values())})
+    db.session.commit()
+    if rebalance:
+        # Runs in its own transactions, after the move has committed and released its locks
+        rebalance_ranks_now()
+        return jsonify({'changed': [], 'rebalanced': True}), 200, {'X-Ranks-Rebalanced': 'true'}
+    return jsonify({'changed': list(changed.values())}), 200
+
+def rebalance_ranks_now():
+    """
+    Run rebalance_all, which commits chunk by chunk, so only call this with no
+    transaction of your own open. Every rank moves, so stream clients are
+    told to reload rather than sent each row.
+    """
+    count = rebalance_all()
+    record_event('reset', {})
+    db.session.commit()
+    return count
+
+@tasks_bp.route('/ranks/rebalance', methods=['POST'])
+@login_required
+@admin_required
+def rebalance_ranks():
+    """Respread every task rank evenly (admin only)"""
+    count = rebalance_ranks_now()
+    return jsonify({'message': 'Ranks rebalanced', 'tasks': count}), 200
+
+@tasks_bp.cli.command('rebalance-ranks')
+def rebalance_ranks_command():
+    """Respread every task rank evenly, in chunked transactions."""
+    count = rebalance_ranks_now()
+    click.echo(f'Rebalanced {count} task ranks')
+
+# --- Batch API ---
+
+BATCH_OPERATIONS = ('create', 'update', 'delete', 'get')
+
+class BatchItemError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _prepare_batch_item(item, existing_ids, seen_ids):
+    """Validate one batch operation, returning (op, task_id, payload)"""
+    if not isinstance(item, dict) or item.get('op') not in BATCH_OPERATIONS:
+        raise BatchItemError(400, f"op must be one of: {', '.join(BATCH_OPERATIONS)}")
+    op = item['op']
+
+    if op == 'create':
+        data = dict(item.get('data') or {})
+        data.pop('id', None)
+        errors = task_schema.validate(data, session=db.session)
+        if errors:
+            raise BatchItemError(400, str(errors))
+        return op, None, data
+
+    task_id = item.get('id')
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        raise BatchItemError(400, 'id must be an integer')
+    if task_id not in existing_ids:
+        raise BatchItemError(404, 'Task not found')
+    if op == 'get':
+        return op, task_id, None
+    if task_id in seen_ids:
+        raise BatchItemError(400, 'Task is modified more than once in this batch')
+    seen_ids.add(task_id)
+    if op == 'delete':
+        return op, task_id, None
+    try:
+        return op, task_id, task_changes(item.get('data') or {})
+    except (TypeError, ValueError, AttributeError) as e:
+        raise BatchItemError(400, str(e))
+
+def _insert_values(task):
+    """Every column of a loaded Task, with column defaults filled in"""
+    values = {}
+    for column in Task.__table__.columns:
+        if column.primary_key or column.computed is not None:
+            continue
+        value = getattr(task, column.key)
+        if value is None and column.default is not None:
+            default = column.default
+            value = default.arg(None) if default.is_callable else default.arg
+        values[column.key] = value
+    return values
+
+def _apply_creates(items):
+    tasks = [task_schema.load(data, session=db.session) for data in items]
+    if not db.engine.dialect.insert_executemany_returning:
+        # No multi-row RETURNING (e.g. MySQL): let the unit of work fetch ids row by row
+        db.session.add_all(tasks)
+        db.session.flush()
+        return [task.id for task in tasks]
+    # Multi-row INSERT ... RETURNING does not promise rows back in parameter
+    # order, so SQLAlchemy correlates each id with its row. Where the dialect
+    # cannot (SQLite), it inserts row by row instead.
+    return db.session.scalars(
+        insert(Task).returning(Task.id, sort_by_parameter_order=True),
+        [_insert_values(task) for task in tasks]
+    ).all()
+
+def _apply_updates(items):
+    db.session.execute(update(Task), [{'id': task_id, **changes} for task_id, changes in items])
+    return [task_id for task_id, _ in items]
+
+def _apply_deletes(items):
+    ids = [task_id for task_id, _ in items]
+    db.session.execute(delete(Task).where(Task.id.in_(ids)), execution_options={'synchronize_session': False})
+    return ids
+
+def _run_batch_group(entries, apply, best_effort):
+    """
+    Apply one group of (index, payload) entries with a single bulk statement.
+    In best-effort mode a failing group is retried item by item inside
+    savepoints, so one bad row only fails itself.
+    Returns {index: task_id} for applied items and {index: error} for failures.
+    """
+    if not entries:
+        return {}, {}
+    try:
+        with db.session.begin_nested():
+            ids = apply([payload for _, payload in entries])
+        return dict(zip((index for index, _ in entries), ids)), {}
+    except SQLAlchemyError:
+        if not best_effort:
+            raise
+    applied, failed = {}, {}
+    for index, payload in entries:
+        try:
+            with db.session.begin_nested():
+                applied[index] = apply([payload])[0]
+        except SQLAlchemyError as e:
+            failed[index] = str(getattr(e, 'orig', None) or e)
+    return applied, failed
+
+@tasks_bp.route('/batch', methods=['POST'])
+@api_key_or_login_required
+def batch_tasks():
+    """
+    Apply many create/update/delete/get operations in one transaction.
+
+    Each group of operations is written with bulk statements. In 'atomic'
+    mode (default) any invalid item aborts the whole batch; in 'best_effort'
+    mode valid items are committed and failures are reported per item.
+    """
+    data = request.get_json()
+    if not data or not isinstance(data.get('operations'), list):
+        return jsonify({'error': 'operations must be a list'}), 400
+    mode = data.get('mode', 'atomic')
+    if mode not in ('atomic', 'best_effort'):
+        return jsonify({'error': 'mode must be atomic or best_effort'}), 400
+    operations = data['operations']
+    if len(operations) > current_app.config['TASKS_BATCH_MAX_OPERATIONS']:
+        return jsonify({'error': f"At most {current_app.config['TASKS_BATCH_MAX_OPERATIONS']} operations per batch"}), 400
+    best_effort = mode == 'best_effort'
+
+    # One query to check every referenced id exists
+    referenced = {item.get('id') for item in operations if isinstance(item, dict)}
+    referenced = {i for i in referenced if isinstance(i, int) and not isinstance(i, bool)}
+    existing_ids = {row.id for row in db.session.query(Task.id).filter(Task.id.in_(referenced))} if referenced else set()
+
+    results = [None] * len(operations)
+    groups = {op: [] for op in BATCH_OPERATIONS}
+    seen_ids = set()
+    for index, item in enumerate(operations):
+        try:
+            op, task_id, payload = _prepare_batch_item(item, existing_ids, seen_ids)
+        except BatchItemError as e:
+            results[index] = {'index': index, 'status': e.status, 'error': str(e)}
+            continue
+        results[index] = {'index': index, 'op': op}
+        groups[op].append((index, task_id, payload))
+
+    failed = [r for r in results if 'error' in r]
+    if failed and not best_effort:
+        return jsonify({'committed': False, 'results': results}), 400
+
+    # Defaults for creates, resolved once for the whole batch
+    user = getattr(g, 'current_user', current_user)
+    rank = None
+    for _, _, payload in groups['create']:
+        if payload.get('assignee_id') is None:
+            payload['assignee_id'] = user.id
+        if payload.get('rank') is None:
+            rank = next_rank() if rank is None else rank + RANK_STEP
+            payload['rank'] = rank
+
+    try:
+        outcome = {}
+        for op, apply in (('create', _apply_creates), ('update', _apply_updates), ('delete', _apply_deletes)):
+            entries = [(index, payload if op == 'create' else (task_id, payload))
+                       for index, task_id, payload in groups[op]]
+            applied, errors = _run_batch_group(entries, apply, best_effort)
+            outcome.update(applied)
+            for index, message in errors.items():
+                results[index].update({'status': 400, 'error': message})
+
+        # One stream event per kind of change, covering only the applied items
+        created = [outcome[index] for index, _, _ in groups['create'] if index in outcome]
+        updated = [change_event(task_id, payload) for index, task_id, payload in groups['update'] if index in outcome]
+        deleted = [task_id for index, task_id, _ in groups['delete'] if index in outcome]
+        for kind, payload in (('created', {'ids': created}), ('updated', {'changes': updated}), ('deleted', {'ids': deleted})):
+            if next(iter(payload.values())):
+                record_event(kind, payload)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({'committed': False, 'error': str(getattr(e, 'orig', None) or e)}), 400
+
+    for index, task_id, _ in groups['get']:
+        outcome[index] = task_id
+
+    # Serialize every created, updated and fetched task from one query
+    wanted = {task_id for index, task_id in outcome.items() if results[index]['op'] != 'delete'}
+    tasks = {}
+    if wanted:
+        query = Task.query.options(*task_load_options(None, selectinload)).filter(Task.id.in_(wanted))
+        tasks = {task.id: task for task in query}
+    statuses = {'create': 201, 'update': 200, 'delete': 200, 'get': 200}
+    for index, task_id in outcome.items():
+        result = results[index]
+        result['status'] = statuses[result['op']]
+        result['id'] = task_id
+        if result['op'] == 'get' and task_id not in tasks:
+            # Deleted earlier in this same batch
+            result.update({'status': 404, 'error': 'Task not found'})
+        elif result['op'] != 'delete':
+            result['task'] = dump_tasks(tasks[task_id])
+    return jsonify({'committed': True, 'results': results}), 200
+
+@tasks_bp.cli.command('prune-tombstones')
+def prune_tombstones_command():
+    """Delete task tombstones older than TASK_TOMBSTONE_RETENTION_DAYS."""
+    from datetime import timedelta
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['TASK_TOMBSTONE_RETENTION_DAYS'])
+    count = prune_tombstones(cutoff)
+    click.echo(f'Pruned {count} task tombstones')
+
+@tasks_bp.cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'import_format', type=click.Choice(list(IMPORT_FORMATS)),
+              help='Input format (default: from the file extension).')
+@click.option('--assignee', help='Email of the user assigned to rows without an assignee.')
+def import_tasks_command(path, import_format, assignee):
+    """Import tasks from a CSV or NDJSON file, in chunked transactions."""
+    if import_format is None:
+        extension = path.rsplit('.', 1)[-1].lower()
+        import_format = {'csv': 'csv', 'ndjson': 'ndjson', 'jsonl': 'ndjson'}.get(extension)
+        if import_format is None:
+            raise click.BadParameter('cannot tell the format from the extension; use --format', param_hint='PATH')
+    default_assignee = None
+    if assignee:
+        user = User.query.filter_by(email=assignee).one_or_none()
+        if user is None:
+            raise click.BadParameter(f'no user with email {assignee}', param_hint='--assignee')
+        default_assignee = user.id
+
+    with open(path, encoding='utf-8-sig', newline='') as text:
+        try:
+            report = import_tasks(read_rows(text, import_format),
+                                  current_app.config['TASK_IMPORT_BATCH_SIZE'],
+                                  current_app.config['TASK_IMPORT_MAX_ERRORS'],
+                                  default_assignee=default_assignee)
+        except ImportFormatError as e:
+            raise click.ClickException(str(e))
+    for error in report.errors:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f'Imported {report.imported} tasks, {report.failed} failed')
+    if report.failed:
+        raise SystemExit(1)
+
+@tasks_bp.cli.command('prune-events')
+def prune_events_command():
+    """Delete stream events older than TASK_EVENT_RETENTION_HOURS."""
+    from datetime import timedelta
+    cutoff = datetime.utcnow() - timedelta(hours=current_app.config['TASK_EVENT_RETENTION_HOURS'])
+    count = prune_events(cutoff)
+    click.echo(f'Pruned {count} task events')
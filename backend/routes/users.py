@@ -1,8 +1,11 @@
 import secrets
+import click
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from backend.models import User, db
 from backend.auth.decorators import admin_required
+from backend.auth.api_keys import api_key_cache, legacy_keys, legacy_key_users
+from backend.changes import touch_tasks_assigned_to
 from werkzeug.security import generate_password_hash
 
 users_bp = Blueprint('users', __name__)
@@ -88,6 +91,8 @@ def update_system_user(user_id):
             return jsonify({'error': 'Email already in use'}), 400
         user.email = data['email']
     
+    # Name and email are embedded in the user's tasks
+    touch_tasks_assigned_to(user_id)
     db.session.commit()
     
     return jsonify({
@@ -109,8 +114,10 @@ def delete_system_user(user_id):
     if not user or not user.is_system_user:
         return jsonify({'error': 'System user not found'}), 404
     
+    touch_tasks_assigned_to(user_id)
     db.session.delete(user)
     db.session.commit()
+    api_key_cache.invalidate_user(user_id)
     
     return jsonify({'message': 'System user deleted successfully'}), 200
 
@@ -130,6 +137,7 @@ def reset_api_key(user_id):
     user.set_api_key(api_key)
     
     db.session.commit()
+    api_key_cache.invalidate_user(user_id)
     
     # Return the new API key (only shown once)
     return jsonify({
@@ -149,6 +157,7 @@ def enable_system_user(user_id):
         return jsonify({'error': 'System user not found'}), 404
     
     user.is_active = True
+    touch_tasks_assigned_to(user_id)
     db.session.commit()
     
     return jsonify({
@@ -169,10 +178,24 @@ def disable_system_user(user_id):
         return jsonify({'error': 'System user not found'}), 404
     
     user.is_active = False
+    touch_tasks_assigned_to(user_id)
     db.session.commit()
+    api_key_cache.invalidate_user(user_id)
     
     return jsonify({
         'id': user.id,
         'is_active': user.is_active,
         'message': 'System user disabled successfully'
     }), 200
+
+
+@users_bp.cli.command('revoke-legacy-keys')
+def revoke_legacy_keys_command():
+    """Revoke API keys issued before indexed key lookup; reset them to issue new ones."""
+    users = legacy_key_users().all()
+    for user in users:
+        user.api_key_hash = None
+        click.echo(f'Revoked the API key of {user.email}')
+    db.session.commit()
+    legacy_keys.remaining = False
+    click.echo(f'Revoked {len(users)} legacy API keys')
@@ -5,7 +5,7 @@ class UserSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = User
         load_instance = True
-        exclude = ('password_hash', 'totp_secret')
+        exclude = ('password_hash', 'totp_secret', 'api_key_id')
 
 class CategorySchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -22,11 +22,19 @@ class TaskSchema(ma.SQLAlchemyAutoSchema):
         model = Task
         load_instance = True
         include_fk = True
+        exclude = ('status_group',) # Generated from status for the list index
     
     assignee = ma.Nested(UserSchema)
     category = ma.Nested(CategorySchema)
     priority = ma.Nested(PrioritySchema)
 
+# Public projection of a user, nested into sparse task responses
+PUBLIC_USER_FIELDS = ('id', 'name', 'email')
+
+class SparseTaskSchema(TaskSchema):
+    """TaskSchema for `fields`/`include` requests, nesting only the public user fields"""
+    assignee = ma.Nested(UserSchema, only=PUBLIC_USER_FIELDS)
+
 class PasskeySchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Passkey
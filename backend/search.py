@@ -0,0 +1,80 @@
+"""
+Full-text search over task titles and descriptions, for GET /api/tasks?q=.
+
+SQLite keeps an external-content FTS5 table, `task_fts`, in step with `task`
+through triggers, so ORM writes, Core batch inserts and bulk updates are all
+indexed. MySQL uses a FULLTEXT index on task itself. Migration 009 adds both
+to existing databases; the listeners below add them when the schema is built
+from the models.
+
+The user's text is reduced to word tokens, so it never reaches the database's
+query syntax. All words must match. In prefix mode the last word also matches
+as a prefix, for type-ahead.
+"""
+import re
+from sqlalchemy import DDL, event, func, literal_column, table, column
+from sqlalchemy.dialects.mysql import match
+from backend.models import Task
+
+# Title matches count ten times a description match
+TITLE_WEIGHT = 10.0
+
+task_fts = table('task_fts', column('rowid'))
+
+SEARCH_DDL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+        "title, description, content='task', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+        "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+        "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+        # Only text changes touch the index, not rank moves or status changes
+        "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+        "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "INSERT INTO task_fts(task_fts) VALUES ('rebuild')",
+    ],
+    'mysql': [
+        'CREATE FULLTEXT INDEX ix_task_fulltext ON task (title, description)',
+    ],
+}
+
+for dialect, statements in SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Task.__table__, 'after_create', DDL(statement).execute_if(dialect=dialect))
+# The triggers go with the task table; the FTS table has to be dropped with it
+event.listen(Task.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS task_fts').execute_if(dialect='sqlite'))
+
+
+def search_terms(q):
+    """Word tokens of a search string; raises ValueError if there are none"""
+    terms = re.findall(r'\w+', q)
+    if not terms:
+        raise ValueError('q must contain at least one word')
+    return terms
+
+
+def apply_search(query, dialect, terms, prefix=False):
+    """
+    Restrict `query` to tasks matching every term and return (query, score).
+    Lower scores are better matches, so results sort by (score, id) ascending
+    and keyset pagination works as for the other orders.
+    """
+    if dialect == 'sqlite':
+        words = [f'"{term}"' for term in terms]
+        if prefix:
+            words[-1] += '*'
+        score = func.bm25(literal_column('task_fts'), TITLE_WEIGHT, 1.0)
+        query = (query.join(task_fts, task_fts.c.rowid == Task.id)
+                 .filter(literal_column('task_fts').op('MATCH')(' '.join(words))))
+        return query, score
+    if dialect == 'mysql':
+        # One index over both columns, so titles are not weighted up here. InnoDB
+        # ignores words shorter than innodb_ft_min_token_size (default 3) and stopwords
+        words = [f'+{term}' for term in terms]
+        if prefix:
+            words[-1] += '*'
+        relevance = match(Task.title, Task.description, against=' '.join(words)).in_boolean_mode()
+        return query.filter(relevance), -relevance
+    raise ValueError(f'Search is not supported on {dialect}')
@@ -0,0 +1,86 @@
+"""
+Aggregate task counts for GET /api/tasks/stats.
+
+Every figure is one GROUP BY or conditional-count query over indexed task
+columns, so dashboards and agents no longer download the whole list to count
+it. Dates are UTC days, like the due_within_days filter.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import case, func, select
+from backend.database import db
+from backend.models import Task
+
+# Longest range of daily counts one request may ask for
+MAX_STATS_DAYS = 366
+
+_open = Task.status != 'done'
+
+
+def due_buckets(today):
+    """Open tasks by due date: overdue, today, the following six days, later, or none"""
+    start = datetime.combine(today, datetime.min.time())
+    tomorrow = start + timedelta(days=1)
+    week_end = start + timedelta(days=7)
+    buckets = {
+        'overdue': Task.due_date < start,
+        'today': (Task.due_date >= start) & (Task.due_date < tomorrow),
+        'this_week': (Task.due_date >= tomorrow) & (Task.due_date < week_end),
+        'later': Task.due_date >= week_end,
+        'no_due_date': Task.due_date.is_(None),
+    }
+    # One pass with a conditional count per bucket; done tasks are never overdue
+    row = db.session.execute(
+        select(*[func.coalesce(func.sum(case((condition, 1), else_=0)), 0).label(name)
+                 for name, condition in buckets.items()])
+        .where(_open)
+    ).one()
+    return {name: int(row._mapping[name]) for name in buckets}
+
+
+def counts_by(column, key):
+    """[{key: value, 'total': n, 'open': n}] for each value of `column` (None for unset)"""
+    rows = db.session.execute(
+        select(column, func.count(), func.coalesce(func.sum(case((_open, 1), else_=0)), 0))
+        .group_by(column)
+        .order_by(column)
+    ).all()
+    return [{key: value, 'total': total, 'open': int(open_count)} for value, total, open_count in rows]
+
+
+def _per_day(column, start, end):
+    day = func.date(column)
+    rows = db.session.execute(
+        select(day, func.count())
+        .where(column >= start, column < end)
+        .group_by(day)
+    ).all()
+    # SQLite returns 'YYYY-MM-DD' strings, MySQL returns dates
+    return {str(value): count for value, count in rows}
+
+
+def daily_counts(first, last):
+    """Tasks created and tasks due on each day from `first` to `last` inclusive"""
+    start = datetime.combine(first, datetime.min.time())
+    end = datetime.combine(last, datetime.min.time()) + timedelta(days=1)
+    created = _per_day(Task.created_at, start, end)
+    due = _per_day(Task.due_date, start, end)
+    days = (first + timedelta(days=offset) for offset in range((last - first).days + 1))
+    return [
+        {'date': day.isoformat(), 'created': created.get(day.isoformat(), 0), 'due': due.get(day.isoformat(), 0)}
+        for day in days
+    ]
+
+
+def task_stats(today, first, last):
+    by_status = dict(db.session.execute(
+        select(Task.status, func.count()).group_by(Task.status)
+    ).all())
+    return {
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+        'due': due_buckets(today),
+        'by_assignee': counts_by(Task.assignee_id, 'assignee_id'),
+        'by_category': counts_by(Task.category_id, 'category_id'),
+        'by_priority': counts_by(Task.priority_id, 'priority_id'),
+        'per_day': daily_counts(first, last),
+    }
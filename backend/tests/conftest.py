@@ -1,16 +1,22 @@
 import pytest
 import os
+from contextlib import contextmanager
+from sqlalchemy import event
 from backend.app import create_app
+from backend.config import Config
 from backend.database import db
 from backend.models import User, Task, Category, Priority
 
+class TestConfig(Config):
+    # Config reads DATABASE_URL at import time, so setting the env var here would be too late
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    TESTING = True
+    RATE_LIMIT_ENABLED = False
+    METRICS_DIR = None
+
 @pytest.fixture
 def app():
-    os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
-    app = create_app()
-    app.config.update({
-        "TESTING": True,
-    })
+    app = create_app(TestConfig)
     
     with app.app_context():
         db.create_all()
@@ -25,3 +31,27 @@ def client(app):
 @pytest.fixture
 def runner(app):
     return app.test_cli_runner()
+
+@pytest.fixture
+def assert_max_queries(app):
+    """
+    Context manager asserting the block issues at most `limit` SQL statements.
+    Use it around a request to catch N+1 regressions.
+    """
+    @contextmanager
+    def _assert_max_queries(limit):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert len(statements) <= limit, (
+            f'{len(statements)} queries executed, expected at most {limit}:\n' + '\n'.join(statements)
+        )
+
+    return _assert_max_queries
@@ -0,0 +1,78 @@
+from backend.models import Task, db
+
+def login(client):
+    client.post('/api/auth/register', json={'email': 'batch@example.com', 'password': 'password', 'name': 'Batch User'})
+    client.post('/api/auth/login', json={'email': 'batch@example.com', 'password': 'password'})
+
+def test_batch_atomic(client):
+    login(client)
+    client.post('/api/tasks', json={'title': 'Existing 1'})
+    client.post('/api/tasks', json={'title': 'Existing 2'})
+
+    response = client.post('/api/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': {'title': 'New A', 'status': 'todo'}},
+        {'op': 'create', 'data': {'title': 'New B', 'due_date': '2026-03-01T00:00:00'}},
+        {'op': 'update', 'id': 1, 'data': {'status': 'done', 'due_date': '2026-02-01T00:00:00.000Z'}},
+        {'op': 'delete', 'id': 2},
+        {'op': 'get', 'id': 1},
+    ]})
+    assert response.status_code == 200
+    assert response.json['committed'] is True
+    results = response.json['results']
+    assert [r['status'] for r in results] == [201, 201, 200, 200, 200]
+    assert results[0]['task']['title'] == 'New A'
+    assert results[0]['task']['assignee']['email'] == 'batch@example.com'
+    # Ranks are assigned in order at the end of the list
+    assert results[0]['task']['rank'] < results[1]['task']['rank']
+    assert results[2]['task']['status'] == 'done'
+    assert results[4]['task']['due_date'] == '2026-02-01T00:00:00'
+    assert db.session.get(Task, 2) is None
+
+    # One invalid item aborts the whole batch
+    response = client.post('/api/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': {'title': 'Never created'}},
+        {'op': 'update', 'id': 999, 'data': {'title': 'Missing'}},
+    ]})
+    assert response.status_code == 400
+    assert response.json['committed'] is False
+    assert response.json['results'][1]['status'] == 404
+    assert Task.query.filter_by(title='Never created').count() == 0
+
+def test_batch_best_effort(client):
+    login(client)
+    client.post('/api/tasks', json={'title': 'Existing'})
+
+    response = client.post('/api/tasks/batch', json={'mode': 'best_effort', 'operations': [
+        {'op': 'create', 'data': {'title': 'Kept'}},
+        {'op': 'create', 'data': {'description': 'No title'}},
+        {'op': 'update', 'id': 1, 'data': {'title': 'Renamed'}},
+        {'op': 'delete', 'id': 1},
+        {'op': 'explode'},
+    ]})
+    assert response.status_code == 200
+    results = response.json['results']
+    assert [r['status'] for r in results] == [201, 400, 200, 400, 400]
+    assert Task.query.filter_by(title='Kept').count() == 1
+    assert db.session.get(Task, 1).title == 'Renamed'
+
+def test_batch_uses_bulk_statements(client, assert_max_queries):
+    login(client)
+    operations = [{'op': 'create', 'data': {'title': f'Task {i}'}} for i in range(50)]
+    # Auth, rank lookup, savepoint, version bump, commit and reload stay constant.
+    # The insert is one statement where the dialect can return ids in parameter
+    # order (PostgreSQL); SQLite falls back to one INSERT per row.
+    with assert_max_queries(12 + len(operations)) as statements:
+        response = client.post('/api/tasks/batch', json={'operations': operations})
+    assert response.status_code == 200
+    assert len([s for s in statements if not s.startswith('INSERT INTO task ')]) <= 11
+    assert Task.query.count() == 50
+
+def test_batch_create_invalidates_task_etag(client):
+    login(client)
+    client.post('/api/tasks', json={'title': 'Existing'})
+    etag = client.get('/api/tasks').headers['ETag']
+
+    client.post('/api/tasks/batch', json={'operations': [{'op': 'create', 'data': {'title': 'Bulk'}}]})
+    response = client.get('/api/tasks', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.json) == 2
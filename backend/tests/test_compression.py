@@ -0,0 +1,70 @@
+import gzip
+import json
+import zlib
+from flask import Response
+from backend.compression import compress_response, compression_stats
+
+GZIP = {'Accept-Encoding': 'gzip, deflate'}
+
+def login(client):
+    client.post('/api/auth/register', json={'email': 'gzip@example.com', 'password': 'password', 'name': 'Gzip User'})
+    client.post('/api/auth/login', json={'email': 'gzip@example.com', 'password': 'password'})
+
+def create_tasks(client, count):
+    client.post('/api/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': {'title': f'Task {i}', 'description': 'Compressible text'}} for i in range(count)
+    ]})
+
+def test_large_json_is_gzipped_and_cached_by_etag(client):
+    login(client)
+    create_tasks(client, 50)
+    compression_stats.reset()
+
+    plain = client.get('/api/tasks')
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    response = client.get('/api/tasks', headers=GZIP)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert int(response.headers['Content-Length']) == len(response.data) < len(plain.data) / 4
+    assert json.loads(gzip.decompress(response.data)) == plain.json
+
+    # The same ETag reuses the compressed bytes
+    again = client.get('/api/tasks', headers=GZIP)
+    assert again.data == response.data
+    stats = compression_stats.snapshot()
+    assert stats['responses'] == 2 and stats['cache_hits'] == 1
+    assert stats['ratio'] > 4
+
+def test_small_bodies_are_sent_as_is(client):
+    login(client)
+    create_tasks(client, 1)
+    response = client.get('/api/tasks', headers=GZIP)
+    assert 'Content-Encoding' not in response.headers
+    assert response.json[0]['title'] == 'Task 0'
+
+def test_export_stream_is_gzipped_per_chunk(client):
+    login(client)
+    client.application.config['TASK_EXPORT_BATCH_SIZE'] = 10
+    create_tasks(client, 30)
+
+    response = client.get('/api/tasks/export', headers=GZIP, buffered=False)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    # Each chunk decodes as soon as it arrives
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    lines = []
+    for chunk in response.response:
+        text = decompressor.decompress(chunk).decode()
+        assert text == '' or text.endswith('\n')
+        lines += text.splitlines()
+    response.close()
+    assert [json.loads(line)['title'] for line in lines] == [f'Task {i}' for i in range(30)]
+
+def test_event_streams_are_not_compressed(app):
+    with app.test_request_context(headers=GZIP):
+        response = compress_response(Response(iter(['data: {}\n\n']), mimetype='text/event-stream'))
+    assert 'Content-Encoding' not in response.headers
+
+def test_health_reports_compression(client):
+    assert set(client.get('/health').json['compression']) >= {'ratio', 'cpu_seconds', 'bytes_in', 'bytes_out'}
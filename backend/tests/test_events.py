@@ -0,0 +1,94 @@
+import json
+import time
+from datetime import datetime, timedelta
+from backend.events import EventHub, prune_events
+
+
+def read_events(response, count):
+    """Read `count` events from a streaming response, skipping comments and the retry hint"""
+    events = []
+    stream = iter(response.response)
+    while len(events) < count:
+        chunk = next(stream)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        # A keep-alive means the replay is over and the stream went live
+        assert not chunk.startswith(':'), f'expected {count} events, got {events}'
+        if not chunk.startswith('id:'):
+            continue
+        lines = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+        events.append((int(lines['id']), lines['event'], json.loads(lines['data'])))
+    response.close()
+    return events
+
+
+def test_task_events_replay(client):
+    client.post('/api/auth/register', json={'email': 'sse@example.com', 'password': 'password', 'name': 'SSE User'})
+    client.post('/api/auth/login', json={'email': 'sse@example.com', 'password': 'password'})
+
+    client.application.config['TASK_EVENTS_HEARTBEAT'] = 0.1
+    task_id = client.post('/api/tasks', json={'title': 'Streamed', 'status': 'todo'}).json['id']
+    client.put(f'/api/tasks/{task_id}', json={'status': 'done'})
+    client.post('/api/tasks/batch', json={'operations': [{'op': 'create', 'data': {'title': 'Batched'}}]})
+    client.delete(f'/api/tasks/{task_id}')
+
+    response = client.get('/api/tasks/events', headers={'Last-Event-ID': '0'}, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = read_events(response, 4)
+    assert [kind for _, kind, _ in events] == ['created', 'updated', 'created', 'deleted']
+    assert events[0][2] == {'ids': [task_id]}
+    assert events[1][2] == {'changes': [{'id': task_id, 'status': 'done'}]}
+    assert events[3][2] == {'ids': [task_id]}
+
+    # Resuming from an event id replays only what came after it
+    response = client.get('/api/tasks/events', headers={'Last-Event-ID': str(events[2][0])}, buffered=False)
+    assert read_events(response, 1) == [events[3]]
+
+    # Once the missed events are pruned the client is told to reload
+    client.post('/api/tasks', json={'title': 'Later', 'status': 'todo'})
+    with client.application.app_context():
+        prune_events(datetime.utcnow() + timedelta(seconds=1))
+    response = client.get('/api/tasks/events', headers={'Last-Event-ID': str(events[0][0])}, buffered=False)
+    assert read_events(response, 1)[0][1] == 'reset'
+
+
+def test_task_events_requires_auth(client):
+    response = client.get('/api/tasks/events')
+    assert response.status_code == 401
+
+
+def wait_for(subscription, count):
+    events = []
+    deadline = time.monotonic() + 2
+    while len(events) < count and time.monotonic() < deadline:
+        events += subscription.wait(0.1)
+    return events
+
+
+def test_event_hub_fans_out_one_poll():
+    log = []
+
+    def fetch(after_id, limit):
+        return [event for event in log if event[0] > after_id][:limit]
+
+    hub = EventHub(fetch, interval=0.01)
+    first = hub.subscribe(0)
+    second = hub.subscribe(0)
+    log.extend([(1, 'created', '{"ids":[1]}'), (3, 'deleted', '{"ids":[1]}')])
+
+    assert [e[0] for e in wait_for(first, 2)] == [1, 3]
+    assert [e[0] for e in wait_for(second, 2)] == [1, 3]
+    # A late subscriber catches up from the hub's buffer
+    late = hub.subscribe(1)
+    assert [e[0] for e in late.wait(1)] == [3]
+
+    # An event that commits late with a lower id is still delivered, once
+    log.insert(1, (2, 'updated', '{"changes":[]}'))
+    log.append((4, 'updated', '{"changes":[]}'))
+    assert sorted(e[0] for e in wait_for(first, 2)) == [2, 4]
+    assert first.wait(0.05) == []
+
+    for subscription in (first, second, late):
+        subscription.close()
+    time.sleep(0.05)
+    assert hub._thread is None
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from backend.models import Category, db
+
+def login(client):
+    client.post('/api/auth/register', json={'email': 'export@example.com', 'password': 'password', 'name': 'Export User'})
+    client.post('/api/auth/login', json={'email': 'export@example.com', 'password': 'password'})
+
+def test_export_ndjson_streams_in_batches(client):
+    login(client)
+    client.application.config['TASK_EXPORT_BATCH_SIZE'] = 2
+    for i in range(5):
+        client.post('/api/tasks', json={'title': f'Task {i}', 'due_date': '2026-03-01T09:00:00' if i == 0 else None})
+
+    response = client.get('/api/tasks/export', buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    chunks = [chunk.decode() for chunk in response.response]
+    response.close()
+    assert len(chunks) == 3
+    tasks = [json.loads(line) for line in ''.join(chunks).splitlines()]
+    assert [task['title'] for task in tasks] == [f'Task {i}' for i in range(5)]
+    # The same representation as the list, without nested objects
+    assert tasks[0]['due_date'] == '2026-03-01T09:00:00'
+    assert 'assignee' not in tasks[0] and tasks[0]['assignee_id'] == 1
+
+def test_export_csv_with_filters_and_fields(client):
+    login(client)
+    category = Category(name='Ops')
+    db.session.add(category)
+    db.session.commit()
+    client.post('/api/tasks', json={'title': 'Restart, carefully', 'category_id': category.id, 'status': 'done'})
+    client.post('/api/tasks', json={'title': 'Patch', 'category_id': category.id})
+    client.post('/api/tasks', json={'title': 'Elsewhere'})
+
+    response = client.get(f'/api/tasks/export?format=csv&category_id={category.id}&sort=-created_at&fields=id,title,status,due_date')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert 'attachment' in response.headers['Content-Disposition']
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows == [
+        ['id', 'title', 'due_date', 'status'],
+        ['2', 'Patch', '', 'todo'],
+        ['1', 'Restart, carefully', '', 'done'],
+    ]
+
+def test_export_rejects_invalid_parameters(client):
+    login(client)
+    assert client.get('/api/tasks/export?format=xml').status_code == 400
+    assert client.get('/api/tasks/export?status=archived').status_code == 400
+    assert client.get('/api/tasks/export?limit=10').status_code == 400
@@ -0,0 +1,92 @@
+import pytest
+from datetime import datetime
+from backend.models import Task, User, Category, Priority, db
+
+def login(client):
+    client.post('/api/auth/register', json={'email': 'filter@example.com', 'password': 'password', 'name': 'Filter User'})
+    client.post('/api/auth/login', json={'email': 'filter@example.com', 'password': 'password'})
+
+@pytest.fixture
+def tasks(client):
+    """Six tasks across two users, categories, priorities, statuses and due dates"""
+    login(client)
+    other = User(name='Other', email='other@example.com')
+    ops, docs = Category(name='Ops'), Category(name='Docs')
+    high, low = Priority(name='High', level=3), Priority(name='Low', level=1)
+    db.session.add_all([other, ops, docs, high, low])
+    db.session.commit()
+    specs = [
+        ('Mine urgent', dict(category_id=ops.id, priority_id=high.id, due_date='2026-03-01T09:00:00')),
+        ('Mine later', dict(category_id=docs.id, priority_id=low.id, due_date='2026-05-01T09:00:00', status='in_progress')),
+        ('Mine done', dict(category_id=ops.id, due_date='2026-02-01T09:00:00', status='done')),
+        ('Theirs', dict(assignee_id=other.id, priority_id=high.id, due_date='2026-03-15T09:00:00')),
+        ('Unassigned', dict(assignee_id=None, priority_id=low.id)),
+        ('No dates', dict()),
+    ]
+    for title, data in specs:
+        client.post('/api/tasks', json={'title': title, **data})
+    # The create route assigns the current user by default
+    db.session.query(Task).filter_by(title='Unassigned').update({'assignee_id': None})
+    db.session.query(Task).filter_by(title='No dates').update({'created_at': datetime(2026, 1, 1)})
+    db.session.commit()
+    return {'other': other.id, 'ops': ops.id, 'docs': docs.id, 'high': high.id, 'low': low.id}
+
+def titles(client, query):
+    response = client.get(f'/api/tasks?{query}')
+    assert response.status_code == 200, response.json
+    return sorted(task['title'] for task in response.json)
+
+def test_filters(client, tasks):
+    assert titles(client, 'assignee_id=me') == ['Mine done', 'Mine later', 'Mine urgent', 'No dates']
+    assert titles(client, f"assignee_id={tasks['other']},none") == ['Theirs', 'Unassigned']
+    assert titles(client, f"category_id={tasks['ops']}") == ['Mine done', 'Mine urgent']
+    assert titles(client, f"priority_id={tasks['high']}&assignee_id=me") == ['Mine urgent']
+    assert titles(client, 'status=todo,in_progress&assignee_id=me') == ['Mine later', 'Mine urgent', 'No dates']
+    # A date upper bound covers the whole day
+    assert titles(client, 'due_from=2026-03-01&due_to=2026-03-15') == ['Mine urgent', 'Theirs']
+    assert titles(client, 'due_to=2026-03-01T08:00:00Z') == ['Mine done']
+    assert titles(client, 'created_to=2026-01-01') == ['No dates']
+    assert len(titles(client, 'updated_from=2026-01-01')) == 6
+
+@pytest.mark.parametrize('query', [
+    'assignee_id=someone', 'category_id=1,x', 'priority_id=,', 'status=todo,archived', 'status=,',
+    'due_within_days=soon', 'due_from=March', 'created_to=2026-13-01', 'sort=title', 'colour=red',
+])
+def test_invalid_filters_are_rejected(client, tasks, query):
+    response = client.get(f'/api/tasks?{query}')
+    assert response.status_code == 400
+    assert response.json['error']
+
+def test_since_cannot_be_combined_with_filters(client, tasks):
+    assert client.get('/api/tasks?since=0&assignee_id=me').status_code == 400
+
+@pytest.mark.parametrize('sort, expected', [
+    # Tasks without a due date come first ascending and last descending
+    ('due_date', ['Unassigned', 'No dates', 'Mine done', 'Mine urgent', 'Theirs', 'Mine later']),
+    ('-due_date', ['Mine later', 'Theirs', 'Mine urgent', 'Mine done', 'No dates', 'Unassigned']),
+    ('priority', ['Mine urgent', 'Theirs', 'Mine later', 'Unassigned', 'No dates', 'Mine done']),
+    ('created_at', ['No dates', 'Mine urgent', 'Mine later', 'Mine done', 'Theirs', 'Unassigned']),
+])
+def test_sorts_page_consistently(client, tasks, sort, expected):
+    full = client.get(f'/api/tasks?sort={sort}').json
+    assert [task['title'] for task in full] == expected
+
+    seen, cursor = [], None
+    while True:
+        params = {'sort': sort, 'limit': 1, **({'cursor': cursor} if cursor else {})}
+        response = client.get('/api/tasks', query_string=params)
+        assert response.status_code == 200
+        seen += [task['title'] for task in response.json]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert seen == expected
+
+def test_me_filter_etag_is_per_user(client, tasks):
+    etag = client.get('/api/tasks?assignee_id=me').headers['ETag']
+    client.post('/api/auth/logout')
+    client.post('/api/auth/register', json={'email': 'second@example.com', 'password': 'password', 'name': 'Second'})
+    client.post('/api/auth/login', json={'email': 'second@example.com', 'password': 'password'})
+    response = client.get('/api/tasks?assignee_id=me', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json == []
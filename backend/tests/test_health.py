@@ -1,5 +1,45 @@
+from backend.app import create_app
+from backend.config import Config, engine_options
+from backend.database import db
+
 def test_health_check(client):
     response = client.get('/health')
     assert response.status_code == 200
     assert response.json['status'] == 'ok'
     assert response.json['database'] == 'connected'
+
+def test_health_reports_pool_counters(tmp_path):
+    class PoolConfig(Config):
+        TESTING = True
+        RATE_LIMIT_ENABLED = False
+        METRICS_DIR = None
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "pool.db"}'
+        DB_POOL_SIZE = 3
+        DB_MAX_OVERFLOW = 2
+
+    app = create_app(PoolConfig)
+    with app.app_context():
+        assert db.engine.pool.size() == 3
+        assert db.engine.pool._max_overflow == 2
+        response = app.test_client().get('/health')
+        db.session.remove()
+        db.engine.dispose()
+
+    assert response.status_code == 200
+    pool = response.json['pool']
+    assert pool['class'] == 'QueuePool'
+    assert pool['size'] == 3
+    assert pool['checkedout'] == 0  # Counted before the check borrows a connection
+    assert 'overflow' in pool and 'checkedin' in pool
+
+def test_engine_options_from_config():
+    config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+    config.update(SQLALCHEMY_DATABASE_URI='mysql://app@db/tasks', DB_POOL_RECYCLE=600, DB_STATEMENT_TIMEOUT_MS=5000)
+    options = engine_options(config)
+    assert options['pool_recycle'] == 600
+    assert options['pool_pre_ping'] is True
+    assert options['connect_args'] == {'init_command': 'SET SESSION max_execution_time = 5000'}
+
+    # The shared in-memory connection has nothing to size
+    config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    assert engine_options(config) == {'pool_pre_ping': True}
@@ -0,0 +1,89 @@
+import json
+from backend.models import Task, TaskEvent, User, Category, Priority, db
+
+def login(client):
+    client.post('/api/auth/register', json={'email': 'import@example.com', 'password': 'password', 'name': 'Import User'})
+    client.post('/api/auth/login', json={'email': 'import@example.com', 'password': 'password'})
+
+def references():
+    db.session.add_all([User(name='Ada', email='ada@example.com'), Category(name='Ops'), Priority(name='High', level=3)])
+    db.session.commit()
+
+def test_csv_import_resolves_names_and_reports_bad_rows(client):
+    login(client)
+    references()
+    client.application.config['TASK_IMPORT_BATCH_SIZE'] = 2
+    client.post('/api/tasks', json={'title': 'Existing'})
+    body = (
+        'title,status,due_date,assignee,category,priority\n'
+        'Migrate DNS,in_progress,2026-11-01,ada@example.com,ops,High\n'
+        'Bad status,doing,,,,\n'
+        'Write runbook,,2026-11-02T09:00:00Z,Ada,,\n'
+        ',todo,,,,\n'
+        'Unknown category,,,,Nope,\n'
+        'Mine,done,,,,\n'
+    )
+    response = client.post('/api/tasks/import', data=body, content_type='text/csv')
+    assert response.status_code == 200
+    assert response.json['imported'] == 3 and response.json['failed'] == 3
+    assert [(e['line'], e['error']) for e in response.json['errors']] == [
+        (3, 'Unknown status: doing. Use one of todo, in_progress, done'),
+        (5, 'title is required'),
+        (6, 'Unknown category: Nope'),
+    ]
+
+    tasks = {task['title']: task for task in client.get('/api/tasks').json}
+    ada = User.query.filter_by(name='Ada').one().id
+    assert tasks['Migrate DNS']['assignee_id'] == ada
+    assert tasks['Migrate DNS']['category']['name'] == 'Ops'
+    assert tasks['Migrate DNS']['priority']['name'] == 'High'
+    assert tasks['Write runbook']['due_date'] == '2026-11-02T09:00:00'
+    assert tasks['Mine']['assignee_id'] == tasks['Existing']['assignee_id']
+    # Appended after the existing task, in file order
+    ranks = [tasks[title]['rank'] for title in ('Existing', 'Migrate DNS', 'Write runbook', 'Mine')]
+    assert ranks == sorted(ranks) and len(set(ranks)) == 4
+    # Indexed for search and announced to streams
+    assert [task['title'] for task in client.get('/api/tasks?q=runbook').json] == ['Write runbook']
+    assert TaskEvent.query.order_by(TaskEvent.id.desc()).first().kind == 'reset'
+
+def test_ndjson_import_and_export_round_trip(client):
+    login(client)
+    lines = [
+        json.dumps({'title': 'First', 'description': 'Body', 'rank': 5}),
+        '{not json',
+        json.dumps({'title': 'Second', 'colour': 'red'}),
+        json.dumps(['not', 'an', 'object']),
+        json.dumps({'title': 'Third', 'priority_id': 99}),
+    ]
+    response = client.post('/api/tasks/import?format=ndjson', data='\n'.join(lines))
+    assert response.json == {'imported': 1, 'failed': 4, 'errors': [
+        {'line': 2, 'error': 'Invalid JSON'},
+        {'line': 3, 'error': 'Unknown field: colour'},
+        {'line': 4, 'error': 'Each line must be a JSON object'},
+        {'line': 5, 'error': 'Unknown priority_id: 99'},
+    ]}
+
+    exported = client.get('/api/tasks/export?format=csv').data
+    response = client.post('/api/tasks/import', data=exported, content_type='text/csv')
+    assert response.json == {'imported': 1, 'failed': 0, 'errors': []}
+    copies = Task.query.filter_by(title='First').all()
+    assert len(copies) == 2 and {task.description for task in copies} == {'Body'}
+
+def test_unreadable_input_is_rejected(client):
+    login(client)
+    assert client.post('/api/tasks/import', data='title\nA\n').status_code == 400
+    response = client.post('/api/tasks/import', data='title,owner\nA,b\n', content_type='text/csv')
+    assert response.status_code == 400
+    assert response.json['error'] == 'Unknown field: owner'
+    assert Task.query.count() == 0
+
+def test_import_command(runner, tmp_path):
+    references()
+    path = tmp_path / 'tasks.csv'
+    path.write_text('title,priority\nFrom the CLI,high\nBroken,Missing\n')
+    result = runner.invoke(args=['tasks', 'import', str(path), '--assignee', 'ada@example.com'])
+    assert result.exit_code == 1
+    assert 'line 3: Unknown priority: Missing' in result.output
+    assert 'Imported 1 tasks, 1 failed' in result.output
+    task = Task.query.filter_by(title='From the CLI').one()
+    assert task.assignee_id == User.query.filter_by(email='ada@example.com').one().id
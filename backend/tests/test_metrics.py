@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+from backend.metrics import MetricsDirectory, registry, render, _labels
+
+def login(client):
+    client.post('/api/auth/register', json={'email': 'metrics@example.com', 'password': 'password', 'name': 'Metrics User'})
+    client.post('/api/auth/login', json={'email': 'metrics@example.com', 'password': 'password'})
+
+def test_server_timing_header(client):
+    login(client)
+    client.post('/api/tasks', json={'title': 'Timed'})
+    timing = client.get('/api/tasks').headers['Server-Timing']
+    parts = [part.split(';')[0] for part in timing.split(', ')]
+    assert parts == ['app', 'db', 'serialize']
+    assert 'queries"' in timing
+
+def test_metrics_endpoint(client):
+    login(client)
+    registry.reset()
+    client.get('/api/tasks')
+    client.get('/api/tasks/12345')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.text
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/tasks",status="200"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/tasks/<int:task_id>",status="404"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/tasks",status="200",le="+Inf"} 1' in text
+    assert 'db_queries_per_request_count{route="/api/tasks"} 1' in text
+    assert 'serialization_seconds_total{route="/api/tasks"}' in text
+    assert 'http_response_bytes_total{route="/api/tasks"}' in text
+    assert 'gzip_responses_total' in text
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+def test_worker_snapshots_are_summed(tmp_path):
+    directory = MetricsDirectory(str(tmp_path))
+    route = _labels(route='/api/tasks')
+    pool = _labels(bind='primary', state='checkedout')
+    snapshot = {
+        'counters': {'http_response_bytes_total': {route: 100}},
+        'histograms': {'db_queries_per_request': {route: [[0, 1, 0, 0, 0, 0, 0, 0], 1, 1]}},
+        'gauges': {'db_pool_connections': {pool: 2}},
+    }
+    directory.write(snapshot)
+    for pid in (os.getppid(), dead_pid()):
+        (tmp_path / f'{pid}-1.json').write_text(json.dumps(snapshot))
+
+    for _ in range(2):
+        # The exited worker is archived on the first collect and still counted on the second
+        total = directory.collect()
+        assert total['counters']['http_response_bytes_total'][route] == 300
+        assert total['histograms']['db_queries_per_request'][route] == [[0, 3, 0, 0, 0, 0, 0, 0], 3, 3]
+        assert total['gauges']['db_pool_connections'][pool] == 4
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith('.json')) == sorted(
+        ['archive.json', os.path.basename(directory.filename()), f'{os.getppid()}-1.json'])
+
+    text = render(total)
+    assert 'db_queries_per_request_bucket{route="/api/tasks",le="1"} 3' in text
+    assert 'db_queries_per_request_bucket{route="/api/tasks",le="+Inf"} 3' in text
+
+def test_failed_statements_do_not_skew_query_timing(app):
+    from flask import g
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from backend.database import db
+
+    with app.test_request_context('/api/tasks'):
+        with db.engine.connect() as connection:
+            for _ in range(3):
+                try:
+                    connection.execute(text('SELECT * FROM no_such_table'))
+                except OperationalError:
+                    connection.rollback()
+            connection.execute(text('SELECT 1'))
+            assert '_metrics_started' not in connection.info
+        assert g._queries == 1
+        assert 0 < g._timings['db'] < 1
@@ -0,0 +1,263 @@
+import os
+import re
+import sqlite3
+import pytest
+from sqlalchemy import event, inspect, text
+from backend.app import create_app
+from backend.database import db
+from backend.config import Config
+from backend.migrate import upgrade, stamp, applied_versions, discover, check_schema, MigrationError
+from backend import migrate
+
+
+def write_migrations(directory, scripts):
+    for filename, sql in scripts.items():
+        (directory / filename).write_text(sql)
+
+
+def drop_version_table():
+    migrate.metadata.drop_all(db.engine)
+
+
+def test_upgrade_records_versions(app, tmp_path):
+    db.drop_all()
+    drop_version_table()
+    write_migrations(tmp_path, {
+        '001_first.sql': 'ALTER TABLE task ADD COLUMN never_run INTEGER;',
+        '002_second.sql': '-- comment\nCREATE INDEX ix_never_run ON task (title);',
+    })
+
+    # An empty database is built from the models and every script marked applied
+    assert upgrade(tmp_path) == [1, 2]
+    assert 'never_run' not in {c['name'] for c in inspect(db.engine).get_columns('task')}
+
+    write_migrations(tmp_path, {'003_third.sql': 'CREATE INDEX ix_task_title ON task (title);\n'})
+    assert upgrade(tmp_path) == [3]
+    assert upgrade(tmp_path) == []
+    with db.engine.connect() as connection:
+        assert applied_versions(connection) == {1, 2, 3}
+    assert 'ix_task_title' in {i['name'] for i in inspect(db.engine).get_indexes('task')}
+
+
+def test_dialect_variant_replaces_script(app, tmp_path):
+    write_migrations(tmp_path, {
+        '001_first.sql': 'SELECT 1;',
+        '002_audit.sql': 'CREATE FULLTEXT INDEX ix_never_run ON task (title);',
+        '002_audit.sqlite.sql': (
+            'CREATE TABLE audit (task_id INTEGER);\n'
+            'CREATE TRIGGER task_audit AFTER INSERT ON task BEGIN\n'
+            '    INSERT INTO audit VALUES (new.id);\n'
+            '    INSERT INTO audit VALUES (-new.id);\n'
+            'END;\n'
+        ),
+    })
+    assert [path.name for _, _, path in discover(tmp_path, 'sqlite')] == ['001_first.sql', '002_audit.sqlite.sql']
+    assert [path.name for _, _, path in discover(tmp_path, 'mysql')] == ['001_first.sql', '002_audit.sql']
+
+    drop_version_table()
+    stamp(1, tmp_path)
+    assert upgrade(tmp_path) == [2]
+    with db.engine.begin() as connection:
+        connection.execute(text("INSERT INTO task (title, status, `rank`) VALUES ('Audited', 'todo', 1)"))
+        assert connection.execute(text('SELECT count(*) FROM audit')).scalar() == 2
+        connection.execute(text('DROP TABLE audit'))
+
+
+def test_unversioned_database_must_be_stamped(app, tmp_path):
+    write_migrations(tmp_path, {
+        '001_first.sql': 'SELECT 1;',
+        '002_second.sql': 'CREATE INDEX ix_task_title ON task (title);',
+    })
+    # Tables exist but nothing says which scripts ran
+    drop_version_table()
+    with pytest.raises(MigrationError):
+        upgrade(tmp_path)
+
+    stamp(1, tmp_path)
+    assert upgrade(tmp_path) == [2]
+
+
+def test_index_migration_applies_to_existing_schema(app):
+    # Rebuild the task table as it was before 008
+    with db.engine.begin() as connection:
+        for index in ('ix_task_status_group_rank', 'ix_task_status_rank', 'ix_task_due_date', 'ix_task_created_at',
+                      'ix_task_assignee_rank', 'ix_task_category_rank', 'ix_task_priority_rank'):
+            connection.execute(text(f'DROP INDEX {index}'))
+        connection.execute(text('ALTER TABLE task DROP COLUMN status_group'))
+        connection.execute(text('DROP TABLE task_fts'))
+        for trigger in ('task_fts_ai', 'task_fts_ad', 'task_fts_au'):
+            connection.execute(text(f'DROP TRIGGER {trigger}'))
+        connection.execute(text("INSERT INTO task (title, status, `rank`) VALUES ('Written before 009', 'todo', 1)"))
+    drop_version_table()
+    stamp(7)
+
+    assert upgrade() == [version for version, _, _ in discover() if version > 7]
+    indexes = {i['name'] for i in inspect(db.engine).get_indexes('task')}
+    assert {'ix_task_status_group_rank', 'ix_task_status_rank', 'ix_task_due_date', 'ix_task_created_at',
+            'ix_task_assignee_rank', 'ix_task_category_rank', 'ix_task_priority_rank'} <= indexes
+    # 011 replaced the single-column indexes of 008 and 010
+    assert not {'ix_task_assignee_id', 'ix_task_category_id', 'ix_task_priority_id'} & indexes
+    # 009 indexed the existing task and installed the sync triggers
+    with db.engine.begin() as connection:
+        connection.execute(text("UPDATE task SET title = 'Renamed after 009'"))
+        assert connection.execute(text("SELECT count(*) FROM task_fts WHERE task_fts MATCH 'renamed'")).scalar() == 1
+        assert connection.execute(text("SELECT count(*) FROM task_fts WHERE task_fts MATCH 'written'")).scalar() == 0
+
+
+# The schema as of 002, before the migration runner existed
+BASELINE_SCHEMA = """
+CREATE TABLE user (
+    id INTEGER NOT NULL PRIMARY KEY, email VARCHAR(120) NOT NULL UNIQUE, name VARCHAR(80) NOT NULL,
+    password_hash VARCHAR(255), totp_secret VARCHAR(32), is_admin BOOLEAN, is_system_user BOOLEAN,
+    api_key_hash VARCHAR(255), is_active BOOLEAN, created_at DATETIME
+);
+CREATE TABLE category (id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(50) NOT NULL UNIQUE, color VARCHAR(7));
+CREATE TABLE priority (id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(50) NOT NULL UNIQUE, level INTEGER);
+CREATE TABLE task (
+    id INTEGER NOT NULL PRIMARY KEY, title VARCHAR(200) NOT NULL, description TEXT, due_date DATETIME,
+    status VARCHAR(20), `rank` FLOAT NOT NULL, assignee_id INTEGER REFERENCES user (id),
+    category_id INTEGER REFERENCES category (id), priority_id INTEGER REFERENCES priority (id),
+    created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE passkey (
+    id INTEGER NOT NULL PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES user (id),
+    credential_id VARCHAR(255) NOT NULL UNIQUE, public_key TEXT NOT NULL, sign_count INTEGER,
+    name VARCHAR(100), created_at DATETIME
+);
+"""
+
+
+def test_baseline_sqlite_database_upgrades(tmp_path):
+    path = tmp_path / 'baseline.db'
+    connection = sqlite3.connect(path)
+    connection.executescript(BASELINE_SCHEMA)
+    connection.close()
+
+    class BaselineConfig(Config):
+        TESTING = True
+        RATE_LIMIT_ENABLED = False
+        METRICS_DIR = None
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    app = create_app(BaselineConfig)
+    with app.app_context():
+        stamp(2)
+        assert upgrade() == [version for version, _, _ in discover() if version > 2]
+        client = app.test_client()
+        client.post('/api/auth/register', json={'email': 'old@example.com', 'password': 'password', 'name': 'Old User'})
+        client.post('/api/auth/login', json={'email': 'old@example.com', 'password': 'password'})
+        task_id = client.post('/api/tasks', json={'title': 'After upgrade'}).json['id']
+        assert client.delete(f'/api/tasks/{task_id}').status_code == 200
+        assert client.get('/api/tasks?q=upgrade').json == []
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_boot_creates_empty_database_and_warns_when_behind(app, caplog):
+    # The fixture's empty in-memory database was created and stamped on boot
+    with db.engine.connect() as connection:
+        assert applied_versions(connection) == {version for version, _, _ in discover()}
+    check_schema(app)
+    assert not caplog.records
+
+    with db.engine.begin() as connection:
+        connection.execute(migrate.schema_migrations.delete().where(migrate.schema_migrations.c.version == migrate.latest_version()))
+    check_schema(app)
+    assert 'flask migrations upgrade' in caplog.text
+
+
+# --- EXPLAIN checks for the hot GET /api/tasks queries ---
+
+DATABASES = ['sqlite']
+if os.environ.get('TEST_MYSQL_URL'):
+    DATABASES.append('mysql')
+
+
+@pytest.fixture(params=DATABASES + ([] if 'mysql' in DATABASES else [
+    pytest.param('mysql', marks=pytest.mark.skip(reason='set TEST_MYSQL_URL to run against MySQL'))
+]))
+def explain_client(request):
+    class ExplainConfig(Config):
+        TESTING = True
+        RATE_LIMIT_ENABLED = False
+        METRICS_DIR = None
+        SQLALCHEMY_DATABASE_URI = os.environ['TEST_MYSQL_URL'] if request.param == 'mysql' else 'sqlite:///:memory:'
+
+    app = create_app(ExplainConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        client = app.test_client()
+        client.post('/api/auth/register', json={'email': 'plan@example.com', 'password': 'password', 'name': 'Plan User'})
+        client.post('/api/auth/login', json={'email': 'plan@example.com', 'password': 'password'})
+        statuses = ('todo', 'in_progress', 'done')
+        client.post('/api/tasks/batch', json={'operations': [
+            {'op': 'create', 'data': {'title': f'Task {i}', 'status': statuses[i % 3],
+                                      'due_date': f'2026-{i % 12 + 1:02d}-01T00:00:00' if i % 4 else None}}
+            for i in range(300)
+        ]})
+        with db.engine.begin() as connection:
+            connection.execute(text('ANALYZE task' if request.param == 'sqlite' else 'ANALYZE TABLE task'))
+        yield client
+        db.session.remove()
+        db.drop_all()
+
+
+def task_list_plan(client, url):
+    """Run EXPLAIN on the ordered task SELECT issued by `url`: (indexes, sorts)"""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith('SELECT') and 'FROM task' in statement and 'ORDER BY' in statement:
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        assert client.get(url).status_code == 200
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    statement, parameters = captured[0]
+
+    with db.engine.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            plan = ' '.join(row[3] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters))
+            return set(re.findall(r'INDEX (\w+)', plan)), 'TEMP B-TREE' in plan
+        rows = connection.exec_driver_sql('EXPLAIN ' + statement, parameters).mappings().all()
+        table_rows = [row for row in rows if row['table'] == 'task']
+        return {row['key'] for row in table_rows if row['key']}, any('filesort' in (row['Extra'] or '') for row in table_rows)
+
+
+def test_task_list_uses_order_index(explain_client):
+    indexes, sorts = task_list_plan(explain_client, '/api/tasks?limit=50')
+    assert 'ix_task_status_group_rank' in indexes
+    assert not sorts
+
+    cursor = explain_client.get('/api/tasks?limit=50').headers['X-Next-Cursor']
+    indexes, sorts = task_list_plan(explain_client, f'/api/tasks?limit=50&cursor={cursor}')
+    assert 'ix_task_status_group_rank' in indexes
+    assert not sorts
+
+
+def test_status_filter_uses_status_index(explain_client):
+    indexes, sorts = task_list_plan(explain_client, '/api/tasks?status=todo&limit=50')
+    assert 'ix_task_status_rank' in indexes
+    assert not sorts
+
+
+def test_due_date_filter_uses_due_date_index(explain_client):
+    indexes, _ = task_list_plan(explain_client, '/api/tasks?due_within_days=-300')
+    assert 'ix_task_due_date' in indexes
+
+
+def test_filters_use_composite_indexes(explain_client):
+    for column in ('assignee_id', 'category_id', 'priority_id'):
+        indexes, sorts = task_list_plan(explain_client, f'/api/tasks?{column}=99&limit=50')
+        assert f"ix_task_{column.removesuffix('_id')}_rank" in indexes
+        assert not sorts
+
+
+def test_date_sorts_use_date_indexes(explain_client):
+    for sort in ('created_at', '-created_at'):
+        indexes, sorts = task_list_plan(explain_client, f'/api/tasks?sort={sort}&limit=50')
+        assert 'ix_task_created_at' in indexes
+        assert not sorts
@@ -0,0 +1,120 @@
+import sqlite3
+import pytest
+from backend.app import create_app
+from backend.config import Config
+from backend.database import db
+from backend.models import User
+from backend.ratelimit import in_flight, parse_budget
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Apps sharing one bucket file, like the workers of a host"""
+    contexts = []
+
+    def _make_app(**settings):
+        class RateConfig(Config):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+            RATE_LIMIT_STORAGE = str(tmp_path / 'buckets.sqlite')
+            METRICS_DIR = None
+            RATE_LIMIT_READ = '0.01:3'
+            RATE_LIMIT_WRITE = '0.01:2'
+            RATE_LIMIT_AUTH = '0.01:2'
+        for name, value in settings.items():
+            setattr(RateConfig, name, value)
+        app = create_app(RateConfig)
+        context = app.app_context()
+        context.push()
+        db.create_all()
+        contexts.append(context)
+        return app
+
+    yield _make_app
+    for context in reversed(contexts):
+        db.session.remove()
+        db.drop_all()
+        context.pop()
+
+def test_read_budget_per_client(make_app):
+    client = make_app().test_client()
+    client.post('/api/auth/register', json={'email': 'rate@example.com', 'password': 'password', 'name': 'Rate User'})
+    client.post('/api/auth/login', json={'email': 'rate@example.com', 'password': 'password'})
+
+    assert [client.get('/api/tasks').status_code for _ in range(3)] == [200, 200, 200]
+    response = client.get('/api/tasks')
+    assert response.status_code == 429
+    assert response.json['error'] == 'Rate limit exceeded for read requests'
+    assert 90 <= int(response.headers['Retry-After']) <= 100
+    # Writes draw from their own bucket, and health checks from none
+    assert client.post('/api/tasks', json={'title': 'Still allowed'}).status_code == 201
+    assert client.get('/health').status_code == 200
+    # Another client is unaffected
+    assert make_app().test_client().get('/api/tasks', headers={'X-API-Key': 'someone-else'}).status_code == 401
+
+def add_agent(api_key):
+    agent = User(name='Agent', email=f'{api_key}@example.com', is_system_user=True)
+    agent.set_api_key(api_key)
+    db.session.add(agent)
+    db.session.commit()
+
+def test_buckets_are_shared_between_workers(make_app, tmp_path):
+    database = f"sqlite:///{tmp_path / 'app.db'}"
+    first = make_app(SQLALCHEMY_DATABASE_URI=database).test_client()
+    second = make_app(SQLALCHEMY_DATABASE_URI=database).test_client()
+    add_agent('agent-key')
+    headers = {'X-API-Key': 'agent-key'}
+    assert first.get('/api/tasks', headers=headers).status_code == 200
+    assert second.get('/api/tasks', headers=headers).status_code == 200
+    assert first.get('/api/tasks', headers=headers).status_code == 200
+    assert second.get('/api/tasks', headers=headers).status_code == 429
+
+def test_invalid_keys_share_the_address_bucket(make_app):
+    client = make_app().test_client()
+    add_agent('agent-key')
+    # A fresh made-up key per request does not get a fresh bucket
+    assert [client.get('/api/tasks', headers={'X-API-Key': f'guess-{i}'}).status_code for i in range(4)] == [401, 401, 401, 429]
+    assert client.get('/api/tasks', headers={'X-API-Key': 'agent-key'}).status_code == 200
+
+def test_busy_bucket_file_fails_open(make_app):
+    client = make_app().test_client()
+    blocker = sqlite3.connect(client.application.config['RATE_LIMIT_STORAGE'])
+    blocker.execute('CREATE TABLE IF NOT EXISTS rate_bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+    blocker.execute('BEGIN EXCLUSIVE')
+    try:
+        assert [client.get('/api/tasks').status_code for _ in range(5)] == [401] * 5
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert [client.get('/api/tasks').status_code for _ in range(4)] == [401, 401, 401, 429]
+
+def test_auth_attempts_are_limited_by_address(make_app):
+    client = make_app().test_client()
+    attempts = [client.post('/api/auth/login', json={'email': 'nobody@example.com', 'password': 'guess'}).status_code
+                for _ in range(3)]
+    assert attempts == [401, 401, 429]
+
+def test_busy_worker_sheds_load(make_app):
+    client = make_app(RATE_LIMIT_MAX_IN_FLIGHT=2).test_client()
+    in_flight.count += 2
+    try:
+        response = client.get('/api/tasks')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert client.get('/health').status_code == 200
+    finally:
+        in_flight.count -= 2
+    assert in_flight.count == 0
+    assert client.get('/api/tasks').status_code == 401
+
+def test_parse_budget():
+    assert parse_budget('2.5:10') == (2.5, 10)
+    assert parse_budget('') is None and parse_budget('0:10') is None
+    with pytest.raises(ValueError):
+        parse_budget('10 per second')
+
+def test_anonymous_clients_behind_a_proxy_are_told_apart(make_app):
+    client = make_app(PROXY_FIX_X_FOR=1).test_client()
+    login = {'email': 'nobody@example.com', 'password': 'guess'}
+    for address in ('203.0.113.1', '203.0.113.2'):
+        headers = {'X-Forwarded-For': address}
+        assert [client.post('/api/auth/login', json=login, headers=headers).status_code for _ in range(3)] == [401, 401, 429]
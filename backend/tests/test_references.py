@@ -22,3 +22,36 @@ def test_categories_priorities(client):
     response = client.get('/api/priorities')
     assert response.status_code == 200
     assert len(response.json) >= 1
+
+def test_reference_etags(client):
+    client.post('/api/auth/register', json={'email': 'refetag@example.com', 'password': 'password', 'name': 'Ref User'})
+    client.post('/api/auth/login', json={'email': 'refetag@example.com', 'password': 'password'})
+    client.post('/api/categories', json={'name': 'Work'})
+
+    etag = client.get('/api/categories').headers['ETag']
+    assert client.get('/api/categories', headers={'If-None-Match': etag}).status_code == 304
+
+    # Priority writes do not invalidate categories
+    client.post('/api/priorities', json={'name': 'High', 'level': 10})
+    assert client.get('/api/categories', headers={'If-None-Match': etag}).status_code == 304
+
+    client.delete('/api/categories/1')
+    response = client.get('/api/categories', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json == []
+
+def test_reference_cache(client, assert_max_queries):
+    client.post('/api/auth/register', json={'email': 'refcache@example.com', 'password': 'password', 'name': 'Ref User'})
+    client.post('/api/auth/login', json={'email': 'refcache@example.com', 'password': 'password'})
+    client.post('/api/priorities', json={'name': 'Low', 'level': 1})
+
+    first = client.get('/api/priorities')
+    # A hit only reads the data versions
+    with assert_max_queries(1):
+        second = client.get('/api/priorities')
+    assert second.data == first.data
+
+    # Writes bump the version, so the next read is rebuilt
+    client.post('/api/priorities', json={'name': 'High', 'level': 10})
+    response = client.get('/api/priorities')
+    assert [p['name'] for p in response.json] == ['High', 'Low']
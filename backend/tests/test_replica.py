@@ -0,0 +1,110 @@
+import shutil
+import time
+import pytest
+from sqlalchemy import select, func
+from backend.app import create_app
+from backend.config import Config
+from backend.database import db
+from backend.models import Category
+from backend.auth.api_keys import api_key_fingerprint
+from backend.replica import SQLiteStickyPrimary
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    """App whose GETs read from a second SQLite file; `replicate()` copies the primary over it"""
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+
+    class ReplicaConfig(Config):
+        TESTING = True
+        RATE_LIMIT_ENABLED = False
+        METRICS_DIR = None
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{primary}'
+        DATABASE_REPLICA_URL = f'sqlite:///{replica}'
+        REPLICA_STICKY_STORAGE = str(tmp_path / 'sticky.sqlite')
+
+    app = create_app(ReplicaConfig)
+
+    def replicate():
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        shutil.copyfile(primary, replica)
+
+    replicate()
+    yield app, replicate
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    # init_app registered an (empty) metadata for the bind on the shared extension
+    db.metadatas.pop('replica', None)
+
+
+def titles(response):
+    assert response.status_code == 200
+    return [task['title'] for task in response.json]
+
+
+def login(client):
+    client.post('/api/auth/register', json={'email': 'replica@example.com', 'password': 'password', 'name': 'Replica User'})
+    client.post('/api/auth/login', json={'email': 'replica@example.com', 'password': 'password'})
+
+
+def test_gets_read_from_replica(replica_app):
+    app, replicate = replica_app
+    app.config['REPLICA_STICKY_SECONDS'] = 0
+    client = app.test_client()
+    login(client)
+    replicate()
+
+    assert client.post('/api/tasks', json={'title': 'Lagging'}).status_code == 201
+    # The replica has not caught up yet
+    assert titles(client.get('/api/tasks')) == []
+    replicate()
+    assert titles(client.get('/api/tasks')) == ['Lagging']
+
+
+def test_writers_stay_on_primary(replica_app):
+    app, replicate = replica_app
+    client = app.test_client()
+    login(client)
+    replicate()
+
+    client.post('/api/tasks', json={'title': 'Mine'})
+    assert titles(client.get('/api/tasks')) == ['Mine']
+    # Another session has not written, so it still reads the replica
+    other = app.test_client()
+    other.post('/api/auth/login', json={'email': 'replica@example.com', 'password': 'password'})
+    with other.session_transaction() as session:
+        session.pop('primary_until')
+    assert titles(other.get('/api/tasks')) == []
+
+
+def test_api_key_writers_stay_on_primary(replica_app):
+    app, replicate = replica_app
+    client = app.test_client()
+    login(client)
+    api_key = client.post('/api/users/system', json={'email': 'agent@example.com', 'name': 'Agent'}).json['api_key']
+    replicate()
+
+    agent = app.test_client()
+    headers = {'X-API-Key': api_key}
+    assert agent.post('/api/tasks', json={'title': 'From agent'}, headers=headers).status_code == 201
+    assert titles(agent.get('/api/tasks', headers=headers)) == ['From agent']
+    # Another worker of the host sees the same deadline
+    other_worker = SQLiteStickyPrimary(app.config['REPLICA_STICKY_STORAGE'])
+    assert other_worker.active(api_key_fingerprint(api_key), time.time())
+    app.extensions['sticky_primary'].clear()
+    assert titles(agent.get('/api/tasks', headers=headers)) == []
+
+
+def test_reads_after_a_write_in_a_get_use_primary(replica_app):
+    app, _ = replica_app
+    with app.test_request_context('/api/tasks', method='GET'):
+        app.preprocess_request()
+        count = select(func.count()).select_from(Category)
+        assert db.session.execute(count).scalar() == 0
+        db.session.add(Category(name='Written in a GET'))
+        db.session.flush()
+        assert db.session.execute(count).scalar() == 1
+        db.session.rollback()
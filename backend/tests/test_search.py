@@ -0,0 +1,70 @@
+def login(client):
+    client.post('/api/auth/register', json={'email': 'search@example.com', 'password': 'password', 'name': 'Search User'})
+    client.post('/api/auth/login', json={'email': 'search@example.com', 'password': 'password'})
+
+def search(client, **params):
+    response = client.get('/api/tasks', query_string=params)
+    assert response.status_code == 200, response.json
+    return [task['title'] for task in response.json]
+
+def test_search_ranks_and_matches_every_word(client):
+    login(client)
+    client.post('/api/tasks', json={'title': 'Write release notes', 'description': 'Mention the login fix'})
+    client.post('/api/tasks', json={'title': 'Fix login redirect', 'description': 'Users land on a blank page'})
+    client.post('/api/tasks', json={'title': 'Plan offsite'})
+
+    # Title matches rank above description matches
+    assert search(client, q='login') == ['Fix login redirect', 'Write release notes']
+    assert search(client, q='LOGIN fix') == ['Fix login redirect', 'Write release notes']
+    assert search(client, q='login offsite') == []
+    # Query syntax in the input is treated as plain words
+    assert search(client, q='"login" OR NEAR(') == []
+    assert search(client, q='login*') == ['Fix login redirect', 'Write release notes']
+
+    response = client.get('/api/tasks?q=%22*%22')
+    assert response.status_code == 400
+    # A blank search is no search
+    assert len(search(client, q='  ')) == 3
+
+def test_search_prefix_mode(client):
+    login(client)
+    client.post('/api/tasks', json={'title': 'Deploy dashboard'})
+    client.post('/api/tasks', json={'title': 'Dashboards to deploy'})
+
+    assert search(client, q='dash') == []
+    assert search(client, q='deploy dash', prefix='true') == ['Deploy dashboard', 'Dashboards to deploy']
+
+def test_search_combines_with_filters_and_pages(client):
+    login(client)
+    for i in range(5):
+        client.post('/api/tasks', json={'title': f'Invoice {i}', 'status': 'done' if i % 2 else 'todo'})
+    client.post('/api/tasks', json={'title': 'Receipt', 'status': 'todo'})
+
+    response = client.get('/api/tasks?q=invoice&status=todo&include_total=1')
+    assert response.headers['X-Total-Count'] == '3'
+    assert all(task['status'] == 'todo' for task in response.json)
+
+    titles, cursor = [], None
+    while True:
+        params = {'q': 'invoice', 'limit': 2, **({'cursor': cursor} if cursor else {})}
+        response = client.get('/api/tasks', query_string=params)
+        titles += [task['title'] for task in response.json]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert sorted(titles) == [f'Invoice {i}' for i in range(5)]
+
+    assert client.get('/api/tasks?q=invoice&since=0').status_code == 400
+
+def test_search_index_follows_writes(client):
+    login(client)
+    task_id = client.post('/api/tasks', json={'title': 'Draft budget'}).json['id']
+    client.post('/api/tasks/batch', json={'operations': [{'op': 'create', 'data': {'title': 'Budget review'}}]})
+    assert sorted(search(client, q='budget')) == ['Budget review', 'Draft budget']
+
+    client.put(f'/api/tasks/{task_id}', json={'title': 'Draft forecast'})
+    assert search(client, q='budget') == ['Budget review']
+    assert search(client, q='forecast') == ['Draft forecast']
+
+    client.delete(f'/api/tasks/{task_id}')
+    assert search(client, q='forecast') == []
@@ -0,0 +1,36 @@
+import json
+from datetime import datetime
+from backend.models import User, Task, Category, Priority
+from backend.database import db
+from backend.schemas import TaskSchema
+from backend.serializers import compile_serializer, task_serializer
+
+def make_tasks():
+    user = User(name="Alice", email="alice@example.com", is_admin=True)
+    user.set_password("password")
+    category = Category(name="Work", color="#ff0000")
+    priority = Priority(name="High", level=10)
+    db.session.add_all([user, category, priority])
+    db.session.flush()
+
+    full = Task(title="Full", description="**markdown**", status="in_progress", rank=1500.5,
+                due_date=datetime(2026, 3, 1, 9, 30), assignee_id=user.id,
+                category_id=category.id, priority_id=priority.id)
+    empty = Task(title="Empty", rank=0)
+    db.session.add_all([full, empty])
+    db.session.commit()
+    return [full, empty]
+
+def test_task_serializer_matches_marshmallow(app):
+    tasks = make_tasks()
+
+    expected = TaskSchema(many=True).dump(tasks)
+    actual = task_serializer.dump(tasks, many=True)
+    assert json.dumps(actual, sort_keys=True) == json.dumps(expected, sort_keys=True)
+    assert task_serializer.dump(tasks[0]) == TaskSchema().dump(tasks[0])
+
+def test_sparse_task_serializer_matches_marshmallow(app):
+    tasks = make_tasks()
+
+    schema = TaskSchema(only=('id', 'title', 'due_date', 'priority'))
+    assert compile_serializer(schema).dump(tasks, many=True) == schema.dump(tasks, many=True)
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from backend.models import Task, Category, db
+
+def login(client):
+    client.post('/api/auth/register', json={'email': 'stats@example.com', 'password': 'password', 'name': 'Stats User'})
+    client.post('/api/auth/login', json={'email': 'stats@example.com', 'password': 'password'})
+
+def day(offset):
+    return (datetime.utcnow() + timedelta(days=offset)).strftime('%Y-%m-%dT12:00:00')
+
+def test_task_stats(client):
+    login(client)
+    category = Category(name='Ops')
+    db.session.add(category)
+    db.session.commit()
+    client.post('/api/tasks', json={'title': 'Overdue', 'due_date': day(-2), 'category_id': category.id})
+    client.post('/api/tasks', json={'title': 'Due today', 'due_date': day(0), 'status': 'in_progress'})
+    client.post('/api/tasks', json={'title': 'This week', 'due_date': day(3)})
+    client.post('/api/tasks', json={'title': 'Later', 'due_date': day(30)})
+    client.post('/api/tasks', json={'title': 'Done overdue', 'due_date': day(-1), 'status': 'done', 'category_id': category.id})
+    client.post('/api/tasks', json={'title': 'Someday'})
+
+    response = client.get('/api/tasks/stats')
+    assert response.status_code == 200
+    stats = response.json
+    assert stats['total'] == 6
+    assert stats['by_status'] == {'todo': 4, 'in_progress': 1, 'done': 1}
+    # Done tasks are not counted as overdue
+    assert stats['due'] == {'overdue': 1, 'today': 1, 'this_week': 1, 'later': 1, 'no_due_date': 1}
+    assert stats['by_assignee'] == [{'assignee_id': 1, 'total': 6, 'open': 5}]
+    assert {'category_id': category.id, 'total': 2, 'open': 1} in stats['by_category']
+    assert {'category_id': None, 'total': 4, 'open': 4} in stats['by_category']
+
+    today = datetime.utcnow().date()
+    per_day = {entry['date']: entry for entry in stats['per_day']}
+    assert len(per_day) == 29
+    assert per_day[today.isoformat()] == {'date': today.isoformat(), 'created': 6, 'due': 1}
+    assert per_day[(today - timedelta(days=2)).isoformat()]['due'] == 1
+    # The task due in 30 days is outside the default two-week window
+    assert sum(entry['due'] for entry in stats['per_day']) == 4
+
+    ranged = client.get(f'/api/tasks/stats?from={today}&to={today}').json
+    assert ranged['per_day'] == [{'date': today.isoformat(), 'created': 6, 'due': 1}]
+
+def test_task_stats_cached_until_tasks_change(client, assert_max_queries):
+    login(client)
+    client.post('/api/tasks', json={'title': 'Counted'})
+    assert client.get('/api/tasks/stats').json['total'] == 1
+
+    # Served from the cache: the user and the task version, no aggregate queries
+    with assert_max_queries(2):
+        assert client.get('/api/tasks/stats').json['total'] == 1
+
+    client.post('/api/tasks/batch', json={'operations': [{'op': 'create', 'data': {'title': 'Bulk'}}]})
+    assert client.get('/api/tasks/stats').json['total'] == 2
+    task_id = db.session.query(Task.id).filter_by(title='Bulk').scalar()
+    client.delete(f'/api/tasks/{task_id}')
+    assert client.get('/api/tasks/stats').json['total'] == 1
+
+def test_task_stats_rejects_bad_ranges(client):
+    login(client)
+    assert client.get('/api/tasks/stats?from=yesterday').status_code == 400
+    assert client.get('/api/tasks/stats?from=2026-02-01&to=2026-01-01').status_code == 400
+    assert client.get('/api/tasks/stats?from=2024-01-01&to=2026-01-01').status_code == 400
+    assert client.get('/api/tasks/stats?from=2026-01-01&to=2026-12-31').status_code == 200
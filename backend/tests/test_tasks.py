@@ -53,3 +53,253 @@ def test_update_delete_task(client):
     # Verify deleted
     response = client.get(f'/api/tasks/{task_id}')
     assert response.status_code == 404
+
+def test_get_tasks_keyset_pagination(client):
+    client.post('/api/auth/register', json={'email': 'page@example.com', 'password': 'password', 'name': 'Page User'})
+    client.post('/api/auth/login', json={'email': 'page@example.com', 'password': 'password'})
+
+    for i in range(5):
+        client.post('/api/tasks', json={'title': f'Task {i}', 'status': 'done' if i == 0 else 'todo'})
+    # Duplicate rank forces the id tie-breaker
+    client.post('/api/tasks', json={'title': 'Tied', 'status': 'todo', 'rank': 2000.0})
+
+    full = client.get('/api/tasks').json
+    assert full[-1]['title'] == 'Task 0'
+
+    seen = []
+    cursor = None
+    while True:
+        response = client.get('/api/tasks', query_string={'limit': 2, 'cursor': cursor, 'include_total': 1} if cursor else {'limit': 2, 'include_total': 1})
+        assert response.status_code == 200
+        assert response.headers['X-Total-Count'] == '6'
+        assert len(response.json) <= 2
+        seen.extend(t['id'] for t in response.json)
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert seen == [t['id'] for t in full]
+
+    assert client.get('/api/tasks?cursor=garbage').status_code == 400
+    assert client.get('/api/tasks?limit=0').status_code == 400
+
+def test_task_endpoints_query_count(client, assert_max_queries):
+    from backend.models import Category, Priority
+
+    client.post('/api/auth/register', json={'email': 'n1@example.com', 'password': 'password', 'name': 'N1 User'})
+    client.post('/api/auth/login', json={'email': 'n1@example.com', 'password': 'password'})
+
+    for i in range(10):
+        user = User(name=f'User {i}', email=f'user{i}@example.com')
+        category = Category(name=f'Category {i}')
+        priority = Priority(name=f'Priority {i}', level=i)
+        db.session.add_all([user, category, priority])
+        db.session.flush()
+        db.session.add(Task(title=f'Task {i}', rank=i, assignee_id=user.id,
+                            category_id=category.id, priority_id=priority.id))
+    db.session.commit()
+    task_id = Task.query.first().id
+    # Start from a cold identity map so relationship loads hit the database
+    db.session.expire_all()
+
+    # Session user load + ETag versions + tasks + one IN query per relationship
+    with assert_max_queries(6):
+        response = client.get('/api/tasks')
+    assert len(response.json) == 10
+    assert all(t['assignee'] and t['category'] and t['priority'] for t in response.json)
+
+    with assert_max_queries(2):
+        assert client.get(f'/api/tasks/{task_id}').json['category']['name']
+
+    # Writes also insert their stream event (see backend.events)
+    with assert_max_queries(7):
+        assert client.put(f'/api/tasks/{task_id}', json={'title': 'Renamed'}).status_code == 200
+
+    with assert_max_queries(7):
+        assert client.post('/api/tasks', json={'title': 'Fresh', 'category_id': 1}).status_code == 201
+
+def test_get_tasks_sparse_fieldsets(client, assert_max_queries):
+    client.post('/api/auth/register', json={'email': 'sparse@example.com', 'password': 'password', 'name': 'Sparse User'})
+    client.post('/api/auth/login', json={'email': 'sparse@example.com', 'password': 'password'})
+    client.post('/api/categories', json={'name': 'Work'})
+    client.post('/api/tasks', json={'title': 'Sparse', 'description': 'Long markdown', 'category_id': 1})
+    db.session.expire_all()
+
+    with assert_max_queries(6) as statements:
+        response = client.get('/api/tasks?fields=id,title,status,rank,category_id')
+    assert response.status_code == 200
+    assert response.json == [{'id': 1, 'title': 'Sparse', 'status': 'todo', 'rank': 1000.0, 'category_id': 1}]
+    assert not any('description' in s for s in statements)
+
+    response = client.get('/api/tasks?fields=id,title&include=category')
+    assert response.json[0]['category']['name'] == 'Work'
+    assert set(response.json[0]) == {'id', 'title', 'category'}
+
+    response = client.get('/api/tasks/1?fields=title')
+    assert response.json == {'title': 'Sparse'}
+
+    # Sparse responses nest only the public user fields
+    response = client.get('/api/tasks?fields=id&include=assignee')
+    assert response.json[0]['assignee'] == {'id': 1, 'name': 'Sparse User', 'email': 'sparse@example.com'}
+
+    assert client.get('/api/tasks?fields=').status_code == 400
+    assert client.get('/api/tasks?fields=password').status_code == 400
+    assert client.get('/api/tasks?include=passkeys').status_code == 400
+
+def test_get_tasks_etag(client):
+    client.post('/api/auth/register', json={'email': 'etag@example.com', 'password': 'password', 'name': 'ETag User'})
+    client.post('/api/auth/login', json={'email': 'etag@example.com', 'password': 'password'})
+    client.post('/api/tasks', json={'title': 'Cached'})
+
+    response = client.get('/api/tasks')
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+
+    response = client.get('/api/tasks', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    # Different filters get a different validator
+    assert client.get('/api/tasks?status=done', headers={'If-None-Match': etag}).status_code == 200
+
+    # Any task write changes the validator
+    client.put('/api/tasks/1', json={'title': 'Changed'})
+    response = client.get('/api/tasks', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json[0]['title'] == 'Changed'
+
+    # So does a change to data nested in the response
+    etag = response.headers['ETag']
+    user = User.query.filter_by(email='etag@example.com').first()
+    user.name = 'Renamed'
+    db.session.commit()
+    response = client.get('/api/tasks', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json[0]['assignee']['name'] == 'Renamed'
+
+def test_rank_gap_renormalization(client):
+    client.post('/api/auth/register', json={'email': 'rank@example.com', 'password': 'password', 'name': 'Rank User'})
+    client.post('/api/auth/login', json={'email': 'rank@example.com', 'password': 'password'})
+    for i in range(5):
+        client.post('/api/tasks', json={'title': f'Task {i}'})
+
+    # Keep dropping tasks between the same two neighbours, like repeated drags
+    low, high = 1000.0, 2000.0
+    rebalanced = False
+    for task_id in [3, 4, 5] * 20:
+        rank = (low + high) / 2
+        response = client.put(f'/api/tasks/{task_id}', json={'rank': rank})
+        assert response.status_code == 200
+        if response.headers.get('X-Ranks-Rebalanced'):
+            rebalanced = True
+            break
+        high = rank
+    assert rebalanced
+
+    ranks = [t['rank'] for t in client.get('/api/tasks').json]
+    assert ranks == sorted(ranks)
+    assert min(b - a for a, b in zip(ranks, ranks[1:])) >= 1e-3
+
+def test_rebalance_all_ranks(client):
+    client.post('/api/auth/register', json={'email': 'rebalance@example.com', 'password': 'password', 'name': 'Admin'})
+    client.post('/api/auth/login', json={'email': 'rebalance@example.com', 'password': 'password'})
+    for i, rank in enumerate([5.0, 5.0000001, 5.0000002, 7.5, 1e9]):
+        client.post('/api/tasks', json={'title': f'Task {i}', 'rank': rank})
+    before = [t['id'] for t in client.get('/api/tasks').json]
+
+    response = client.post('/api/tasks/ranks/rebalance')
+    assert response.status_code == 200
+    assert response.json['tasks'] == 5
+
+    tasks = client.get('/api/tasks').json
+    assert [t['id'] for t in tasks] == before
+    ranks = [t['rank'] for t in tasks]
+    assert all(b - a == 1000.0 for a, b in zip(ranks, ranks[1:]))
+
+    # A second pass walks the other direction and keeps the order
+    from backend.ranking import rebalance_all
+    assert rebalance_all(chunk_size=2) == 5
+    assert [t['id'] for t in client.get('/api/tasks').json] == before
+
+def test_move_task(client):
+    client.post('/api/auth/register', json={'email': 'move@example.com', 'password': 'password', 'name': 'Move User'})
+    client.post('/api/auth/login', json={'email': 'move@example.com', 'password': 'password'})
+    for i in range(4):
+        client.post('/api/tasks', json={'title': f'Task {i + 1}'})
+
+    # Task 4 between tasks 1 and 2
+    response = client.post('/api/tasks/4/move', json={'before_id': 1, 'after_id': 2})
+    assert response.status_code == 200
+    assert response.json['changed'] == [{'id': 4, 'rank': 1500.0}]
+    assert [t['id'] for t in client.get('/api/tasks').json] == [1, 4, 2, 3]
+
+    # Into another column, at the top
+    response = client.post('/api/tasks/3/move', json={'status': 'done', 'after_id': 1})
+    assert response.json['changed'] == [{'id': 3, 'rank': 0.0, 'status': 'done'}]
+    assert db.session.get(Task, 3).status == 'done'
+
+    # Neighbours given in the wrong order mean the client view is stale
+    assert client.post('/api/tasks/1/move', json={'before_id': 2, 'after_id': 4}).status_code == 409
+    assert client.post('/api/tasks/1/move', json={'before_id': 99}).status_code == 404
+    assert client.post('/api/tasks/1/move', json={'before_id': 1}).status_code == 400
+
+def test_move_task_renumbers_collapsed_neighbours(client):
+    client.post('/api/auth/register', json={'email': 'move2@example.com', 'password': 'password', 'name': 'Move User'})
+    client.post('/api/auth/login', json={'email': 'move2@example.com', 'password': 'password'})
+    client.post('/api/tasks', json={'title': 'Low', 'rank': 1.0})
+    client.post('/api/tasks', json={'title': 'High', 'rank': 1.0005})
+    client.post('/api/tasks', json={'title': 'Moved', 'rank': 5000.0})
+
+    response = client.post('/api/tasks/3/move', json={'before_id': 1, 'after_id': 2})
+    changed = {c['id']: c for c in response.json['changed']}
+    assert set(changed) == {1, 2, 3}
+    ranks = [t['rank'] for t in client.get('/api/tasks').json]
+    assert [t['id'] for t in client.get('/api/tasks').json] == [1, 3, 2]
+    assert ranks == [changed[1]['rank'], changed[3]['rank'], changed[2]['rank']]
+
+def test_move_task_full_rebalance_runs_after_commit(client, monkeypatch):
+    client.post('/api/auth/register', json={'email': 'move3@example.com', 'password': 'password', 'name': 'Move User'})
+    client.post('/api/auth/login', json={'email': 'move3@example.com', 'password': 'password'})
+    client.post('/api/tasks', json={'title': 'Low', 'rank': 1.0})
+    client.post('/api/tasks', json={'title': 'High', 'rank': 1.0005})
+    client.post('/api/tasks', json={'title': 'Moved', 'rank': 5000.0})
+    # No window is allowed to grow, so the neighbourhood counts as fully collapsed
+    monkeypatch.setattr('backend.ranking.RANK_MAX_WINDOW', 0)
+
+    response = client.post('/api/tasks/3/move', json={'before_id': 1, 'after_id': 2, 'status': 'in_progress'})
+    assert response.status_code == 200
+    assert response.json == {'changed': [], 'rebalanced': True}
+    tasks = client.get('/api/tasks').json
+    assert [t['id'] for t in tasks] == [1, 3, 2]
+    assert tasks[1]['status'] == 'in_progress'
+    ranks = [t['rank'] for t in tasks]
+    assert ranks[1] - ranks[0] == ranks[2] - ranks[1] == 1000.0
+
+def test_get_tasks_since_watermark(client):
+    client.post('/api/auth/register', json={'email': 'delta@example.com', 'password': 'password', 'name': 'Delta User'})
+    client.post('/api/auth/login', json={'email': 'delta@example.com', 'password': 'password'})
+    for i in range(3):
+        client.post('/api/tasks', json={'title': f'Task {i + 1}'})
+
+    watermark = client.get('/api/tasks').headers['X-Watermark']
+    # Push the existing rows out of the overlap window
+    from datetime import datetime, timedelta
+    Task.query.update({Task.updated_at: datetime.utcnow() - timedelta(minutes=1)})
+    db.session.commit()
+
+    client.put('/api/tasks/1', json={'status': 'done'})
+    client.delete('/api/tasks/2')
+    client.post('/api/tasks/batch', json={'operations': [{'op': 'delete', 'id': 3}]})
+
+    response = client.get('/api/tasks', query_string={'since': watermark})
+    assert response.status_code == 200
+    assert [t['id'] for t in response.json['tasks']] == [1]
+    assert sorted(response.json['deleted']) == [2, 3]
+    assert response.json['watermark']
+
+    assert client.get('/api/tasks?since=nonsense').status_code == 400
+    assert client.get('/api/tasks', query_string={'since': watermark, 'status': 'done'}).status_code == 400
+
+    # Older than the tombstone retention period
+    import base64
+    old = base64.urlsafe_b64encode(b'2000-01-01T00:00:00').decode().rstrip('=')
+    assert client.get('/api/tasks', query_string={'since': old}).status_code == 410
@@ -27,3 +27,81 @@ def test_get_users(client):
     assert len(data) >= 2
     assert any(u['email'] == 'alice@example.com' for u in data)
     assert any(u['name'] == 'Alice' for u in data)
+
+def api_key_status(client, api_key):
+    # Fresh app context so the session user cached on g does not leak between requests
+    with client.application.app_context():
+        return client.application.test_client().get('/api/tasks', headers={'X-API-Key': api_key}).status_code
+
+def test_system_user_api_key_lifecycle(client):
+    # First registered user is admin
+    client.post('/api/auth/register', json={'email': 'admin@example.com', 'password': 'password', 'name': 'Admin'})
+    client.post('/api/auth/login', json={'email': 'admin@example.com', 'password': 'password'})
+
+    response = client.post('/api/users/system', json={'email': 'agent@example.com', 'name': 'Agent'})
+    assert response.status_code == 201
+    user_id = response.json['id']
+    api_key = response.json['api_key']
+
+    assert api_key_status(client, api_key) == 200
+    # Second request is served from the verified-key cache
+    assert api_key_status(client, api_key) == 200
+    assert api_key_status(client, 'not-a-key') == 401
+
+    # Reset invalidates the old key
+    new_key = client.post(f'/api/users/system/{user_id}/reset-key').json['api_key']
+    assert api_key_status(client, api_key) == 401
+    assert api_key_status(client, new_key) == 200
+
+    # Disabled users are rejected even with a cached key
+    client.post(f'/api/users/system/{user_id}/disable')
+    assert api_key_status(client, new_key) == 401
+
+    client.delete(f'/api/users/system/{user_id}')
+    assert api_key_status(client, new_key) == 401
+
+def test_legacy_api_key_is_backfilled(client):
+    from werkzeug.security import generate_password_hash
+
+    # Simulate a key issued before api_key_id existed
+    user = User(name="Legacy Agent", email="legacy@example.com", is_system_user=True)
+    user.api_key_hash = generate_password_hash('legacy-key')
+    db.session.add(user)
+    db.session.commit()
+    assert user.api_key_id is None
+
+    assert api_key_status(client, 'legacy-key') == 200
+
+    db.session.refresh(user)
+    assert user.api_key_id is not None
+
+def test_cached_api_key_rejected_after_reset_elsewhere(client):
+    from backend.auth.api_keys import authenticate_api_key
+
+    user = User(name="Agent", email="agent2@example.com", is_system_user=True)
+    user.set_api_key('old-key')
+    db.session.add(user)
+    db.session.commit()
+    assert authenticate_api_key('old-key') == user
+
+    # Another worker resets the key: this worker's cache is never invalidated
+    user.set_api_key('new-key')
+    db.session.commit()
+    assert authenticate_api_key('old-key') is None
+    assert authenticate_api_key('new-key') == user
+
+def test_revoke_legacy_keys(client, runner):
+    from werkzeug.security import generate_password_hash
+    from backend.auth.api_keys import legacy_keys
+
+    user = User(name="Legacy Agent", email="legacy@example.com", is_system_user=True)
+    user.api_key_hash = generate_password_hash('legacy-key')
+    db.session.add(user)
+    db.session.commit()
+
+    result = runner.invoke(args=['users', 'revoke-legacy-keys'])
+    assert 'Revoked 1 legacy API keys' in result.output
+    assert legacy_keys.remaining is False
+    assert api_key_status(client, 'legacy-key') == 401
+    db.session.refresh(user)
+    assert user.api_key_hash is None
@@ -0,0 +1,22 @@
+import itertools
+from backend.database import db
+from backend.models import DataVersion, Category
+from backend.versioning import DATA_VERSION_SHARDS, get_versions
+
+
+def test_versions_are_seeded_and_summed_across_shards(app, monkeypatch):
+    # Every tracked table starts with its full set of zeroed shards
+    assert DataVersion.query.filter_by(name='task').count() == DATA_VERSION_SHARDS
+    assert DataVersion.query.filter_by(name='task_event').count() == 0
+    assert get_versions('category') == {'category': 0}
+
+    # Writers on different threads land on different shards
+    shards = itertools.cycle([0, 3, 3, 7])
+    monkeypatch.setattr('backend.versioning._shard', lambda: next(shards))
+    for i in range(4):
+        db.session.add(Category(name=f'Category {i}'))
+        db.session.commit()
+
+    assert get_versions('category') == {'category': 4}
+    counts = {row.shard: row.version for row in DataVersion.query.filter_by(name='category')}
+    assert counts == {0: 1, 1: 0, 2: 0, 3: 2, 4: 0, 5: 0, 6: 0, 7: 1}
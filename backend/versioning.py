@@ -0,0 +1,162 @@
+"""
+Per-table data versions used as cheap, cross-worker change validators.
+
+Every ORM flush that inserts, updates or deletes rows bumps the version of the
+affected tables in the same transaction, so any process can tell whether a
+collection changed with a single indexed read of `data_version`. ORM
+bulk statements (insert/update/delete through the session) are covered by
+the do_orm_execute hook; code that writes through a bare Connection must call
+`bump_versions` itself.
+
+A bump holds a row lock until commit, so a single counter row per table would
+serialize every concurrent writer to that table. Each table's version is
+therefore spread over DATA_VERSION_SHARDS rows: a writer increments the shard
+picked by its thread (or greenlet) and readers sum them. Writers contend only
+when they land on the same shard. The rows are seeded when the table is
+created (and by migration 004), so bumps are plain UPDATEs with no
+first-write INSERT race.
+"""
+import hashlib
+import os
+import threading
+from datetime import datetime
+from functools import wraps
+from flask import request, make_response, g, has_app_context
+from flask_login import current_user
+from sqlalchemy import event, select, update, insert, func
+from sqlalchemy.orm import Session
+from backend.database import db
+from backend.models import DataVersion
+
+data_version = DataVersion.__table__
+
+DATA_VERSION_SHARDS = 8
+
+# Append-only logs that no validator or cache reads
+UNTRACKED_TABLES = {'data_version', 'task_event'}
+
+
+def _shard():
+    # Stable per thread, so one transaction never locks two shards of a table
+    return hash((os.getpid(), threading.get_ident())) % DATA_VERSION_SHARDS
+
+
+def bump_versions(connection, tables):
+    """Increment the version of each named table on `connection`"""
+    if has_app_context():
+        g.pop('data_versions', None)
+    shard = _shard()
+    for name in sorted(set(tables)):
+        result = connection.execute(
+            update(data_version)
+            .where(data_version.c.name == name, data_version.c.shard == shard)
+            .values(version=data_version.c.version + 1)
+        )
+        if result.rowcount == 0:
+            # Only for tables created after the seed; seed_versions avoids this path
+            connection.execute(insert(data_version).values(name=name, shard=shard, version=1))
+
+
+def seed_versions(connection, tables):
+    """Create the zeroed shard rows for each named table that has none yet"""
+    seeded = set(connection.execute(select(data_version.c.name).distinct()).scalars())
+    rows = [{'name': name, 'shard': shard, 'version': 0}
+            for name in sorted(set(tables) - seeded - UNTRACKED_TABLES)
+            for shard in range(DATA_VERSION_SHARDS)]
+    if rows:
+        connection.execute(insert(data_version), rows)
+
+
+@event.listens_for(data_version, 'after_create')
+def _seed_after_create(target, connection, **kw):
+    seed_versions(connection, target.metadata.tables)
+
+
+def get_versions(*tables):
+    """Return the current version of each named table (0 if never written)"""
+    rows = db.session.execute(
+        select(data_version.c.name, func.sum(data_version.c.version))
+        .where(data_version.c.name.in_(tables))
+        .group_by(data_version.c.name)
+    ).all()
+    versions = dict.fromkeys(tables, 0)
+    versions.update({name: int(version) for name, version in rows})
+    return versions
+
+
+def request_versions(*tables):
+    """get_versions, memoized for the rest of the request until the next write"""
+    memo = g.setdefault('data_versions', {})
+    missing = [name for name in tables if name not in memo]
+    if missing:
+        memo.update(get_versions(*missing))
+    return {name: memo[name] for name in tables}
+
+
+def _tracked_table(obj):
+    table = getattr(obj, '__table__', None)
+    if table is None or table.name in UNTRACKED_TABLES:
+        return None
+    return table.name
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_after_flush(session, flush_context):
+    tables = set()
+    for obj in list(session.new) + list(session.deleted):
+        tables.add(_tracked_table(obj))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.add(_tracked_table(obj))
+    tables.discard(None)
+    if tables:
+        bump_versions(session.connection(), tables)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_after_bulk_write(orm_execute_state):
+    # insert()/update()/delete() statements and query.update()/delete() bypass the flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.local_table.name in UNTRACKED_TABLES:
+        return
+    bump_versions(orm_execute_state.session.connection(), [mapper.local_table.name])
+
+
+def conditional_on(*tables):
+    """
+    Decorator adding a weak ETag to a GET collection endpoint and answering
+    If-None-Match with 304 before the view runs.
+
+    The validator combines the versions of `tables` (including tables that
+    are nested into the response), the query string, the requesting user
+    (for user-relative filters such as assignee_id=me) and the current UTC
+    date (for date-relative filters such as due_within_days). Place it below
+    the auth decorator so unauthenticated requests never see a 304.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            versions = request_versions(*tables)
+            user = getattr(g, 'current_user', current_user)
+            key = '|'.join([
+                request.path,
+                str(getattr(user, 'id', '')),
+                ','.join(f'{name}:{versions[name]}' for name in tables),
+                '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True))),
+                datetime.utcnow().date().isoformat(),
+            ])
+            etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
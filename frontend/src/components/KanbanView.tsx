@@ -9,7 +9,7 @@ interface KanbanViewProps {
     tasks: Task[];
     onEdit: (task: Task) => void;
     onUpdateStatus: (taskId: number, newStatus: string) => void;
-    onUpdateRank: (taskId: number, newRank: number) => void;
+    onMove: (taskId: number, status: string, beforeId: number | null, afterId: number | null) => void;
 }
 
 const COLUMNS = [
@@ -115,7 +115,7 @@ function KanbanColumn({ id, title, tasks, onEdit }: { id: string, title: string,
     );
 }
 
-export default function KanbanView({ tasks, onEdit, onUpdateStatus, onUpdateRank }: KanbanViewProps) {
+export default function KanbanView({ tasks, onEdit, onUpdateStatus, onMove }: KanbanViewProps) {
     const [activeId, setActiveId] = useState<number | null>(null);
 
     const sensors = useSensors(
@@ -154,56 +154,28 @@ export default function KanbanView({ tasks, onEdit, onUpdateStatus, onUpdateRank
                 onUpdateStatus(activeTask.id, overColumn.id);
             }
         } else if (overTask) {
-            // Dropped on another task
+            // Dropped on another task: send the neighbours and let the server compute the rank
             const targetStatus = overTask.status;
-
-            if (activeTask.status !== targetStatus) {
-                // Status change - update status and rank
-                onUpdateStatus(activeTask.id, targetStatus);
-
-                // Also update rank based on position in new column
-                const tasksInTargetColumn = tasks.filter(t => t.status === targetStatus && t.id !== activeTask.id);
-                const overIndex = tasksInTargetColumn.findIndex(t => t.id === overTask.id);
-
-                let newRank: number;
-                if (overIndex === 0) {
-                    newRank = (overTask.rank ?? 1000) / 2;
-                } else if (overIndex === tasksInTargetColumn.length - 1) {
-                    newRank = (overTask.rank ?? 0) + 1000;
-                } else {
-                    const prevRank = tasksInTargetColumn[overIndex - 1]?.rank ?? 0;
-                    const nextRank = overTask.rank ?? prevRank + 2000;
-                    newRank = (prevRank + nextRank) / 2;
-                }
-
-                onUpdateRank(activeTask.id, newRank);
-            } else {
-                // Reordering within the same column
-                const tasksInColumn = tasks.filter(t => t.status === activeTask.status);
-                const activeIndex = tasksInColumn.findIndex(t => t.id === activeTask.id);
-                const overIndex = tasksInColumn.findIndex(t => t.id === overTask.id);
-
-                if (activeIndex !== overIndex) {
-                    // Calculate new rank
-                    let newRank: number;
-                    if (overIndex === 0) {
-                        newRank = (tasksInColumn[0]?.rank ?? 1000) / 2;
-                    } else if (overIndex === tasksInColumn.length - 1) {
-                        newRank = (tasksInColumn[tasksInColumn.length - 1]?.rank ?? 0) + 1000;
-                    } else {
-                        // Inserting between tasks
-                        const prevRank = activeIndex < overIndex
-                            ? tasksInColumn[overIndex]?.rank ?? 0
-                            : tasksInColumn[overIndex - 1]?.rank ?? 0;
-                        const nextRank = activeIndex < overIndex
-                            ? tasksInColumn[overIndex + 1]?.rank ?? prevRank + 2000
-                            : tasksInColumn[overIndex]?.rank ?? prevRank + 2000;
-                        newRank = (prevRank + nextRank) / 2;
-                    }
-
-                    onUpdateRank(activeTask.id, newRank);
-                }
+            const sameColumn = activeTask.status === targetStatus;
+            const columnTasks = tasks.filter(t => t.status === targetStatus);
+            const activeIndex = columnTasks.findIndex(t => t.id === activeTask.id);
+            const overIndex = columnTasks.findIndex(t => t.id === overTask.id);
+
+            if (sameColumn && activeIndex === overIndex) return;
+
+            const others = columnTasks.filter(t => t.id !== activeTask.id);
+            let insertAt = others.findIndex(t => t.id === overTask.id);
+            // Dragging down a column, or onto the last card of another column, lands below the target
+            if ((sameColumn && activeIndex < overIndex) || (!sameColumn && insertAt === others.length - 1 && insertAt > 0)) {
+                insertAt += 1;
             }
+
+            onMove(
+                activeTask.id,
+                targetStatus,
+                others[insertAt - 1]?.id ?? null,
+                others[insertAt]?.id ?? null
+            );
         }
     };
 
@@ -7,7 +7,7 @@ interface TaskModalProps {
     isOpen: boolean;
     onClose: () => void;
     task?: Task | null;
-    onSave: () => void;
+    onSave?: () => void;
     onDelete?: (id: number) => void;
 }
 
@@ -84,7 +84,7 @@ export default function TaskModal({ isOpen, onClose, task, onSave, onDelete }: T
             } else {
                 await api.post('/tasks', payload);
             }
-            onSave();
+            onSave?.();
             onClose();
         } catch (e) {
             console.error("Failed to save task", e);
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import ListView from '../components/ListView';
@@ -10,6 +10,16 @@ import api from '../api/client';
 import type { Task, Category, Priority, User } from '../types';
 import { Plus, Menu, Filter, X, Shield } from 'lucide-react';
 
+// Match the backend order: status (done last), then rank
+const sortTasks = (tasks: Task[]) => tasks.sort((a, b) => {
+    const aStatus = a.status === 'done' ? 2 : 1;
+    const bStatus = b.status === 'done' ? 2 : 1;
+    if (aStatus !== bStatus) {
+        return aStatus - bStatus;
+    }
+    return (a.rank ?? 0) - (b.rank ?? 0);
+});
+
 export default function Dashboard() {
     const { user, logout } = useAuth();
     const navigate = useNavigate();
@@ -35,14 +45,71 @@ export default function Dashboard() {
         fetchReferences();
     }, [dueDateFilter]);
 
+    // Mutations are not followed by a refetch: every change, including our
+    // own, arrives over the task event stream and is applied in place.
+    const dueDateFilterRef = useRef(dueDateFilter);
+    dueDateFilterRef.current = dueDateFilter;
+
+    useEffect(() => {
+        const source = new EventSource('/api/tasks/events');
+
+        const loadTasks = async (ids: number[]) => {
+            if (dueDateFilterRef.current) {
+                // The due date filter is applied server-side
+                fetchTasks();
+                return;
+            }
+            const loaded = await Promise.all(ids.map(id =>
+                api.get(`/tasks/${id}`).then(res => res.data as Task).catch(() => null)
+            ));
+            const fresh = new Map(loaded.filter((t): t is Task => t !== null).map(t => [t.id, t]));
+            setTasks(current => sortTasks([
+                ...current.filter(t => !fresh.has(t.id)),
+                ...fresh.values()
+            ]));
+        };
+
+        source.addEventListener('created', (e) => {
+            loadTasks(JSON.parse((e as MessageEvent).data).ids);
+        });
+        source.addEventListener('updated', (e) => {
+            const changes: (Partial<Task> & { id: number })[] = JSON.parse((e as MessageEvent).data).changes;
+            // Changed relationships need their nested objects; reload those tasks
+            const reload = changes
+                .filter(c => 'assignee_id' in c || 'category_id' in c || 'priority_id' in c || 'due_date' in c)
+                .map(c => c.id);
+            const byId = new Map(changes.map(c => [c.id, c]));
+            setTasks(current => sortTasks(current.map(t => byId.has(t.id) ? { ...t, ...byId.get(t.id) } : t)));
+            if (reload.length) {
+                loadTasks(reload);
+            }
+        });
+        source.addEventListener('deleted', (e) => {
+            const ids = new Set<number>(JSON.parse((e as MessageEvent).data).ids);
+            setTasks(current => current.filter(t => !ids.has(t.id)));
+        });
+        // Too much was missed (or ranks were rebalanced): reload everything
+        source.addEventListener('reset', () => fetchTasks());
+
+        return () => source.close();
+    }, []);
+
     const fetchTasks = async () => {
         try {
+            // Through the ref: the event stream listeners hold the first render's fetchTasks
             const params: any = {};
-            if (dueDateFilter) {
-                params.due_within_days = dueDateFilter;
+            if (dueDateFilterRef.current) {
+                params.due_within_days = dueDateFilterRef.current;
             }
-            const { data } = await api.get('/tasks', { params });
-            setTasks(data);
+            // Follow keyset cursors until the server reports no further page
+            const allTasks: Task[] = [];
+            let cursor: string | undefined;
+            do {
+                const response = await api.get('/tasks', { params: { ...params, cursor } });
+                allTasks.push(...response.data);
+                cursor = response.headers['x-next-cursor'];
+            } while (cursor);
+            setTasks(allTasks);
         } catch (e) {
             console.error(e);
         }
@@ -66,7 +133,7 @@ export default function Dashboard() {
     const handleDelete = async (id: number) => {
         if (confirm('Are you sure?')) {
             await api.delete(`/tasks/${id}`);
-            fetchTasks();
+            setTasks(current => current.filter(t => t.id !== id));
         }
     };
 
@@ -101,12 +168,33 @@ export default function Dashboard() {
         setTasks(sortedTasks);
 
         try {
+            // Neighbours respread server-side arrive over the event stream
             await api.put(`/tasks/${id}`, { rank });
         } catch (e) {
             fetchTasks(); // Revert on fail
         }
     };
 
+    const handleMove = async (id: number, status: string, beforeId: number | null, afterId: number | null) => {
+        // Optimistic status change; the server computes the rank atomically
+        setTasks(tasks.map(t => t.id === id ? { ...t, status: status as any } : t));
+        try {
+            const { data } = await api.post(`/tasks/${id}/move`, {
+                status,
+                before_id: beforeId,
+                after_id: afterId
+            });
+            // Apply only the changed fields, including any renumbered neighbours
+            const changes = new Map<number, Partial<Task>>(
+                data.changed.map((c: Partial<Task> & { id: number }) => [c.id, c])
+            );
+            setTasks(current => sortTasks(current
+                .map(t => changes.has(t.id) ? { ...t, ...changes.get(t.id) } : t)));
+        } catch (e) {
+            fetchTasks(); // Revert on fail
+        }
+    };
+
     const filteredTasks = tasks.filter(task => {
         if (statusFilter && task.status !== statusFilter) return false;
         if (priorityFilter && (task.priority?.id !== Number(priorityFilter))) return false;
@@ -293,7 +381,7 @@ export default function Dashboard() {
                                 tasks={filteredTasks}
                                 onEdit={(t) => { setEditingTask(t); setIsModalOpen(true); }}
                                 onUpdateStatus={handleStatusUpdate}
-                                onUpdateRank={handleRankUpdate}
+                                onMove={handleMove}
                             />
                         ) : (
                             <SettingsView />
@@ -308,7 +396,6 @@ export default function Dashboard() {
                 isOpen={isModalOpen}
                 onClose={() => setIsModalOpen(false)}
                 task={editingTask}
-                onSave={fetchTasks}
                 onDelete={handleDelete}
             />
         </div>